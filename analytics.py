@@ -0,0 +1,176 @@
+# analytics.py - 감정 추세 분석 (🌈 감정 달력의 📈 트렌드 탭)
+#
+# 달력(하루 한 감정)과 감정 기록(records.txt)을 첫 기록일부터 마지막 기록일까지
+# 하루 한 칸인 열 형식(MoodHistory)으로 한 번 만들어 둡니다.
+#   days    : 날짜 인덱스 (pd.DatetimeIndex, 하루 간격)
+#   codes   : 그날 감정 번호 (np.int16, 기록 없는 날은 -1) - emotions[번호]가 감정 이름
+#   records : 그날 남긴 감정 기록 수 (np.int32)
+# 달력 부분과 기록 부분은 각각 저장소의 calendar_version()/records_version()별로 캐시하므로,
+# 감정 기록을 하나 남겨도 달력은 다시 읽지 않습니다.
+# 질의는 모두 이 배열에 대한 NumPy 벡터 연산(누적합 차분, bincount)이라
+# 수십 년치 일별 데이터도 몇 밀리초 안에 끝납니다.
+
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+import heatmap
+from calendar_table import CalendarTable
+from read_cache import FileCache
+
+# 최근 비율 기간(일)
+WINDOWS = (7, 30, 90)
+WEEKDAY_LABELS = ("월", "화", "수", "목", "금", "토", "일")
+MONTH_LABELS = tuple(f"{month}월" for month in range(1, 13))
+NO_EMOTION = -1
+
+# 사용자별 (달력 열, 기록 열, 합친 이력) - 키에 데이터 버전이 들어가므로 파일 서명은 쓰지 않음
+history_cache = FileCache(max_entries=64)
+
+
+def calendar_columns(calendar_data):
+    """{"YYYY-MM-DD": 기록} → (첫 날, 감정 번호 배열, 감정 목록) - 많이 기록한 감정부터 번호를 매김"""
+    if not calendar_data:
+        return None, np.empty(0, dtype=np.int16), ()
+    if isinstance(calendar_data, CalendarTable):
+        days = pd.DatetimeIndex(heatmap.ordinal_days(calendar_data.ordinals))
+        labels = pd.Categorical(calendar_data.emotions())
+    else:
+        days = pd.to_datetime(pd.Index(list(calendar_data)), format="%Y-%m-%d")
+        labels = pd.Categorical([entry["emotion"] for entry in calendar_data.values()])
+    order = np.argsort(-np.bincount(labels.codes, minlength=len(labels.categories)), kind="stable")
+    renumber = np.empty_like(order)
+    renumber[order] = np.arange(len(order))
+
+    start = days.min()
+    codes = np.full((days.max() - start).days + 1, NO_EMOTION, dtype=np.int16)
+    codes[(days - start).days.to_numpy()] = renumber[labels.codes]
+    return start, codes, tuple(labels.categories[order])
+
+
+def record_counts(per_day):
+    """{"YYYY-MM-DD": 기록 수} → 날짜 인덱스 Series (날짜가 잘못된 항목은 뺌)"""
+    index = pd.to_datetime(pd.Index(list(per_day), dtype=object), format="%Y-%m-%d", errors="coerce")
+    counts = pd.Series(np.fromiter(per_day.values(), dtype=np.int32, count=len(per_day)), index=index)
+    return counts[counts.index.notna()].sort_index()
+
+
+class MoodHistory:
+    """하루 한 칸 열 형식 감정 이력 - 여러 세션이 공유하므로 읽기 전용"""
+
+    def __init__(self, calendar_part, records_part):
+        calendar_start, calendar_codes, self.emotions = calendar_part
+        bounds = []
+        if calendar_start is not None:
+            bounds += [calendar_start, calendar_start + pd.Timedelta(days=len(calendar_codes) - 1)]
+        if len(records_part):
+            bounds += [records_part.index[0], records_part.index[-1]]
+        if not bounds:
+            self.days = pd.DatetimeIndex([])
+            self.codes = np.empty(0, dtype=np.int16)
+            self.records = np.empty(0, dtype=np.int32)
+            return
+
+        start = min(bounds)
+        self.days = pd.date_range(start, max(bounds), freq="D")
+        self.codes = np.full(len(self.days), NO_EMOTION, dtype=np.int16)
+        if calendar_start is not None:
+            offset = (calendar_start - start).days
+            self.codes[offset:offset + len(calendar_codes)] = calendar_codes
+        self.records = np.zeros(len(self.days), dtype=np.int32)
+        self.records[(records_part.index - start).days.to_numpy()] = records_part.to_numpy()
+
+    def __len__(self):
+        return len(self.codes)
+
+    @cached_property
+    def recorded_days(self):
+        return int(np.count_nonzero(self.codes >= 0))
+
+    @cached_property
+    def _emotion_cumsum(self):
+        # (일수 + 1) x 감정 수 누적 일수 - 구간 합은 두 행의 차
+        k = len(self.emotions)
+        recorded = np.flatnonzero(self.codes >= 0)
+        one_hot = np.zeros((len(self.codes), k), dtype=np.int32)
+        one_hot[recorded, self.codes[recorded]] = 1
+        cumsum = np.zeros((len(self.codes) + 1, k), dtype=np.int32)
+        np.cumsum(one_hot, axis=0, out=cumsum[1:])
+        return cumsum
+
+    @cached_property
+    def _records_cumsum(self):
+        return np.concatenate(([0], np.cumsum(self.records, dtype=np.int64)))
+
+    def _windows(self, window, last):
+        """마지막 last일 각각의 [시작, 끝) 누적합 행 번호"""
+        ends = np.arange(max(len(self.codes) - (last or len(self.codes)), 0), len(self.codes)) + 1
+        return np.maximum(ends - window, 0), ends
+
+    def rolling_share(self, window, last=None):
+        """날짜별로 그날까지 window일 동안 기록한 날 중 감정별 비율 (기록이 없으면 NaN) - 마지막 last일만"""
+        starts, ends = self._windows(window, last)
+        counts = self._emotion_cumsum[ends] - self._emotion_cumsum[starts]
+        return _row_share(counts, self.days[ends - 1], list(self.emotions))
+
+    def activity(self, window, last=None):
+        """날짜별로 그날까지 window일 동안의 하루 평균 감정 기록 수 - 마지막 last일만"""
+        starts, ends = self._windows(window, last)
+        totals = self._records_cumsum[ends] - self._records_cumsum[starts]
+        return pd.Series(totals / (ends - starts), index=self.days[ends - 1], name="records")
+
+    @cached_property
+    def _weekdays(self):
+        return self.days.weekday.to_numpy()
+
+    @cached_property
+    def _months(self):
+        return self.days.month.to_numpy() - 1
+
+    def seasonality(self, by="weekday"):
+        """요일별(by="weekday") 또는 월별(by="month") 감정 비율 - 행: 요일/월, 열: 감정"""
+        groups, labels = (self._weekdays, WEEKDAY_LABELS) if by == "weekday" else (self._months, MONTH_LABELS)
+        recorded = self.codes >= 0
+        k = len(self.emotions)
+        counts = np.bincount(
+            groups[recorded] * k + self.codes[recorded], minlength=len(labels) * k
+        ).reshape(len(labels), k)
+        return _row_share(counts, list(labels), list(self.emotions))
+
+    def transitions(self, normalize=True):
+        """어제 감정(행) → 오늘 감정(열) 전이 - 이틀 연속 기록한 날만, normalize면 행별 비율"""
+        yesterday, today = self.codes[:-1], self.codes[1:]
+        both = (yesterday >= 0) & (today >= 0)
+        k = len(self.emotions)
+        counts = np.bincount(
+            yesterday[both].astype(np.int64) * k + today[both], minlength=k * k
+        ).reshape(k, k)
+        if not normalize:
+            return pd.DataFrame(counts, index=list(self.emotions), columns=list(self.emotions))
+        return _row_share(counts, list(self.emotions), list(self.emotions))
+
+
+def _row_share(counts, index, columns):
+    """행별 합으로 나눈 비율 DataFrame (합이 0인 행은 NaN)"""
+    totals = counts.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = counts / np.where(totals > 0, totals, np.nan)
+    return pd.DataFrame(share, index=index, columns=columns)
+
+
+def load(key, storage):
+    """저장소의 MoodHistory - 달력/기록 버전이 그대로면 캐시된 것 (key: 사용자 식별자)"""
+    calendar_version, records_version = storage.calendar_version(), storage.records_version()
+
+    def build():
+        calendar_part = history_cache.get(
+            (key, "calendar", calendar_version), [], lambda: calendar_columns(storage.load_calendar())
+        )
+        records_part = history_cache.get(
+            (key, "records", records_version), [],
+            lambda: record_counts(storage.records_per_day()),
+        )
+        return MoodHistory(calendar_part, records_part)
+
+    return history_cache.get((key, "history", calendar_version, records_version), [], build)
@@ -1,23 +1,26 @@
 # app.py - 마음의 나침반 통합 앱 (8개 감정 확장 + 개선된 콘텐츠 시스템)
 
 import streamlit as st
-import json
-import os
 from datetime import datetime, date, timedelta
 import calendar
-import pandas as pd
 import uuid
 
-# 페이지 설정
-st.set_page_config(
-    page_title="마음의 나침반",
-    page_icon="🧭",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+import calendar_render
+import catalog
+import delivery
+from app_data import DEFAULT_CONTENTS, EMOTION_COLORS, EMOTIONS_CONFIG, TIMING_OPTIONS
+import emotion_stats
+import exploration
+import insights
+import profiling
+import ranking
+import search_index
+from records_log import format_record_line
+from storage import get_storage, is_valid_user_id
+from streaks import StreakEngine
 
-# CSS 스타일 적용
-st.markdown("""
+# CSS 스타일 (main()에서 적용 - import만으로는 아무것도 그리지 않음)
+PAGE_CSS = """
 <style>
     .main-header {
         background: linear-gradient(135deg, #4A90E2 0%, #7B68EE 50%, #9370DB 100%);
@@ -95,218 +98,90 @@ st.markdown("""
         box-shadow: 0 4px 8px rgba(0, 0, 0, 0.2);
     }
 </style>
-""", unsafe_allow_html=True)
-
-# 감정별 색깔 정의 (8개로 확장)
-EMOTION_COLORS = {
-    "행복": "#FFD700",      # 황금색
-    "평온": "#87CEEB",      # 하늘색
-    "무기력": "#A9A9A9",    # 회색
-    "불안": "#FF6B6B",      # 연한 빨강
-    "슬픔": "#4169E1",      # 파랑
-    "화남": "#FF4500",      # 주황빨강
-    "희망": "#98FB98",      # 연두색
-    "감사": "#DDA0DD",      # 자주색
-    "외로움": "#6f42c1",    # 보라색
-    "분노": "#fd7e14",      # 주황색
-    "스트레스": "#e83e8c",  # 핫핑크
-    "혼란": "#17a2b8",      # 청록색
-    "좌절": "#28a745"       # 녹색
-}
-
-# 8개 확장 감정 정의
-EMOTIONS_CONFIG = {
-    "무기력": {
-        "icon": "😴",
-        "description": "에너지가 없고 아무것도 하기 싫음",
-        "color": "#6c757d",
-        "keywords": ["덩어리", "안개", "무거운 짐"]
-    },
-    "불안": {
-        "icon": "😰", 
-        "description": "걱정되고 초조하며 불안함",
-        "color": "#dc3545",
-        "keywords": ["바람", "파도", "뒤틀림"]
-    },
-    "외로움": {
-        "icon": "😔",
-        "description": "혼자라는 느낌, 고립감",
-        "color": "#6f42c1",
-        "keywords": ["섬", "구멍", "텅 빔"]
-    },
-    "분노": {
-        "icon": "😤",
-        "description": "화가 나고 짜증나며 억울함",
-        "color": "#fd7e14",
-        "keywords": ["불", "폭발", "압박"]
-    },
-    "슬픔": {
-        "icon": "😢",
-        "description": "우울하고 기분이 가라앉음",
-        "color": "#20c997",
-        "keywords": ["비", "가라앉음", "어둠"]
-    },
-    "스트레스": {
-        "icon": "😵",
-        "description": "압박감과 긴장감, 과부하",
-        "color": "#e83e8c",
-        "keywords": ["조임", "짓눌림", "터질 것 같음"]
-    },
-    "혼란": {
-        "icon": "🤯",
-        "description": "무엇을 해야 할지 모르겠음",
-        "color": "#17a2b8",
-        "keywords": ["미로", "소용돌이", "뒤엉킴"]
-    },
-    "좌절": {
-        "icon": "😩",
-        "description": "뜻대로 되지 않아 답답함",
-        "color": "#28a745",
-        "keywords": ["막힘", "부딪힘", "갇힘"]
-    }
-}
+"""
+
+
+def apply_page_style():
+    """페이지 설정과 CSS 적용 - 스크립트 실행 시 가장 먼저 호출"""
+    st.set_page_config(
+        page_title="마음의 나침반",
+        page_icon="🧭",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
+
 
 # 데이터 로드/저장 함수들
+# 감정별 shard 카탈로그 (data/contents/, 없으면 data/contents.json) - 파일이 바뀌면 감시 스레드가 교체
+content_catalog = catalog.Catalog(default=DEFAULT_CONTENTS)
+
 def load_contents():
-    """콘텐츠 데이터 로드 - 예외 처리 강화"""
+    """전체 콘텐츠 데이터 로드 (모든 감정 shard를 읽음)"""
     try:
-        if os.path.exists("data/contents.json"):
-            with open("data/contents.json", "r", encoding="utf-8") as f:
-                contents = json.load(f)
-                return contents
-        else:
-            return create_default_contents()
+        return content_catalog.current().all()
     except Exception as e:
         st.error(f"콘텐츠 로드 오류: {e}")
-        return create_default_contents()
-
-def create_default_contents():
-    """각 감정별 1개씩 예시 콘텐츠 생성"""
-    os.makedirs("data", exist_ok=True)
-    
-    default_contents = {
-        "무기력": [
-            {
-                "id": "lethargy_001",
-                "title": "20대 무기력증, 이렇게 극복했어요",
-                "description": "무기력한 상태에서 벗어나는 작은 시작들",
-                "channel": "써니즈",
-                "url": "https://www.youtube.com/watch?v=sample1",
-                "duration": "12:30",
-                "tags": ["무기력", "20대", "극복"],
-                "content_type": "위로"
-            }
-        ],
-        "불안": [
-            {
-                "id": "anxiety_001",
-                "title": "불안할 때 3분 마음챙김",
-                "description": "즉시 사용 가능한 불안 완화 호흡법",
-                "channel": "마인드풀TV",
-                "url": "https://www.youtube.com/watch?v=sample2",
-                "duration": "5:30",
-                "tags": ["불안", "호흡법", "마음챙김"],
-                "content_type": "실용팁"
-            }
-        ],
-        "외로움": [
-            {
-                "id": "loneliness_001",
-                "title": "혼자여도 괜찮아, 외로움 다독이기",
-                "description": "외로움을 적이 아닌 친구로 받아들이는 방법",
-                "channel": "하루의 사랑작업",
-                "url": "https://www.youtube.com/watch?v=sample3",
-                "duration": "14:20",
-                "tags": ["외로움", "수용", "위로"],
-                "content_type": "위로"
-            }
-        ],
-        "분노": [
-            {
-                "id": "anger_001",
-                "title": "화날 때 감정 조절하는 법",
-                "description": "분노를 건설적으로 표현하고 다루는 방법",
-                "channel": "김상윤",
-                "url": "https://www.youtube.com/watch?v=sample4",
-                "duration": "11:15",
-                "tags": ["분노", "감정조절", "소통"],
-                "content_type": "실용팁"
-            }
-        ],
-        "슬픔": [
-            {
-                "id": "sadness_001",
-                "title": "슬플 때 마음을 달래는 방법",
-                "description": "슬픔을 받아들이고 위로받는 시간",
-                "channel": "나탐",
-                "url": "https://www.youtube.com/watch?v=sample5",
-                "duration": "16:40",
-                "tags": ["슬픔", "위로", "수용"],
-                "content_type": "위로"
-            }
-        ],
-        "스트레스": [
-            {
-                "id": "stress_001",
-                "title": "직장인 스트레스 해소법",
-                "description": "바쁜 일상 속에서 실천할 수 있는 스트레스 관리",
-                "channel": "김주환",
-                "url": "https://www.youtube.com/watch?v=sample6",
-                "duration": "13:40",
-                "tags": ["스트레스", "직장인", "해소법"],
-                "content_type": "실용팁"
-            }
-        ],
-        "혼란": [
-            {
-                "id": "confusion_001",
-                "title": "인생의 방향을 잃었을 때",
-                "description": "혼란스러운 시기를 지나는 지혜",
-                "channel": "러브포레스토",
-                "url": "https://www.youtube.com/watch?v=sample7",
-                "duration": "18:30",
-                "tags": ["혼란", "방향", "지혜"],
-                "content_type": "통찰"
-            }
-        ],
-        "좌절": [
-            {
-                "id": "frustration_001",
-                "title": "실패와 좌절을 성장으로 바꾸기",
-                "description": "좌절 경험을 통한 성장과 학습",
-                "channel": "정신과의사정우열",
-                "url": "https://www.youtube.com/watch?v=sample8",
-                "duration": "15:25",
-                "tags": ["좌절", "성장", "실패"],
-                "content_type": "성장"
-            }
-        ]
-    }
-    
-    with open("data/contents.json", "w", encoding="utf-8") as f:
-        json.dump(default_contents, f, ensure_ascii=False, indent=2)
-    
-    return default_contents
+        return DEFAULT_CONTENTS
+
+
+def load_emotion_contents(emotion):
+    """감정 하나의 콘텐츠 목록 - 그 감정의 shard만 읽음"""
+    try:
+        return content_catalog.current().items(emotion)
+    except Exception as e:
+        st.error(f"콘텐츠 로드 오류: {e}")
+        return DEFAULT_CONTENTS.get(emotion, [])
+
+
+def ensure_user_identity():
+    """사용자/세션 식별자 설정 - 주소의 ?user= 값을 유지해 새로고침해도 같은 기록을 봄"""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = str(uuid.uuid4())
+
+    if "user_id" not in st.session_state:
+        user_id = st.query_params.get("user")
+        if not is_valid_user_id(user_id):
+            user_id = uuid.uuid4().hex
+            st.query_params["user"] = user_id
+        st.session_state.user_id = user_id
+
+    if "delivery_watched" not in st.session_state:
+        # 지난 배송을 처리하고 이 사용자의 다음 배송일을 배송 스케줄러에 올림
+        try:
+            delivery.scheduler.watch(st.session_state.user_id)
+        except Exception as e:
+            st.warning(f"편지 배송 확인 오류: {e}")
+        st.session_state.delivery_watched = True
+
+    return st.session_state.user_id
+
+
+def user_storage():
+    """현재 사용자의 저장소 (data/users/<id>/)"""
+    return profiling.wrap_storage(get_storage(st.session_state.get("user_id")))
 
 def load_emotion_calendar():
     """감정 달력 데이터 로드"""
-    if os.path.exists("emotion_calendar.json"):
-        with open("emotion_calendar.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+    return user_storage().load_calendar()
 
 def save_emotion_calendar(calendar_data):
-    """감정 달력 데이터 저장"""
-    with open("emotion_calendar.json", "w", encoding="utf-8") as f:
-        json.dump(calendar_data, f, ensure_ascii=False, indent=2)
+    """감정 달력 데이터 전체 저장"""
+    user_storage().save_calendar(calendar_data)
+
+
+def save_emotion_day(day, entry):
+    """하루치 감정 기록 저장"""
+    user_storage().save_calendar_day(day, entry)
 
 def save_emotion_record(text):
     """감정 기록 저장"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open("records.txt", "a", encoding="utf-8") as f:
-        f.write(f"[{timestamp}] {text}\n")
+    user_storage().append_record(timestamp, text)
+
 
 # 메인 페이지
+@profiling.timed("page")
 def main_page():
     """메인 홈페이지"""
     st.markdown("""
@@ -345,32 +220,36 @@ def main_page():
     # 최근 기록 표시
     show_recent_records()
 
+
+@profiling.timed()
 def show_recent_records():
     """최근 감정 기록 표시"""
     st.subheader("📝 최근 감정 기록")
     
-    try:
-        with open("records.txt", "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            if lines:
-                # 최근 3개 기록만 표시
-                recent_lines = lines[-3:]
-                for line in reversed(recent_lines):
-                    if line.strip():
-                        st.write(f"• {line.strip()}")
-            else:
-                st.info("아직 기록된 감정이 없어요. 첫 번째 여정을 시작해보세요!")
-    except FileNotFoundError:
+    # 최근 3개 기록만 표시
+    recent_records = user_storage().recent_records(3)
+    if recent_records:
+        for timestamp, text in recent_records:
+            st.write(f"• {format_record_line(timestamp, text)}")
+    else:
         st.info("아직 기록된 감정이 없어요. 첫 번째 여정을 시작해보세요!")
 
+
+def current_exploration():
+    """이 세션의 감정 탐색 진행 상태 (없거나 오래 쉬어 지워졌으면 None)"""
+    return exploration.store.get(st.session_state.get("session_id"))
+
+
 # 감정 탐색 페이지 (8개 감정으로 확장)
+@profiling.timed("page")
 def emotion_exploration_page():
     """감정 탐색 기능 - 8개 감정 지원"""
     st.title("🎯 감정 탐색하기")
     st.markdown("*당신의 마음을 깊이 있게 이해해보세요*")
     
-    # 초기 감정 선택
-    if "selected_emotion" not in st.session_state:
+    # 초기 감정 선택 (진행 상태는 세션이 아니라 exploration.store에 둠)
+    state = current_exploration()
+    if state is None:
         st.subheader("어떤 감정을 느끼고 계신가요?")
         
         # 2x4 그리드로 배치
@@ -387,9 +266,7 @@ def emotion_exploration_page():
                         key=f"emotion_{emotion}",
                         use_container_width=True
                     ):
-                        st.session_state.selected_emotion = emotion
-                        st.session_state.emotion_data = data
-                        st.session_state.chat_step = 1
+                        exploration.store.start(st.session_state.get("session_id"), emotion)
                         st.rerun()
             
             with col2:
@@ -400,20 +277,20 @@ def emotion_exploration_page():
                         key=f"emotion_{emotion}",
                         use_container_width=True
                     ):
-                        st.session_state.selected_emotion = emotion
-                        st.session_state.emotion_data = data
-                        st.session_state.chat_step = 1
+                        exploration.store.start(st.session_state.get("session_id"), emotion)
                         st.rerun()
     
     else:
         # 선택된 감정에 따른 대화형 탐색
-        run_emotion_chat()
+        run_emotion_chat(state)
+
 
-def run_emotion_chat():
+@profiling.timed()
+def run_emotion_chat(state):
     """감정 탐색 채팅 - 개선된 버전"""
-    emotion = st.session_state.selected_emotion
-    emotion_data = st.session_state.get("emotion_data", {})
-    step = st.session_state.get("chat_step", 1)
+    emotion = state.emotion_name
+    emotion_data = state.config
+    step = state.step
     
     st.subheader(f"💭 {emotion} 감정 탐색")
     
@@ -443,8 +320,8 @@ def run_emotion_chat():
         for i, keyword in enumerate(emotion_keywords):
             with cols[i]:
                 if st.button(keyword, key=f"quick_{keyword}"):
-                    st.session_state.user_word = keyword
-                    st.session_state.chat_step = 2
+                    state.word = keyword
+                    state.step = 2
                     st.rerun()
         
         # 직접 입력
@@ -455,22 +332,17 @@ def run_emotion_chat():
         )
         
         if st.button("다음", key="next1") and user_input:
-            st.session_state.user_word = user_input
-            st.session_state.chat_step = 2
+            state.word = user_input
+            state.step = 2
             st.rerun()
     
     elif step == 2:
-        word = st.session_state.user_word
+        word = state.word
         st.write(f"'{word}' 같은 감정이시는군요.")
         st.write("**언제부터 이런 기분을 느끼셨나요?**")
         
         # 시점 선택 옵션
-        timing_options = [
-            "방금 전부터", "오늘 아침부터", "며칠 전부터", 
-            "일주일 이상", "오래전부터"
-        ]
-        
-        selected_timing = st.radio("시점을 선택해주세요:", timing_options, horizontal=True)
+        selected_timing = st.radio("시점을 선택해주세요:", TIMING_OPTIONS, horizontal=True)
         
         # 상황 입력
         user_input = st.text_area(
@@ -481,29 +353,31 @@ def run_emotion_chat():
         )
         
         if st.button("다음", key="next2") and user_input:
-            st.session_state.timing = selected_timing
-            st.session_state.context = user_input
-            st.session_state.chat_step = 3
+            state.timing = TIMING_OPTIONS.index(selected_timing)
+            state.context = user_input
+            state.step = 3
             st.rerun()
     
     elif step == 3:
         st.write("🌟 통찰의 시간")
         
         # 개인화된 통찰 제공
-        provide_enhanced_insight()
+        provide_enhanced_insight(state)
         
         # 콘텐츠 추천
-        recommend_content()
+        recommend_content(state.emotion_name)
         
         # 감정 기록하기
         final_emotion_record()
 
-def provide_enhanced_insight():
+
+@profiling.timed()
+def provide_enhanced_insight(state):
     """향상된 개인화 통찰 제공"""
-    emotion = st.session_state.selected_emotion
-    word = st.session_state.get("user_word", "")
-    timing = st.session_state.get("timing", "")
-    context = st.session_state.get("context", "")
+    emotion = state.emotion_name
+    word = state.word
+    timing = state.timing_label
+    context = state.context
     
     st.markdown("""
     <div class="positive-message">
@@ -520,59 +394,22 @@ def provide_enhanced_insight():
     st.info(f"💡 {insights['encouragement']}")
 
 def get_emotion_insights(emotion, word, timing, context):
-    """감정별 맞춤 통찰 생성"""
-    
-    base_insights = {
-        "무기력": {
-            "main_message": f"'{word}' 같은 무기력함을 느끼고 계시는군요. 이런 감정은 우리가 잠시 멈춰서 자신을 돌아보라는 신호일 수 있어요. 마치 휴대폰 배터리가 부족할 때 충전이 필요하듯, 당신의 마음도 지금 재충전의 시간이 필요한 것 같아요.",
-            "encouragement": "작은 것부터 시작해보세요. 오늘 할 수 있는 가장 작은 일 하나만이라도요."
-        },
-        "불안": {
-            "main_message": f"'{word}' 같은 불안함을 느끼고 계시는군요. 불안은 우리가 무언가를 소중히 여기고 있다는 증거예요. 완전히 무관심하다면 불안하지도 않을 테니까요.",
-            "encouragement": "지금 이 순간, 당신이 할 수 있는 일에 집중해보세요. 미래는 현재의 작은 선택들로 만들어집니다."
-        },
-        "외로움": {
-            "main_message": f"'{word}' 같은 외로움을 느끼고 계시는군요. 외로움은 연결을 원하는 자연스러운 감정이에요. 혼자라는 느낌이 들 때도 당신을 이해하고 응원하는 마음들이 있다는 것을 기억해주세요.",
-            "encouragement": "외로움도 당신의 소중한 일부입니다. 이 감정을 통해 진정한 연결의 의미를 더 깊이 이해하게 될 거예요."
-        },
-        "분노": {
-            "main_message": f"'{word}' 같은 분노를 느끼고 계시는군요. 화가 나는 것은 당신이 무언가 중요한 것을 지키려 한다는 뜻이에요. 그 분노 뒤에 숨은 소중한 가치를 발견해보세요.",
-            "encouragement": "분노를 억누르지 마세요. 건강한 방식으로 표현하고, 그 에너지를 긍정적 변화로 바꿀 수 있어요."
-        },
-        "슬픔": {
-            "main_message": f"'{word}' 같은 슬픔을 느끼고 계시는군요. 슬픔은 우리가 잃은 것의 소중함을 알려주는 감정이에요. 충분히 슬퍼하는 것도 치유의 과정입니다.",
-            "encouragement": "눈물은 마음을 정화하는 자연스러운 과정이에요. 슬픔을 통해 더 깊은 공감과 사랑을 배우게 될 거예요."
-        },
-        "스트레스": {
-            "main_message": f"'{word}' 같은 스트레스를 느끼고 계시는군요. 스트레스는 우리가 성장하고 도전하고 있다는 신호이기도 해요. 하지만 지금은 잠시 속도를 늦춰도 괜찮아요.",
-            "encouragement": "완벽하지 않아도 괜찮습니다. 숨을 고르고, 우선순위를 정리해보세요."
-        },
-        "혼란": {
-            "main_message": f"'{word}' 같은 혼란을 느끼고 계시는군요. 혼란은 새로운 이해와 성장의 전단계일 수 있어요. 지금 당장 모든 답을 알 필요는 없어요.",
-            "encouragement": "한 번에 하나씩 정리해보세요. 작은 명확함들이 모여 큰 이해가 됩니다."
-        },
-        "좌절": {
-            "main_message": f"'{word}' 같은 좌절감을 느끼고 계시는군요. 좌절은 당신이 목표를 향해 노력하고 있다는 증거예요. 포기하지 않고 여기까지 온 자신을 인정해주세요.",
-            "encouragement": "모든 위대한 성취는 수많은 좌절을 딛고 만들어집니다. 잠시 쉬어가도 괜찮아요."
-        }
-    }
-    
-    return base_insights.get(emotion, {
-        "main_message": "힘든 감정을 느끼고 계시는군요. 이런 감정도 당신의 소중한 일부예요.",
-        "encouragement": "지금 이 순간을 있는 그대로 받아들여보세요."
-    })
+    """감정별 맞춤 통찰 생성 (문구는 data/insights.json)"""
+    return insights.get_insight(emotion, word, timing, context)
+
 
-def recommend_content():
+@profiling.timed()
+def recommend_content(emotion):
     """개선된 콘텐츠 추천 - 오류 방지"""
     st.subheader("🎬 당신을 위한 추천 콘텐츠")
     
-    emotion = st.session_state.selected_emotion
-    contents = load_contents()
+    contents = load_emotion_contents(emotion)
     
-    if emotion in contents and len(contents[emotion]) > 0:
+    if len(contents) > 0:
         st.success(f"{emotion} 관련 콘텐츠를 찾았습니다!")
         
-        for i, content in enumerate(contents[emotion][:3]):  # 최대 3개
+        # 피드백 점수 상위 3개 (투표가 없으면 목록 순서대로)
+        for i, (position, content) in enumerate(ranking.top_contents(emotion, contents, 3)):
             with st.expander(f"🎥 {content['title']}", expanded=(i==0)):
                 col1, col2 = st.columns([3, 1])
                 
@@ -588,39 +425,34 @@ def recommend_content():
                     
                     # 피드백 수집
                     if st.button(f"도움됐어요", key=f"helpful_{emotion}_{i}"):
-                        save_content_feedback(content.get('title', ''), True)
+                        save_content_feedback(content.get('title', ''), True, content.get('id'), position, emotion)
                         st.success("피드백 감사합니다!")
     else:
         st.warning(f"{emotion} 관련 콘텐츠가 아직 준비되지 않았습니다.")
         st.info("곧 다양한 콘텐츠를 추가할 예정입니다. 다른 감정을 선택해보시거나 나중에 다시 방문해주세요.")
 
-def save_content_feedback(content_title, is_helpful):
-    """콘텐츠 피드백 저장"""
+
+def save_content_feedback(content_title, is_helpful, content_id=None, position=None, emotion=None):
+    """콘텐츠 피드백 저장 (이벤트 로그에 추가 + 카운터 증가 + 추천 순위 반영)"""
     try:
-        feedback_file = "content_feedback.json"
-        
-        if os.path.exists(feedback_file):
-            with open(feedback_file, "r", encoding="utf-8") as f:
-                feedbacks = json.load(f)
-        else:
-            feedbacks = {"feedbacks": []}
-        
         new_feedback = {
+            "content_id": content_id,
             "content_title": content_title,
             "is_helpful": is_helpful,
-            "emotion": st.session_state.get("selected_emotion", "unknown"),
+            "emotion": emotion or "unknown",
             "timestamp": datetime.now().isoformat(),
             "session_id": st.session_state.get("session_id", "anonymous")
         }
         
-        feedbacks["feedbacks"].append(new_feedback)
-        
-        with open(feedback_file, "w", encoding="utf-8") as f:
-            json.dump(feedbacks, f, ensure_ascii=False, indent=2)
+        user_storage().append_feedback(new_feedback)
+        if position is not None:
+            ranking.record_vote(new_feedback["emotion"], content_id or content_title, position, is_helpful)
             
     except Exception as e:
         print(f"피드백 저장 오류: {e}")
 
+
+@profiling.timed()
 def final_emotion_record():
     """최종 감정 기록"""
     st.subheader("📝 오늘의 마음 기록하기")
@@ -634,6 +466,8 @@ def final_emotion_record():
     if st.button("💾 마음 기록하기", type="primary"):
         if final_text.strip():
             save_emotion_record(final_text.strip())
+            # 기록까지 마친 탐색은 바로 정리 (다음 방문은 감정 선택부터)
+            exploration.store.clear(st.session_state.get("session_id"))
             
             st.markdown("""
             <div class="positive-message">
@@ -645,20 +479,18 @@ def final_emotion_record():
             st.balloons()
             
             if st.button("🏠 홈으로 돌아가기"):
-                # 세션 초기화
-                for key in ["selected_emotion", "chat_step", "user_word", "timing", "context", "emotion_data"]:
-                    if key in st.session_state:
-                        del st.session_state[key]
                 st.session_state.page = "main"
                 st.rerun()
 
+
 # 감정 달력 페이지 (기존 코드 유지)
+@profiling.timed("page")
 def emotion_calendar_page():
     """감정 색깔 달력 페이지"""
     st.title("🌈 감정 색깔 달력")
     st.markdown("*매일의 감정을 색깔로 기록하고, 나만의 감정 패턴을 발견해보세요*")
     
-    tab1, tab2, tab3 = st.tabs(["📅 달력 보기", "🎨 오늘 기록", "📊 내 통계"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📅 달력 보기", "🎨 오늘 기록", "📊 내 통계", "📈 트렌드"])
     
     with tab1:
         display_emotion_calendar()
@@ -669,10 +501,18 @@ def emotion_calendar_page():
     with tab3:
         show_emotion_statistics()
 
+    with tab4:
+        show_emotion_trends()
+
+
+@profiling.timed()
 def display_emotion_calendar():
     """감정 달력 표시"""
-    calendar_data = load_emotion_calendar()
-    
+    view = st.radio("보기", ["📅 월별", "🗓️ 연간", "🌐 전체 기간"], horizontal=True, key="calendar_view")
+    if view != "📅 월별":
+        display_emotion_heatmap(multi_year=(view == "🌐 전체 기간"))
+        return
+
     # 현재 년월 선택
     col1, col2 = st.columns(2)
     with col1:
@@ -682,10 +522,72 @@ def display_emotion_calendar():
         current_month = st.selectbox("월", range(1, 13), 
                                     index=datetime.now().month - 1)
     
-    # 달력 생성
-    cal = calendar.monthcalendar(current_year, current_month)
-    
     st.write(f"### {current_year}년 {current_month}월")
+
+    storage = user_storage()
+    last_day = calendar.monthrange(current_year, current_month)[1]
+    
+    def load_month():
+        return storage.calendar_between(
+            f"{current_year}-{current_month:02d}-01",
+            f"{current_year}-{current_month:02d}-{last_day:02d}"
+        )
+
+    if calendar_render.RENDER_MODE == "columns":
+        display_month_columns(current_year, current_month, load_month())
+        return
+
+    # 달력 전체를 요소 하나로 표시 (데이터가 바뀌지 않은 달은 캐시된 HTML 사용)
+    month_html = calendar_render.month_html(
+        st.session_state.get("user_id"), current_year, current_month,
+        storage.calendar_version(), load_month
+    )
+    st.markdown(month_html, unsafe_allow_html=True)
+
+
+@profiling.timed()
+def display_emotion_heatmap(multi_year):
+    """연간/전체 기간 감정 히트맵"""
+    import heatmap
+
+    storage = user_storage()
+    user_id, version = st.session_state.get("user_id"), storage.calendar_version()
+
+    def build_frame():
+        frame = heatmap.calendar_frame(load_emotion_calendar())
+        return frame, heatmap.year_summary(frame)
+
+    # 일별 표와 연도별 요약도 SVG와 같은 (사용자, 달력 버전)으로 캐시 - 달력이 바뀌기 전에는 다시 만들지 않음
+    frame, summary = calendar_render.render_cache.get((user_id, "heatmap_frame", version), [], build_frame)
+    this_year = datetime.now().year
+    data_years = sorted(set(frame.index.year)) or [this_year]
+
+    if multi_year:
+        first_year, last_year = data_years[0], max(data_years[-1], this_year)
+    else:
+        year_options = list(range(min(data_years[0], this_year), max(data_years[-1], this_year) + 1))
+        first_year = last_year = st.selectbox("년도", year_options, index=year_options.index(this_year),
+                                              key="heatmap_year")
+
+    st.write(f"### {first_year}년" if first_year == last_year else f"### {first_year}년 ~ {last_year}년")
+
+    svg = calendar_render.render_cache.get(
+        (user_id, "heatmap", first_year, last_year, version),
+        [],
+        lambda: heatmap.heatmap_svg(frame, first_year, last_year, EMOTION_COLORS)
+    )
+    st.markdown(svg, unsafe_allow_html=True)
+
+    summary = summary[(summary.index >= first_year) & (summary.index <= last_year)].copy()
+    if not summary.empty:
+        summary.columns = ["기록 일수", "가장 많은 감정"]
+        summary.index.name = "년도"
+        st.dataframe(summary, use_container_width=True)
+
+
+def display_month_columns(current_year, current_month, calendar_data):
+    """날짜마다 요소를 만드는 기존 달력 표시"""
+    cal = calendar.monthcalendar(current_year, current_month)
     
     # 요일 헤더
     days = ['월', '화', '수', '목', '금', '토', '일']
@@ -741,6 +643,8 @@ def display_emotion_calendar():
                         </div>
                         """, unsafe_allow_html=True)
 
+
+@profiling.timed()
 def show_emotion_selector():
     """감정 선택 UI"""
     col1, col2 = st.columns(2)
@@ -768,104 +672,112 @@ def show_emotion_selector():
     
     if st.button("💾 오늘의 감정 저장하기", type="primary"):
         if emotion_note.strip():
-            calendar_data = load_emotion_calendar()
             today = date.today().strftime("%Y-%m-%d")
             
-            calendar_data[today] = {
+            save_emotion_day(today, {
                 "emotion": selected_emotion,
                 "note": emotion_note.strip(),
                 "color": custom_color,
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            save_emotion_calendar(calendar_data)
+            })
             st.success("✨ 오늘의 감정이 색깔 달력에 저장되었어요!")
             st.balloons()
         else:
             st.warning("감정을 한 문장으로 적어주세요")
 
+
+@profiling.timed()
 def show_emotion_statistics():
     """감정 통계 표시"""
-    calendar_data = load_emotion_calendar()
+    # 기본 통계 (저장 시점에 갱신된 집계값)
+    stats = user_storage().emotion_stats()
+    emotion_counts = stats["counts"]
     
-    if not calendar_data:
+    if not emotion_counts:
         st.info("아직 기록된 감정이 없어요. 첫 번째 감정을 기록해보세요!")
         return
     
-    # 기본 통계
-    emotion_counts = {}
-    for record in calendar_data.values():
-        emotion = record["emotion"]
-        emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-    
-    most_common_emotion = max(emotion_counts, key=emotion_counts.get)
-    total_records = len(calendar_data)
-    
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("📅 총 기록 일수", total_records)
+        st.metric("📅 총 기록 일수", stats["total_days"])
     
     with col2:
-        st.metric("😊 가장 많은 감정", most_common_emotion)
+        st.metric("😊 가장 많은 감정", emotion_stats.most_common_emotion(stats))
     
     with col3:
-        streak = calculate_streak(calendar_data)
+        streak = emotion_stats.current_streak(stats, date.today().strftime("%Y-%m-%d"))
         st.metric("🔥 연속 기록", f"{streak}일")
     
+    with col4:
+        st.metric("🏆 최장 연속 기록", f"{stats['longest_streak']}일")
+
     # 감정별 분포
     if emotion_counts:
+        import pandas as pd  # 통계 탭에서만 필요 - 앱 import 시간을 줄이려고 지연 로드
+
         st.subheader("📊 감정 분포")
         emotion_df = pd.DataFrame(list(emotion_counts.items()), 
                                  columns=['감정', '횟수'])
         st.bar_chart(emotion_df.set_index('감정'))
 
+
+# 트렌드 그래프에 보여줄 최근 일수
+TREND_DAYS = 365
+
+
+@profiling.timed()
+def show_emotion_trends():
+    """감정 추세 - 최근 감정 비율, 요일/월별 경향, 어제→오늘 감정 전이"""
+    import analytics  # 트렌드 탭에서만 필요 - NumPy/pandas 지연 로드
+
+    history = analytics.load(st.session_state.get("user_id"), user_storage())
+    if history.recorded_days == 0:
+        st.info("아직 기록된 감정이 없어요. 며칠 기록하면 감정의 흐름을 볼 수 있어요!")
+        return
+    colors = [EMOTION_COLORS.get(emotion, "#CCCCCC") for emotion in history.emotions]
+
+    st.subheader("📈 최근 감정 비율")
+    window = st.radio("기간", analytics.WINDOWS, format_func=lambda days: f"최근 {days}일",
+                      horizontal=True, key="trend_window")
+    st.line_chart(history.rolling_share(window, last=TREND_DAYS), color=colors)
+    if history.records.any():
+        st.caption(f"감정 기록 수 (최근 {window}일 하루 평균)")
+        st.line_chart(history.activity(window, last=TREND_DAYS))
+
+    st.subheader("🗓️ 요일별 · 월별 경향")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.bar_chart(history.seasonality("weekday"), color=colors, sort=False)
+    with col2:
+        st.bar_chart(history.seasonality("month"), color=colors, sort=False)
+
+    st.subheader("🔀 어제 → 오늘 감정")
+    st.caption("행은 어제 감정, 열은 다음 날 감정이에요 (이틀 연속 기록한 날만, %)")
+    st.dataframe((history.transitions() * 100).round(1))
+
 def calculate_streak(calendar_data):
     """연속 기록 일수 계산"""
     if not calendar_data:
         return 0
     
-    dates = sorted(calendar_data.keys(), reverse=True)
-    streak = 0
-    current_date = date.today()
-    
-    for date_str in dates:
-        record_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        
-        if (current_date - record_date).days == streak:
-            streak += 1
-            current_date = record_date
-        else:
-            break
-    
-    return streak
+    return StreakEngine.from_calendar(calendar_data).current_streak(date.today().strftime("%Y-%m-%d"))
 
 # 미래 편지 기능
 def load_letters():
     """편지 데이터 로드"""
-    if os.path.exists("future_letters.json"):
-        with open("future_letters.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"letters": []}
+    return user_storage().load_letters()
 
 def save_letters(letters_data):
     """편지 데이터 저장"""
-    with open("future_letters.json", "w", encoding="utf-8") as f:
-        json.dump(letters_data, f, ensure_ascii=False, indent=2)
+    user_storage().save_letters(letters_data)
 
 def get_new_letters_count():
     """새로 도착한 편지 수 확인"""
-    letters_data = load_letters()
-    today = date.today()
-    
-    new_count = 0
-    for letter in letters_data["letters"]:
-        delivery_date = datetime.strptime(letter["delivery_date"], "%Y-%m-%d").date()
-        if delivery_date <= today and not letter.get("is_read", False):
-            new_count += 1
-    
-    return new_count
+    return user_storage().mailbox_counts()["new"]
 
+
+@profiling.timed("page")
 def future_letter_page():
     """미래 편지 페이지"""
     st.title("💌 미래의 나에게 편지쓰기")
@@ -879,6 +791,8 @@ def future_letter_page():
     with tab2:
         show_simple_mailbox()
 
+
+@profiling.timed()
 def show_simple_letter_writing():
     """편지 쓰기"""
     st.subheader("💝 마음을 담은 편지 쓰기")
@@ -914,8 +828,6 @@ def show_simple_letter_writing():
     
     if st.button("💌 편지 보내기", type="primary"):
         if letter_content.strip():
-            letters_data = load_letters()
-            
             new_letter = {
                 "id": str(uuid.uuid4()),
                 "title": "",
@@ -927,8 +839,8 @@ def show_simple_letter_writing():
                 "write_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
             
-            letters_data["letters"].append(new_letter)
-            save_letters(letters_data)
+            user_storage().add_letter(new_letter)
+            delivery.scheduler.schedule(st.session_state.user_id, new_letter["delivery_date"])
             
             st.success("✨ 편지가 성공적으로 보내졌어요!")
             st.balloons()
@@ -936,57 +848,144 @@ def show_simple_letter_writing():
             days_until = (delivery_date - date.today()).days
             st.info(f"🚚 {days_until}일 후에 편지가 도착할 예정이에요!")
 
+
+# 편지함 한 페이지에 보여줄 편지 수
+LETTERS_PER_PAGE = 10
+
+
+@profiling.timed()
 def show_simple_mailbox():
-    """편지함"""
-    letters_data = load_letters()
-    today = date.today()
-    
-    # 읽을 수 있는 편지들
-    deliverable = []
-    waiting = []
-    
-    for letter in letters_data["letters"]:
-        delivery_date = datetime.strptime(letter["delivery_date"], "%Y-%m-%d").date()
-        if delivery_date <= today:
-            deliverable.append(letter)
-        else:
-            waiting.append(letter)
+    """편지함 - 배송 스케줄러가 기록해 둔 도착 상태만 읽음 (헤더는 페이지 단위, 본문은 펼친 편지만)"""
+    storage = user_storage()
+    counts = storage.mailbox_counts()
     
     # 통계
     col1, col2 = st.columns(2)
     with col1:
-        unread_count = len([l for l in deliverable if not l["is_read"]])
-        st.metric("📬 새 편지", unread_count)
+        st.metric("📬 새 편지", counts["new"])
     
     with col2:
-        st.metric("⏰ 배송 대기", len(waiting))
+        st.metric("⏰ 배송 대기", counts["waiting"])
     
-    # 도착한 편지들
-    if deliverable:
-        st.subheader("📬 도착한 편지들")
+    # 도착한 편지들 (도착 최신순)
+    delivered_count = counts["arrived"]
+    if delivered_count == 0:
+        st.info("아직 도착한 편지가 없어요. 첫 번째 편지를 써보세요! ✏️")
+        return
+
+    st.subheader("📬 도착한 편지들")
+
+    page_count = (delivered_count + LETTERS_PER_PAGE - 1) // LETTERS_PER_PAGE
+    page = 1
+    if page_count > 1:
+        page = st.number_input(f"페이지 (전체 {page_count}쪽)", min_value=1, max_value=page_count, value=1,
+                               step=1, key="mailbox_page")
+
+    for letter in storage.letter_headers((page - 1) * LETTERS_PER_PAGE, LETTERS_PER_PAGE):
+        status = "🆕 새 편지" if not letter["is_read"] else "✅ 읽음"
+        label = f"{status} - {letter['write_date'].replace('-', '.')}의 나로부터"
         
-        for letter in sorted(deliverable, key=lambda x: x["delivery_date"], reverse=True):
-            write_date = datetime.strptime(letter["write_date"], "%Y-%m-%d")
-            status = "🆕 새 편지" if not letter["is_read"] else "✅ 읽음"
+        # on_change="rerun"이면 펼침 상태(.open)를 알 수 있어 펼친 편지의 본문만 읽음
+        with st.expander(label, key=f"letter_{letter['id']}", on_change="rerun") as letter_box:
+            if not letter_box.open:
+                continue
+            body = storage.letter_body(letter["id"])
+            st.write(body["content"] if body else "")
             
-            with st.expander(f"{status} - {write_date.strftime('%Y.%m.%d')}의 나로부터"):
-                st.write(letter["content"])
-                
-                if not letter["is_read"]:
-                    if st.button("읽음으로 표시", key=f"mark_read_{letter['id']}"):
-                        for l in letters_data["letters"]:
-                            if l["id"] == letter["id"]:
-                                l["is_read"] = True
-                                l["read_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                break
-                        save_letters(letters_data)
-                        st.success("편지를 읽으셨군요! 💕")
-                        st.rerun()
-    else:
-        st.info("아직 도착한 편지가 없어요. 첫 번째 편지를 써보세요! ✏️")
+            if not letter["is_read"]:
+                if st.button("읽음으로 표시", key=f"mark_read_{letter['id']}"):
+                    storage.mark_letter_read(letter["id"], datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                    st.success("편지를 읽으셨군요! 💕")
+                    st.rerun()
+
+
+# 기록 검색
+SEARCH_KIND_LABELS = {"note": "🌈 달력 메모", "record": "📝 감정 기록", "letter": "💌 편지"}
+
+
+@profiling.timed("page")
+def search_page():
+    """달력 메모, 감정 기록, 도착한 편지 검색"""
+    st.title("🔍 기록 검색")
+    st.markdown("*예전에 적어 둔 마음을 다시 찾아보세요*")
+
+    query = st.text_input("검색어", placeholder="예: 과제 마감")
+    kinds = st.multiselect(
+        "찾을 곳",
+        list(SEARCH_KIND_LABELS),
+        default=list(SEARCH_KIND_LABELS),
+        format_func=SEARCH_KIND_LABELS.get
+    )
+
+    if not query.strip():
+        st.info("찾고 싶은 단어를 입력해보세요.")
+        return
+
+    # 아직 도착하지 않은 편지(배송일이 오늘 이후)는 보여주지 않음
+    until = date.today().strftime("%Y-%m-%d") + " 23:59:59"
+    hits = user_storage().search(query, limit=50, kinds=kinds, until=until)
+    if not hits:
+        st.info("검색 결과가 없어요.")
+        return
+
+    st.caption(f"{len(hits)}건을 찾았어요")
+    for hit in hits:
+        st.markdown(f"**{SEARCH_KIND_LABELS[hit['kind']]}** · {hit['date']}")
+        st.write(search_index.snippet(hit["text"], query, 80))
 
 # 메인 앱 실행
 def main():
+    apply_page_style()
+    ensure_user_identity()
+
+    # 성능 추적 (MINDFUL_PROFILE, 서버가 MINDFUL_PROFILE_QUERY로 허용하면 ?profile=timing|cprofile)
+    profile_mode = profiling.requested_mode(st.query_params.get("profile"))
+    if profile_mode is None:
+        render_app()
+        return
+
+    with profiling.rerun(
+        profile_mode,
+        session_id=st.session_state.get("session_id"),
+        user_id=st.session_state.get("user_id"),
+        page=st.session_state.get("page", "main"),
+    ) as profile:
+        render_app()
+        profile.context["page"] = st.session_state.get("page", "main")
+    show_profile_panel(profile.record)
+
+
+def show_profile_panel(record):
+    """이번 rerun의 성능 추적 결과 (접힌 디버그 패널)"""
+    with st.expander(f"🛠️ 성능 추적 - {record['total_ms']:.1f}ms", expanded=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("전체", f"{record['total_ms']:.1f}ms")
+        with col2:
+            st.metric("저장소 호출", f"{record['storage_ms']:.1f}ms")
+
+        st.markdown("**페이지/섹션**")
+        st.dataframe(
+            [{"구간": "  " * span["depth"] + span["name"], "종류": span["kind"], "ms": span["ms"]} for span in record["spans"]]
+        )
+
+        if record["storage"]:
+            st.markdown("**저장소 호출**")
+            st.dataframe(
+                [{"메서드": method, "횟수": entry["calls"], "ms": entry["ms"]} for method, entry in record["storage"].items()]
+            )
+
+        if isinstance(record.get("cprofile"), list):
+            st.markdown("**cProfile (누적 시간 상위)**")
+            st.dataframe(record["cprofile"])
+        elif record.get("cprofile") == "busy":
+            st.caption("다른 세션이 프로파일러를 사용 중이라 cProfile은 건너뛰었어요.")
+
+        st.caption(f"추적 파일: {profiling.TRACE_PATH}")
+
+
+def render_app():
+    """사이드바와 현재 페이지 그리기"""
     # 사이드바 네비게이션
     st.sidebar.title("🧭 마음의 나침반")
     
@@ -1008,7 +1007,7 @@ def main():
     
     page = st.sidebar.selectbox(
         "메뉴 선택",
-        ["🏠 홈", "🎯 감정 탐색", "🌈 감정 달력", "💌 미래 편지"]
+        ["🏠 홈", "🎯 감정 탐색", "🌈 감정 달력", "💌 미래 편지", "🔍 기록 검색"]
     )
     
     # 페이지 라우팅
@@ -1020,6 +1019,8 @@ def main():
         st.session_state.page = "emotion_calendar"
     elif page == "💌 미래 편지":
         st.session_state.page = "future_letter"
+    elif page == "🔍 기록 검색":
+        st.session_state.page = "search"
     
     # 페이지 표시
     current_page = st.session_state.get("page", "main")
@@ -1032,6 +1033,8 @@ def main():
         emotion_calendar_page()
     elif current_page == "future_letter":
         future_letter_page()
+    elif current_page == "search":
+        search_page()
 
 if __name__ == "__main__":
     main()
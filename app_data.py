@@ -0,0 +1,185 @@
+# app_data.py - 앱에서 쓰는 고정 데이터 테이블
+#
+# 감정 색/설정 표, 기본 콘텐츠 목록, 시점 선택지를 app.py에서 분리했습니다.
+# 순수 리터럴만 있어 import가 가볍고(.pyc로 미리 컴파일됨), 다른 모듈과 테스트에서도
+# streamlit 없이 가져다 쓸 수 있습니다. 모두 읽기 전용으로 사용합니다.
+
+
+# 감정별 색깔 정의 (8개로 확장)
+EMOTION_COLORS = {
+    "행복": "#FFD700",      # 황금색
+    "평온": "#87CEEB",      # 하늘색
+    "무기력": "#A9A9A9",    # 회색
+    "불안": "#FF6B6B",      # 연한 빨강
+    "슬픔": "#4169E1",      # 파랑
+    "화남": "#FF4500",      # 주황빨강
+    "희망": "#98FB98",      # 연두색
+    "감사": "#DDA0DD",      # 자주색
+    "외로움": "#6f42c1",    # 보라색
+    "분노": "#fd7e14",      # 주황색
+    "스트레스": "#e83e8c",  # 핫핑크
+    "혼란": "#17a2b8",      # 청록색
+    "좌절": "#28a745"       # 녹색
+}
+
+# 8개 확장 감정 정의
+EMOTIONS_CONFIG = {
+    "무기력": {
+        "icon": "😴",
+        "description": "에너지가 없고 아무것도 하기 싫음",
+        "color": "#6c757d",
+        "keywords": ["덩어리", "안개", "무거운 짐"]
+    },
+    "불안": {
+        "icon": "😰",
+        "description": "걱정되고 초조하며 불안함",
+        "color": "#dc3545",
+        "keywords": ["바람", "파도", "뒤틀림"]
+    },
+    "외로움": {
+        "icon": "😔",
+        "description": "혼자라는 느낌, 고립감",
+        "color": "#6f42c1",
+        "keywords": ["섬", "구멍", "텅 빔"]
+    },
+    "분노": {
+        "icon": "😤",
+        "description": "화가 나고 짜증나며 억울함",
+        "color": "#fd7e14",
+        "keywords": ["불", "폭발", "압박"]
+    },
+    "슬픔": {
+        "icon": "😢",
+        "description": "우울하고 기분이 가라앉음",
+        "color": "#20c997",
+        "keywords": ["비", "가라앉음", "어둠"]
+    },
+    "스트레스": {
+        "icon": "😵",
+        "description": "압박감과 긴장감, 과부하",
+        "color": "#e83e8c",
+        "keywords": ["조임", "짓눌림", "터질 것 같음"]
+    },
+    "혼란": {
+        "icon": "🤯",
+        "description": "무엇을 해야 할지 모르겠음",
+        "color": "#17a2b8",
+        "keywords": ["미로", "소용돌이", "뒤엉킴"]
+    },
+    "좌절": {
+        "icon": "😩",
+        "description": "뜻대로 되지 않아 답답함",
+        "color": "#28a745",
+        "keywords": ["막힘", "부딪힘", "갇힘"]
+    }
+}
+
+
+# 기본 콘텐츠 (data/contents.json이 없을 때 - 감정별 1개씩)
+DEFAULT_CONTENTS = {
+    "무기력": [
+        {
+            "id": "lethargy_001",
+            "title": "20대 무기력증, 이렇게 극복했어요",
+            "description": "무기력한 상태에서 벗어나는 작은 시작들",
+            "channel": "써니즈",
+            "url": "https://www.youtube.com/watch?v=sample1",
+            "duration": "12:30",
+            "tags": ["무기력", "20대", "극복"],
+            "content_type": "위로"
+        }
+    ],
+    "불안": [
+        {
+            "id": "anxiety_001",
+            "title": "불안할 때 3분 마음챙김",
+            "description": "즉시 사용 가능한 불안 완화 호흡법",
+            "channel": "마인드풀TV",
+            "url": "https://www.youtube.com/watch?v=sample2",
+            "duration": "5:30",
+            "tags": ["불안", "호흡법", "마음챙김"],
+            "content_type": "실용팁"
+        }
+    ],
+    "외로움": [
+        {
+            "id": "loneliness_001",
+            "title": "혼자여도 괜찮아, 외로움 다독이기",
+            "description": "외로움을 적이 아닌 친구로 받아들이는 방법",
+            "channel": "하루의 사랑작업",
+            "url": "https://www.youtube.com/watch?v=sample3",
+            "duration": "14:20",
+            "tags": ["외로움", "수용", "위로"],
+            "content_type": "위로"
+        }
+    ],
+    "분노": [
+        {
+            "id": "anger_001",
+            "title": "화날 때 감정 조절하는 법",
+            "description": "분노를 건설적으로 표현하고 다루는 방법",
+            "channel": "김상윤",
+            "url": "https://www.youtube.com/watch?v=sample4",
+            "duration": "11:15",
+            "tags": ["분노", "감정조절", "소통"],
+            "content_type": "실용팁"
+        }
+    ],
+    "슬픔": [
+        {
+            "id": "sadness_001",
+            "title": "슬플 때 마음을 달래는 방법",
+            "description": "슬픔을 받아들이고 위로받는 시간",
+            "channel": "나탐",
+            "url": "https://www.youtube.com/watch?v=sample5",
+            "duration": "16:40",
+            "tags": ["슬픔", "위로", "수용"],
+            "content_type": "위로"
+        }
+    ],
+    "스트레스": [
+        {
+            "id": "stress_001",
+            "title": "직장인 스트레스 해소법",
+            "description": "바쁜 일상 속에서 실천할 수 있는 스트레스 관리",
+            "channel": "김주환",
+            "url": "https://www.youtube.com/watch?v=sample6",
+            "duration": "13:40",
+            "tags": ["스트레스", "직장인", "해소법"],
+            "content_type": "실용팁"
+        }
+    ],
+    "혼란": [
+        {
+            "id": "confusion_001",
+            "title": "인생의 방향을 잃었을 때",
+            "description": "혼란스러운 시기를 지나는 지혜",
+            "channel": "러브포레스토",
+            "url": "https://www.youtube.com/watch?v=sample7",
+            "duration": "18:30",
+            "tags": ["혼란", "방향", "지혜"],
+            "content_type": "통찰"
+        }
+    ],
+    "좌절": [
+        {
+            "id": "frustration_001",
+            "title": "실패와 좌절을 성장으로 바꾸기",
+            "description": "좌절 경험을 통한 성장과 학습",
+            "channel": "정신과의사정우열",
+            "url": "https://www.youtube.com/watch?v=sample8",
+            "duration": "15:25",
+            "tags": ["좌절", "성장", "실패"],
+            "content_type": "성장"
+        }
+    ]
+}
+
+# 감정 탐색 2단계의 시점 선택지 (통찰 문구도 이 값으로 변형을 고름)
+TIMING_OPTIONS = ["방금 전부터", "오늘 아침부터", "며칠 전부터", "일주일 이상", "오래전부터"]
+
+# 통찰 문구 (data/insights.json이 없거나 해당 항목이 없을 때)
+DEFAULT_INSIGHT = {
+    "main_message": "힘든 감정을 느끼고 계시는군요. 이런 감정도 당신의 소중한 일부예요.",
+    "encouragement": "지금 이 순간을 있는 그대로 받아들여보세요."
+}
@@ -0,0 +1,381 @@
+# benchmark.py - 합성 데이터로 핫 함수 시간 측정
+#
+# 1) generate: 달력(1년/10년/100년), records.txt(10^3~10^6줄), 편지(최대 10^5통),
+#    콘텐츠 목록을 실제 파일 형식 그대로 만듭니다. (같은 seed면 같은 데이터)
+# 2) measure: 그 폴더에서 app.py 함수들을 Streamlit 없이(호출은 모두 대역으로 받음) 반복 실행해
+#    첫 호출(캐시 없음)과 반복 호출 시간을 잽니다.
+# 3) run: 규모별로 데이터를 만들고 규모마다 새 프로세스에서 measure를 돌려 JSON 하나로 모읍니다.
+#    결과 파일을 버전마다 남겨 두고 비교합니다.
+#
+#   python benchmark.py run --scale small medium --output bench.json
+#   python benchmark.py generate /tmp/bench --scale large
+#   python benchmark.py measure /tmp/bench --repeat 5
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# 규모별 데이터 크기
+SCALES = {
+    "small": {"calendar_days": 365, "records": 1_000, "letters": 1_000, "contents_per_emotion": 10},
+    "medium": {"calendar_days": 3_650, "records": 100_000, "letters": 10_000, "contents_per_emotion": 100},
+    "large": {"calendar_days": 36_500, "records": 1_000_000, "letters": 100_000, "contents_per_emotion": 1_000},
+}
+
+NOTE_WORDS = ["오늘은", "조금", "무거운", "마음", "이었지만", "산책을", "하고", "나아졌다", "내일은", "괜찮을", "거야"]
+
+
+# 데이터 생성
+def _note(rng):
+    return " ".join(rng.choices(NOTE_WORDS, k=rng.randint(3, 9)))
+
+
+def generate(base_dir, calendar_days, records, letters, contents_per_emotion, seed=0, today=None):
+    """base_dir에 FileStorage 형식의 합성 데이터 생성 - 실제로 만든 개수를 반환"""
+    from app_data import EMOTION_COLORS, EMOTIONS_CONFIG
+    from catalog import write_catalog
+    from records_log import format_record_line, rebuild_index
+
+    rng = random.Random(seed)
+    today = today or date.today()
+    emotions = list(EMOTION_COLORS)
+    os.makedirs(os.path.join(base_dir, "data"), exist_ok=True)
+
+    # 감정 달력: 오늘까지 calendar_days일, 가끔 빠진 날 포함 (최근 2주는 연속)
+    calendar_data = {}
+    for offset in range(calendar_days):
+        if offset > 14 and rng.random() < 0.15:
+            continue
+        emotion = rng.choice(emotions)
+        day = today - timedelta(days=offset)
+        calendar_data[day.isoformat()] = {
+            "emotion": emotion,
+            "note": _note(rng),
+            "color": EMOTION_COLORS[emotion],
+            "timestamp": f"{day.isoformat()} 21:00:00",
+        }
+    with open(os.path.join(base_dir, "emotion_calendar.json"), "w", encoding="utf-8") as f:
+        json.dump(calendar_data, f, ensure_ascii=False)
+
+    # records.txt: 오래된 순, 하루 여러 줄
+    start = datetime.combine(today, datetime.min.time()) - timedelta(days=max(calendar_days, 1))
+    step = (datetime.combine(today, datetime.min.time()) - start) / max(records, 1)
+    records_path = os.path.join(base_dir, "records.txt")
+    with open(records_path, "w", encoding="utf-8") as f:
+        for i in range(records):
+            timestamp = (start + step * i).strftime("%Y-%m-%d %H:%M:%S")
+            f.write(format_record_line(timestamp, _note(rng)) + "\n")
+    rebuild_index(records_path)
+
+    # 편지: 배송일은 2년 전 ~ 1년 후, 도착한 편지 대부분은 읽음
+    letter_list = []
+    for i in range(letters):
+        delivery = today + timedelta(days=rng.randint(-730, 365))
+        write_day = delivery - timedelta(days=rng.choice([7, 30, 90, 365]))
+        is_read = delivery <= today and rng.random() < 0.7
+        letter_list.append({
+            "id": f"letter-{i:06d}",
+            "title": "",
+            "content": _note(rng),
+            "write_date": write_day.isoformat(),
+            "delivery_date": delivery.isoformat(),
+            "is_read": is_read,
+            "read_date": f"{delivery.isoformat()} 09:00:00" if is_read else None,
+            "write_time": f"{write_day.isoformat()} 22:00:00",
+        })
+    with open(os.path.join(base_dir, "future_letters.json"), "w", encoding="utf-8") as f:
+        json.dump({"letters": letter_list}, f, ensure_ascii=False)
+
+    # 콘텐츠 목록
+    contents = {
+        emotion: [
+            {
+                "id": f"bench_{index}_{i:05d}",
+                "title": f"{emotion} 콘텐츠 {i}",
+                "description": _note(rng),
+                "channel": "벤치마크 채널",
+                "url": f"https://www.youtube.com/watch?v=bench{index}{i}",
+                "duration": f"{rng.randint(3, 30)}:{rng.randint(0, 59):02d}",
+                "tags": rng.sample(NOTE_WORDS, 3),
+                "content_type": "합성",
+            }
+            for i in range(contents_per_emotion)
+        ]
+        for index, emotion in enumerate(EMOTIONS_CONFIG)
+    }
+    with open(os.path.join(base_dir, "data", "contents.json"), "w", encoding="utf-8") as f:
+        json.dump(contents, f, ensure_ascii=False)
+    # 앱은 감정별 shard가 있으면 그쪽을 씀
+    write_catalog(contents, os.path.join(base_dir, "data", "contents"))
+    # 통찰 문구는 저장소에 있는 실제 파일을 그대로 씀
+    insights_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "insights.json")
+    if os.path.exists(insights_path):
+        shutil.copyfile(insights_path, os.path.join(base_dir, "data", "insights.json"))
+
+    return {
+        "calendar_days": len(calendar_data),
+        "records": records,
+        "letters": letters,
+        "contents": contents_per_emotion * len(contents),
+    }
+
+
+# Streamlit 대역
+class _SessionState(dict):
+    """st.session_state처럼 속성/키 양쪽으로 접근"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+class StreamlitStub:
+    """st.* 호출을 그리지 않고 받아 넘기는 헤드리스 대역 - 버튼은 항상 눌리지 않음"""
+
+    def __init__(self, session_state=None):
+        object.__setattr__(self, "session_state", _SessionState(session_state or {}))
+        object.__setattr__(self, "calls", 0)
+
+    def _noop(self, *args, **kwargs):
+        object.__setattr__(self, "calls", self.calls + 1)
+        return self
+
+    def __getattr__(self, name):
+        return self._noop
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def columns(self, spec, **kwargs):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    def tabs(self, names):
+        return [self] * len(names)
+
+    def button(self, *args, **kwargs):
+        return False
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return value if value is not None else min_value
+
+    def radio(self, label, options, index=0, **kwargs):
+        return list(options)[index]
+
+    # 상태를 추적하는 expander의 펼침 여부 - 닫힌 상태로 측정
+    open = False
+
+
+# 측정
+def _time(fn, repeat, setup=None):
+    timings = []
+    for _ in range(repeat + 1):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    first, rest = timings[0], timings[1:]
+    return {
+        "first_ms": round(first, 3),
+        "min_ms": round(min(rest), 3),
+        "median_ms": round(statistics.median(rest), 3),
+        "mean_ms": round(statistics.fmean(rest), 3),
+        "repeat": repeat,
+    }
+
+
+def benchmark_cases(app):
+    """(이름, 함수, 준비 함수) 목록 - 준비 함수는 매 반복 전에 호출"""
+    import analytics
+    import calendar_render
+    import catalog
+    import heatmap
+    import ranking
+    from read_cache import shared_cache
+
+    today = date.today()
+    today_str = today.isoformat()
+    month_start = today.replace(day=1).isoformat()
+    calendar_data = app.load_emotion_calendar()
+
+    def clear_caches():
+        shared_cache.clear()
+        calendar_render.render_cache.clear()
+        analytics.history_cache.clear()
+
+    def mood_history():
+        return analytics.load(None, app.user_storage())
+
+    def mailbox_data():
+        storage = app.user_storage()
+        headers = storage.letter_headers(0, app.LETTERS_PER_PAGE)
+        body = storage.letter_body(headers[0]["id"]) if headers else None
+        return headers, body, storage.mailbox_counts()
+
+    def month_calendar():
+        storage = app.user_storage()
+        return calendar_render.month_html(
+            None, today.year, today.month, storage.calendar_version(),
+            lambda: storage.calendar_between(month_start, today_str),
+        )
+
+    def year_heatmap():
+        frame = heatmap.calendar_frame(app.load_emotion_calendar())
+        return heatmap.heatmap_svg(frame, today.year, today.year, app.EMOTION_COLORS)
+
+    # 배송 스케줄러가 하던 일 - 배송일이 지난 편지를 도착 상태로 (편지함은 도착 상태만 읽음)
+    app.user_storage().deliver_due(datetime.now())
+    first_letter_id = next(iter(app.user_storage().letter_headers(0, 1)), {}).get("id")
+    catalog_items = app.load_emotion_contents("불안")
+    vote_positions = iter(range(10 ** 9))
+    feedback_titles = iter(range(10 ** 9))
+    return [
+        ("load_emotion_calendar.cold", app.load_emotion_calendar, clear_caches),
+        ("load_emotion_calendar", app.load_emotion_calendar, None),
+        ("calculate_streak", lambda: app.calculate_streak(calendar_data), None),
+        ("emotion_stats", lambda: app.user_storage().emotion_stats(), None),
+        ("save_emotion_day", lambda: app.save_emotion_day(today_str, calendar_data.get(today_str)), None),
+        ("month_calendar_html.cold", month_calendar, clear_caches),
+        ("month_calendar_html", month_calendar, None),
+        ("year_heatmap_svg", year_heatmap, None),
+        ("analytics.load.cold", mood_history, clear_caches),
+        ("analytics.rolling_share", lambda: mood_history().rolling_share(30, last=app.TREND_DAYS), None),
+        ("analytics.seasonality", lambda: mood_history().seasonality("month"), None),
+        ("analytics.transitions", lambda: mood_history().transitions(), None),
+        ("show_emotion_trends", app.show_emotion_trends, None),
+        ("get_new_letters_count.cold", app.get_new_letters_count, clear_caches),
+        ("get_new_letters_count", app.get_new_letters_count, None),
+        ("deliver_due", lambda: app.user_storage().deliver_due(datetime.now()), None),
+        ("show_simple_mailbox.data", mailbox_data, None),
+        ("show_simple_mailbox", app.show_simple_mailbox, None),
+        ("mark_letter_read", lambda: app.user_storage().mark_letter_read(
+            first_letter_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ), None),
+        ("show_recent_records", app.show_recent_records, None),
+        ("records_between.month", lambda: app.user_storage().records_between(month_start, today_str + " 23:59:59"), None),
+        ("save_emotion_record", lambda: app.save_emotion_record("벤치마크 기록"), None),
+        ("load_contents", app.load_contents, None),
+        ("load_emotion_contents.cold", lambda: catalog.Catalog(poll_seconds=0).current().items("불안"), None),
+        ("load_emotion_contents", lambda: app.load_emotion_contents("불안"), None),
+        ("save_content_feedback", lambda: app.save_content_feedback(f"콘텐츠 {next(feedback_titles)}", True, emotion="불안"), None),
+        ("feedback_counts", lambda: app.user_storage().feedback_counts(), None),
+        ("ranking.top_contents", lambda: ranking.top_contents("불안", catalog_items, 3), None),
+        ("ranking.record_vote", lambda: ranking.record_vote(
+            "불안", ranking.item_key(catalog_items[-1]), len(catalog_items) - 1, next(vote_positions) % 3 > 0
+        ), None),
+        ("get_emotion_insights", lambda: app.get_emotion_insights("불안", "안개", "방금 전부터", "과제"), None),
+        ("recommend_content", lambda: app.recommend_content("불안"), None),
+    ]
+
+
+def measure(base_dir, repeat=5, only=None):
+    """base_dir 데이터로 핫 함수들 시간 측정 - base_dir로 이동하므로 별도 프로세스에서 호출"""
+    os.chdir(base_dir)
+    import app
+
+    app.st = StreamlitStub({"session_id": "benchmark"})
+    results = {}
+    for name, fn, setup in benchmark_cases(app):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        results[name] = _time(fn, repeat, setup)
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scales, repeat=5, only=None, seed=0):
+    """규모별로 데이터를 만들고 새 프로세스에서 측정 - 비교용 보고서 dict"""
+    report = {
+        "revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "repeat": repeat,
+        "scales": {},
+    }
+    script = os.path.abspath(__file__)
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f"mindful_bench_{scale}_") as base_dir:
+            started = time.perf_counter()
+            sizes = generate(base_dir, seed=seed, **SCALES[scale])
+            generate_seconds = time.perf_counter() - started
+
+            command = [sys.executable, script, "measure", base_dir, "--repeat", str(repeat)]
+            if only:
+                command += ["--only", *only]
+            result = subprocess.run(command, capture_output=True, text=True, cwd=os.path.dirname(script))
+            if result.returncode != 0:
+                raise RuntimeError(f"{scale} 측정 실패:\n{result.stderr}")
+            report["scales"][scale] = {
+                "sizes": sizes,
+                "generate_seconds": round(generate_seconds, 2),
+                "results": json.loads(result.stdout),
+            }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="마음의 나침반 벤치마크")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="규모별 데이터 생성 + 측정")
+    run_parser.add_argument("--scale", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--only", nargs="+", help="이 이름으로 시작하는 항목만 측정")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+
+    generate_parser = subparsers.add_parser("generate", help="합성 데이터만 생성")
+    generate_parser.add_argument("base_dir")
+    generate_parser.add_argument("--scale", choices=list(SCALES), default="small")
+    generate_parser.add_argument("--seed", type=int, default=0)
+
+    measure_parser = subparsers.add_parser("measure", help="기존 데이터 폴더에서 측정 (JSON 출력)")
+    measure_parser.add_argument("base_dir")
+    measure_parser.add_argument("--repeat", type=int, default=5)
+    measure_parser.add_argument("--only", nargs="+")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        print(json.dumps(generate(args.base_dir, seed=args.seed, **SCALES[args.scale]), ensure_ascii=False))
+    elif args.command == "measure":
+        # 측정 중 앱이 찍는 출력이 결과 JSON에 섞이지 않도록
+        with contextlib.redirect_stdout(sys.stderr):
+            results = measure(os.path.abspath(args.base_dir), args.repeat, args.only)
+        print(json.dumps(results, ensure_ascii=False))
+    else:
+        report = run(args.scale, args.repeat, args.only, args.seed)
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        print(text)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# calendar_journal.py - 감정 달력 저널(append-only) 저장소
+#
+# 하루치 저장은 저널 파일에 한 줄(JSONL)만 덧붙이고,
+# 스냅샷(emotion_calendar.json)은 압축(compaction) 시에만 다시 씁니다.
+# 로드 = 스냅샷 + 압축 중인 저널 + 현재 저널 재생(replay)
+# 저널 추가/압축/스냅샷 저장은 <스냅샷>.lock 권고 잠금으로 프로세스 간 직렬화합니다.
+
+import json
+import os
+import threading
+
+from write_coordinator import atomic_write_json, file_lock
+
+JOURNAL_SUFFIX = ".journal"
+COMPACTING_SUFFIX = ".compacting"
+
+# 저널이 이 크기(바이트)를 넘으면 백그라운드에서 압축
+COMPACT_THRESHOLD_BYTES = 256 * 1024
+
+_compact_lock = threading.Lock()
+
+
+def journal_path(snapshot_path):
+    """스냅샷 경로에 대응하는 저널 경로"""
+    return snapshot_path + JOURNAL_SUFFIX
+
+
+def _read_snapshot(snapshot_path):
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def _replay(path, calendar_data):
+    """저널 파일의 기록을 순서대로 적용 (마지막 줄이 잘린 경우 무시)"""
+    if not os.path.exists(path):
+        return calendar_data
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 쓰다 만 마지막 줄 - 저장이 완료되지 않은 기록
+                continue
+            if record.get("entry") is None:
+                calendar_data.pop(record["date"], None)
+            else:
+                calendar_data[record["date"]] = record["entry"]
+    return calendar_data
+
+
+def load_calendar(snapshot_path):
+    """스냅샷과 저널을 합쳐 달력 상태 복원"""
+    calendar_data = _read_snapshot(snapshot_path)
+    journal = journal_path(snapshot_path)
+    _replay(journal + COMPACTING_SUFFIX, calendar_data)
+    _replay(journal, calendar_data)
+    return calendar_data
+
+
+def append_entry(snapshot_path, day, entry):
+    """하루치 기록을 저널에 추가 (entry가 None이면 삭제 기록)"""
+    journal = journal_path(snapshot_path)
+    data = (json.dumps({"date": day, "entry": entry}, ensure_ascii=False) + "\n").encode("utf-8")
+    # 저널 추가와 압축 중 저널 교체(rename)가 겹치지 않도록 잠금
+    with file_lock(snapshot_path):
+        with open(journal, "a+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    # 앞선 추가가 줄 중간에서 끊김 - 새 기록이 그 줄에 붙어 함께 버려지지 않도록 줄을 끝냄
+                    data = b"\n" + data
+            f.write(data)
+            size += len(data)
+
+    if size >= COMPACT_THRESHOLD_BYTES:
+        compact_in_background(snapshot_path)
+
+
+def write_snapshot(snapshot_path, calendar_data):
+    """전체 스냅샷을 원자적으로 저장하고 저널 비우기"""
+    with _compact_lock, file_lock(snapshot_path):
+        atomic_write_json(snapshot_path, calendar_data)
+        discard_journals(snapshot_path)
+
+
+def discard_journals(snapshot_path):
+    """스냅샷에 이미 반영된 저널 파일 삭제 - 호출자가 잠금을 쥐고 있어야 함"""
+    journal = journal_path(snapshot_path)
+    for path in (journal, journal + COMPACTING_SUFFIX):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def compact(snapshot_path):
+    """저널을 스냅샷에 합치기 - 압축된 기록 수 반환"""
+    journal = journal_path(snapshot_path)
+    compacting = journal + COMPACTING_SUFFIX
+
+    with _compact_lock, file_lock(snapshot_path):
+        # 이전 압축이 중단되었다면 남은 파일부터 처리
+        if not os.path.exists(compacting):
+            if not os.path.exists(journal):
+                return 0
+            # 저장은 새 저널 파일로 계속되고, 기존 저널만 접어 넣음
+            os.replace(journal, compacting)
+
+        calendar_data = _read_snapshot(snapshot_path)
+        with open(compacting, "r", encoding="utf-8") as f:
+            folded = sum(1 for line in f if line.strip())
+        _replay(compacting, calendar_data)
+        atomic_write_json(snapshot_path, calendar_data)
+        os.remove(compacting)
+    return folded
+
+
+def compact_in_background(snapshot_path):
+    """백그라운드 스레드에서 압축 실행 (이미 진행 중이면 건너뜀)"""
+    if _compact_lock.locked():
+        return None
+    thread = threading.Thread(
+        target=compact, args=(snapshot_path,), name="calendar-compaction", daemon=True
+    )
+    thread.start()
+    return thread
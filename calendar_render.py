@@ -0,0 +1,63 @@
+# calendar_render.py - 월 달력을 HTML 한 덩어리로 렌더링
+#
+# 기존 방식은 주마다 st.columns(7)을 만들고 날짜마다 st.markdown을 호출해
+# 한 달에 40개가 넘는 요소를 매 rerun마다 보냈습니다.
+# 여기서는 요일 헤더와 날짜 칸을 CSS grid 하나로 만들어 요소 하나로 보내고,
+# (사용자, 연, 월, 달력 데이터 버전)별로 결과 HTML을 캐시합니다.
+
+import calendar
+import html
+import os
+
+from read_cache import FileCache
+
+WEEKDAY_NAMES = ['월', '화', '수', '목', '금', '토', '일']
+
+# "html"(요소 하나) 또는 "columns"(기존 날짜별 요소)
+RENDER_MODE = os.environ.get("MINDFUL_CALENDAR_RENDER", "html")
+
+# 버전이 키에 들어 있으므로 파일 서명 없이 LRU로만 사용
+render_cache = FileCache(max_entries=int(os.environ.get("MINDFUL_RENDER_CACHE_ENTRIES", "256")))
+
+DAY_STYLE = (
+    "width: 40px; height: 40px; border-radius: 50%; display: flex; "
+    "align-items: center; justify-content: center; margin: 5px auto;"
+)
+
+
+def _day_cell(day, entry):
+    if entry is None:
+        return (
+            f'<div style="{DAY_STYLE} background-color: #f0f0f0; border: 1px solid #ddd;">'
+            f'{day}</div>'
+        )
+    tooltip = html.escape(f"{entry['emotion']}: {entry['note']}", quote=True)
+    color = html.escape(entry["color"], quote=True)
+    return (
+        f'<div style="{DAY_STYLE} background-color: {color}; border: 2px solid #ddd; cursor: pointer;" '
+        f'title="{tooltip}"><strong>{day}</strong></div>'
+    )
+
+
+def build_month_html(year, month, month_data):
+    """한 달 달력 HTML - month_data는 {"YYYY-MM-DD": 기록}"""
+    cells = [f'<div style="padding: 0.25rem 0;"><strong>{name}</strong></div>' for name in WEEKDAY_NAMES]
+    for week in calendar.monthcalendar(year, month):
+        for day in week:
+            if day == 0:
+                cells.append("<div></div>")
+            else:
+                cells.append(_day_cell(day, month_data.get(f"{year}-{month:02d}-{day:02d}")))
+
+    return (
+        '<div style="display: grid; grid-template-columns: repeat(7, 1fr); gap: 0.25rem; text-align: center;">'
+        + "".join(cells)
+        + "</div>"
+    )
+
+
+def month_html(owner, year, month, version, load_month):
+    """캐시된 월 달력 HTML - 버전이 같으면 load_month()를 부르지 않음"""
+    return render_cache.get(
+        (owner, year, month, version), [], lambda: build_month_html(year, month, load_month())
+    )
@@ -0,0 +1,241 @@
+# calendar_table.py - 열 배열로 묶은 읽기 전용 감정 달력
+#
+# {"YYYY-MM-DD": {"emotion", "note", "color", "timestamp"}}를 하루에 파이썬 dict 하나씩 두는 대신
+# 날짜순 열 배열로 보관합니다 (하루 약 33바이트 + 메모 글자).
+#   ordinals   : 날짜 서수 array('i')
+#   codes      : 감정 번호 array('H') (emotion_registry)
+#   colors     : 색 array('I') (emotion_registry.pack_color)
+#   note_ids   : 메모 번호 array('I') - 같은 메모는 한 번만, 메모 표는 문자열 하나 + 시작 위치 배열
+#   timestamps : 저장 시각 "YYYY-MM-DD HH:MM:SS"를 19글자씩 이어 붙인 문자열 (없으면 공백 19개)
+# 이 형식으로 되돌릴 수 없는 기록(키가 다르거나, 감정이 레지스트리에 없거나, 메모가 None이거나,
+# 색/시각 형식이 다른 기록)은 원래 dict 그대로 따로 두므로, 어떤 달력이든 읽어서 돌려주는 값은 원래와 같습니다.
+#
+# 기존 dict 달력과 같은 Mapping 인터페이스(len, in, [날짜], get, items...)를 제공하고,
+# 기간 조회(between)는 이분 탐색, 감정별 일수와 히트맵/연속 기록용 열은 배열에서 바로 만듭니다.
+# 항목은 꺼낼 때마다 새 dict로 만들어 주므로 고쳐도 캐시된 달력에는 영향이 없습니다.
+
+import bisect
+from array import array
+from collections import Counter
+from collections.abc import ItemsView, Mapping, ValuesView
+from datetime import date
+
+from emotion_registry import pack_color, registry, unpack_color
+
+ENTRY_KEYS = ("emotion", "note", "color", "timestamp")
+COLUMNS = ("ordinals", "codes", "colors", "note_ids")
+TIMESTAMP_WIDTH = 19
+NO_TIMESTAMP = " " * TIMESTAMP_WIDTH
+# 배열에 담지 못한 기록의 감정 번호 자리
+OTHER_CODE = 0xFFFF
+
+
+def _ordinal(day):
+    return date.fromisoformat(day).toordinal()
+
+
+def _day(ordinal):
+    return date.fromordinal(ordinal).isoformat()
+
+
+class CalendarTable(Mapping):
+    """날짜순 열 배열 감정 달력 - 여러 세션이 공유하므로 읽기 전용"""
+
+    __slots__ = ("ordinals", "codes", "colors", "note_ids", "_timestamps", "_note_text", "_note_offsets", "_others")
+
+    def __init__(self):
+        self.ordinals = array("i")
+        self.codes = array("H")
+        self.colors = array("I")
+        self.note_ids = array("I")
+        self._timestamps = ""
+        self._note_text = ""
+        self._note_offsets = array("I", [0])
+        # 위치 → 배열에 담지 못한 원래 기록
+        self._others = {}
+
+    @classmethod
+    def from_items(cls, items):
+        """(날짜, 기록)들로 만들기 - 날짜는 겹치지 않아야 하며 순서는 상관없음"""
+        table = cls()
+        columns = ordinals, codes, colors, note_id_column, timestamps = [], [], [], [], []
+        # 감정, 색, 메모는 같은 값이 많으므로 한 번만 변환/보관
+        # (수만 일을 한 번에 읽으므로 하루 단위 일은 함수 호출 없이 이 루프 안에서)
+        emotion_codes = {}
+        packed_colors = {}
+        note_ids = {}
+        others = {}
+        previous = -1
+        ordered = True
+        for day, entry in items:
+            ordinal = _ordinal(day)
+            if ordinal <= previous:
+                ordered = False
+            previous = ordinal
+
+            code = packed_color = note = None
+            try:
+                # 키가 정확히 ENTRY_KEYS인 기록만 배열로
+                if len(entry) == len(ENTRY_KEYS):
+                    emotion, note, color, timestamp = entry["emotion"], entry["note"], entry["color"], entry["timestamp"]
+                    if isinstance(emotion, str):
+                        # 레지스트리에 없는 감정은 번호 없이 (아래에서 원래 dict로)
+                        code = emotion_codes.get(emotion)
+                        if code is None and emotion not in emotion_codes:
+                            code = emotion_codes[emotion] = registry.code(emotion)
+                    if isinstance(color, str):
+                        packed_color = packed_colors.get(color)
+                        if packed_color is None and color not in packed_colors:
+                            packed_color = packed_colors[color] = pack_color(color)
+                    if timestamp is None:
+                        timestamp = NO_TIMESTAMP
+                    elif not isinstance(timestamp, str) or len(timestamp) != TIMESTAMP_WIDTH or timestamp == NO_TIMESTAMP:
+                        code = None
+            except KeyError:
+                code = None
+            if code is None or code >= OTHER_CODE or packed_color is None or not isinstance(note, str):
+                others[len(ordinals)] = dict(entry)
+                code, packed_color, note, timestamp = OTHER_CODE, 0, "", NO_TIMESTAMP
+
+            ordinals.append(ordinal)
+            codes.append(code)
+            colors.append(packed_color)
+            note_id_column.append(note_ids.setdefault(note, len(note_ids)))
+            timestamps.append(timestamp)
+
+        if not ordered:
+            order = sorted(range(len(ordinals)), key=ordinals.__getitem__)
+            columns = [[column[i] for i in order] for column in columns]
+            position = {old: new for new, old in enumerate(order)}
+            others = {position[old]: entry for old, entry in others.items()}
+        for name, values in zip(COLUMNS, columns):
+            getattr(table, name).fromlist(values)
+        table._timestamps = "".join(columns[-1])
+        table._others = others
+        notes = list(note_ids)
+        table._note_text = "".join(notes)
+        offsets = table._note_offsets
+        for note in notes:
+            offsets.append(offsets[-1] + len(note))
+        return table
+
+    @classmethod
+    def from_dict(cls, calendar_data):
+        return cls.from_items(calendar_data.items())
+
+    def _note(self, note_id):
+        return self._note_text[self._note_offsets[note_id]:self._note_offsets[note_id + 1]]
+
+    def _timestamp(self, position):
+        start = position * TIMESTAMP_WIDTH
+        timestamp = self._timestamps[start:start + TIMESTAMP_WIDTH]
+        return None if timestamp == NO_TIMESTAMP else timestamp
+
+    def _entry(self, position):
+        other = self._others.get(position)
+        if other is not None:
+            return dict(other)
+        return {
+            "emotion": registry.name(self.codes[position]),
+            "note": self._note(self.note_ids[position]),
+            "color": unpack_color(self.colors[position]),
+            "timestamp": self._timestamp(position),
+        }
+
+    def _position(self, day):
+        """날짜의 위치 (없으면 None)"""
+        try:
+            ordinal = _ordinal(day)
+        except (TypeError, ValueError):
+            return None
+        position = bisect.bisect_left(self.ordinals, ordinal)
+        if position < len(self.ordinals) and self.ordinals[position] == ordinal:
+            return position
+        return None
+
+    # Mapping
+    def __len__(self):
+        return len(self.ordinals)
+
+    def __iter__(self):
+        for ordinal in self.ordinals:
+            yield _day(ordinal)
+
+    def __contains__(self, day):
+        return self._position(day) is not None
+
+    def __getitem__(self, day):
+        position = self._position(day)
+        if position is None:
+            raise KeyError(day)
+        return self._entry(position)
+
+    def items(self):
+        return _Items(self)
+
+    def values(self):
+        return _Values(self)
+
+    def __repr__(self):
+        return f"<CalendarTable {len(self)} days>"
+
+    # 배열에서 바로 계산하는 조회
+    def between(self, start_day, end_day):
+        """start_day~end_day(포함) 기간의 {날짜: 기록}"""
+        start = bisect.bisect_left(self.ordinals, _ordinal(start_day))
+        end = bisect.bisect_right(self.ordinals, _ordinal(end_day))
+        return {_day(self.ordinals[i]): self._entry(i) for i in range(start, end)}
+
+    def last_day(self):
+        """마지막 기록일 (없으면 None)"""
+        return _day(self.ordinals[-1]) if self.ordinals else None
+
+    def emotion_counts(self):
+        """감정별 기록 일수"""
+        counts = Counter()
+        for code, count in Counter(self.codes).items():
+            if code != OTHER_CODE:
+                counts[registry.name(code)] = count
+        for entry in self._others.values():
+            counts[entry["emotion"]] += 1
+        return dict(counts)
+
+    def emotions(self):
+        """날짜순 감정 이름 목록"""
+        names = registry.names
+        emotions = [names[code] if code != OTHER_CODE else None for code in self.codes]
+        for position, entry in self._others.items():
+            emotions[position] = entry.get("emotion")
+        return emotions
+
+    def columns(self, keys=ENTRY_KEYS):
+        """{"emotion": [...], "note": [...], ...} - keys 열만 날짜순으로"""
+        columns = {}
+        if "emotion" in keys:
+            columns["emotion"] = self.emotions()
+        if "note" in keys:
+            notes = [self._note(note_id) for note_id in range(len(self._note_offsets) - 1)]
+            columns["note"] = [notes[note_id] for note_id in self.note_ids]
+        if "color" in keys:
+            unpacked = {color: unpack_color(color) for color in set(self.colors)}
+            columns["color"] = [unpacked[color] for color in self.colors]
+        if "timestamp" in keys:
+            columns["timestamp"] = [self._timestamp(position) for position in range(len(self))]
+        for position, entry in self._others.items():
+            for key in columns:
+                columns[key][position] = entry.get(key)
+        return columns
+
+
+class _Items(ItemsView):
+    def __iter__(self):
+        table = self._mapping
+        for position, ordinal in enumerate(table.ordinals):
+            yield _day(ordinal), table._entry(position)
+
+
+class _Values(ValuesView):
+    def __iter__(self):
+        table = self._mapping
+        for position in range(len(table)):
+            yield table._entry(position)
@@ -0,0 +1,198 @@
+# catalog.py - 감정별로 나눈 콘텐츠 카탈로그 (지연 로드 + 무중단 교체)
+#
+# data/contents/ 아래에 감정마다 shard 파일 하나와 작은 manifest.json을 둡니다.
+#   manifest.json : {"version": ..., "shards": {감정: {"file": "shard-<해시>.json", "count": n}}}
+# shard 파일 이름은 내용 해시라서 한 번 쓰면 바뀌지 않고, manifest.json 교체가 유일한 전환점입니다.
+# CatalogSnapshot은 manifest 하나에 고정된 읽기 전용 카탈로그로, 처음 요청된 감정의 shard만 파싱합니다.
+# Catalog는 manifest(또는 예전 contents.json)의 서명을 주기적으로 확인하는 감시 스레드를 두고,
+# 바뀌면 새 스냅샷을 만들어 참조 하나를 바꿔 끼웁니다 - 진행 중인 rerun은 이전 스냅샷을 끝까지 씁니다.
+# manifest가 없으면 예전 data/contents.json 한 파일(또는 app_data.DEFAULT_CONTENTS)을 씁니다.
+#
+#   python catalog.py build                       # data/contents.json → data/contents/ shard
+#   python catalog.py build --source new.json     # 새 카탈로그 배포 (서버 재시작 불필요)
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+from read_cache import file_signature
+from write_coordinator import atomic_write_json, file_lock
+
+CATALOG_DIR = os.environ.get("MINDFUL_CATALOG_DIR", os.path.join("data", "contents"))
+LEGACY_PATH = os.path.join("data", "contents.json")
+MANIFEST_NAME = "manifest.json"
+POLL_SECONDS = float(os.environ.get("MINDFUL_CATALOG_POLL_SECONDS", "2"))
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class CatalogSnapshot:
+    """manifest 하나에 고정된 카탈로그 - 감정별 shard는 처음 쓸 때 읽음 (반환값은 읽기 전용)"""
+
+    def __init__(self, manifest, directory=None, shards=None):
+        self.manifest = manifest
+        self.version = manifest.get("version")
+        self.directory = directory
+        self._shards = dict(shards or {})
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_contents(cls, contents, version=None):
+        """{감정: [콘텐츠, ...]} 전체로 만든 스냅샷 (예전 단일 파일, 기본 콘텐츠)"""
+        manifest = {
+            "version": version,
+            "shards": {emotion: {"count": len(items)} for emotion, items in contents.items()},
+        }
+        return cls(manifest, shards=contents)
+
+    def emotions(self):
+        return list(self.manifest["shards"])
+
+    def count(self, emotion):
+        """shard를 읽지 않고 콘텐츠 개수"""
+        info = self.manifest["shards"].get(emotion)
+        return info["count"] if info else 0
+
+    def items(self, emotion):
+        """감정 하나의 콘텐츠 목록 - 없는 감정이면 빈 목록"""
+        shard = self._shards.get(emotion)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.get(emotion)
+                if shard is None:
+                    shard = self._load_shard(emotion)
+                    self._shards[emotion] = shard
+        return shard
+
+    def _load_shard(self, emotion):
+        info = self.manifest["shards"].get(emotion)
+        if info is None or self.directory is None:
+            return []
+        return _read_json(os.path.join(self.directory, info["file"]))
+
+    def loaded_emotions(self):
+        return [emotion for emotion in self.emotions() if emotion in self._shards]
+
+    def all(self):
+        """전체 카탈로그 {감정: [...]} - 모든 shard를 읽음"""
+        return {emotion: self.items(emotion) for emotion in self.emotions()}
+
+
+class Catalog:
+    """현재 스냅샷을 들고 있다가 카탈로그 파일이 바뀌면 새 스냅샷으로 교체"""
+
+    def __init__(self, directory=CATALOG_DIR, legacy_path=LEGACY_PATH, poll_seconds=POLL_SECONDS, default=None):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self.legacy_path = legacy_path
+        self.poll_seconds = poll_seconds
+        # 카탈로그 파일이 하나도 없을 때 쓸 {감정: [...]}
+        self.default = default
+        self.swaps = 0
+        self._snapshot = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def _current_signature(self):
+        return file_signature([self.manifest_path, self.legacy_path])
+
+    def _build(self, signature):
+        if signature[0] is not None:
+            return CatalogSnapshot(_read_json(self.manifest_path), directory=self.directory)
+        if signature[1] is not None:
+            return CatalogSnapshot.from_contents(_read_json(self.legacy_path), version=str(signature[1]))
+        return CatalogSnapshot.from_contents(self.default or {}, version="default")
+
+    def check(self):
+        """파일이 바뀌었으면 새 스냅샷으로 교체 - 교체했으면 True"""
+        with self._lock:
+            # 서명을 먼저 읽으므로, 만드는 도중 바뀌면 다음 확인에서 다시 교체됨
+            signature = self._current_signature()
+            if self._snapshot is not None and signature == self._signature:
+                return False
+            snapshot = self._build(signature)
+            if self._snapshot is not None:
+                # 이미 쓰던 감정은 미리 읽어 두어 교체 직후 첫 요청이 느려지지 않게
+                for emotion in self._snapshot.loaded_emotions():
+                    snapshot.items(emotion)
+                self.swaps += 1
+            self._snapshot, self._signature = snapshot, signature
+            return True
+
+    def current(self):
+        """지금 카탈로그 스냅샷 - 처음 호출 시 감시 스레드 시작"""
+        if self._snapshot is None:
+            self.check()
+            self.start_watcher()
+        return self._snapshot
+
+    def start_watcher(self):
+        if not self.poll_seconds or self._watcher is not None:
+            return
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, name="catalog-watcher", daemon=True)
+                self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.check()
+            except (OSError, ValueError, KeyError):
+                # 쓰는 도중이거나 잘못된 파일 - 기존 스냅샷을 계속 쓰고 다음 주기에 다시 확인
+                continue
+
+
+def _shard_bytes(items):
+    return json.dumps(items, ensure_ascii=False, sort_keys=True).encode("utf-8")
+
+
+def write_catalog(contents, directory=CATALOG_DIR):
+    """{감정: [...]}를 shard + manifest로 배포 - manifest 교체 한 번으로 전환됨"""
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    shards = {}
+    for emotion, items in contents.items():
+        filename = f"shard-{hashlib.sha1(_shard_bytes(items)).hexdigest()[:16]}.json"
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            atomic_write_json(path, items)
+        shards[emotion] = {"file": filename, "count": len(items)}
+
+    version = hashlib.sha1(json.dumps(shards, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    manifest = {"version": version, "shards": shards}
+    with file_lock(manifest_path):
+        previous = _read_json(manifest_path) if os.path.exists(manifest_path) else {"shards": {}}
+        atomic_write_json(manifest_path, manifest)
+
+        # 이전 세대 shard는 교체 직전 스냅샷이 아직 읽을 수 있으므로 남기고, 그보다 오래된 것만 정리
+        keep = {info["file"] for info in shards.values()} | {info["file"] for info in previous["shards"].values()}
+        for filename in os.listdir(directory):
+            if filename.startswith("shard-") and filename.endswith(".json") and filename not in keep:
+                os.remove(os.path.join(directory, filename))
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="콘텐츠 카탈로그 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="contents.json 형식 파일을 감정별 shard로 배포")
+    build_parser.add_argument("--source", default=LEGACY_PATH)
+    build_parser.add_argument("--dir", default=CATALOG_DIR)
+    args = parser.parse_args(argv)
+
+    manifest = write_catalog(_read_json(args.source), args.dir)
+    counts = {emotion: info["count"] for emotion, info in manifest["shards"].items()}
+    print(json.dumps({"version": manifest["version"], "counts": counts}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
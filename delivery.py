@@ -0,0 +1,164 @@
+# delivery.py - 미래 편지 배송 스케줄러
+#
+# 편지는 배송일 자정(서버 현지 시각)이 지나면 한 번만 "도착" 상태가 되고 도착 시각(delivered_at)이 기록됩니다.
+# 화면은 배송일을 오늘 날짜와 비교하지 않고, 저장소에 기록된 도착 상태만 읽습니다.
+#
+# 배송은 두 가지 방법으로 일어납니다.
+#   - DeliveryScheduler: 앱 프로세스 안의 백그라운드 스레드. (다음 배송 시각, 사용자) 최소 힙을 두고
+#     맨 앞 시각까지 잠들었다가 그 사용자의 storage.deliver_due(now)를 부르고 다음 배송일을 다시 넣습니다.
+#     세션이 시작될 때 watch(user_id)로 그 사용자를 올리며, 이미 지난 배송은 그 자리에서 처리합니다.
+#   - python delivery.py tick: data/users/ 아래 모든 사용자를 한 번 배송 (cron용)
+# 저장소의 deliver_due는 잠금(또는 조건부 UPDATE) 안에서 아직 도착하지 않은 편지만 바꾸므로,
+# 스레드와 cron이 여러 프로세스에서 함께 돌아도 편지마다 정확히 한 번 도착합니다.
+#
+#   python delivery.py tick       # */10 * * * * 같은 cron 항목으로
+
+import argparse
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, time as day_start
+
+import storage
+
+# 힙이 비었거나 다음 배송이 멀어도 이 간격마다 깨어나 시계 변경 등을 반영
+MAX_SLEEP_SECONDS = 3600
+# 배송 중 오류가 나면 이만큼 뒤에 다시 시도
+RETRY_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+
+def due_timestamp(delivery_date):
+    """'YYYY-MM-DD' 배송일 → 그날 0시의 epoch 초"""
+    return datetime.combine(date.fromisoformat(delivery_date), day_start.min).timestamp()
+
+
+class DeliveryScheduler:
+    """사용자별 다음 배송 시각 최소 힙 + 백그라운드 스레드"""
+
+    def __init__(self, storage_for=storage.get_storage, clock=time.time):
+        self.storage_for = storage_for
+        self.clock = clock
+        self.delivered = 0
+        self._heap = []
+        # 사용자별로 힙에 올라가 있는 가장 이른 시각 (뒤늦게 꺼낸 오래된 항목은 건너뜀)
+        self._scheduled = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def schedule(self, user_id, delivery_date):
+        """user_id의 편지가 delivery_date에 도착해야 함을 알림 (새 편지를 쓴 뒤 호출)"""
+        self._push(user_id, due_timestamp(delivery_date))
+
+    def _push(self, user_id, due):
+        with self._cond:
+            current = self._scheduled.get(user_id)
+            if current is not None and current <= due:
+                return
+            self._scheduled[user_id] = due
+            heapq.heappush(self._heap, (due, user_id))
+            self._cond.notify()
+
+    def watch(self, user_id):
+        """사용자를 스케줄에 올림 - 이미 지난 배송은 바로 처리하고 스레드 시작 (실패하면 나중에 다시 시도)"""
+        delivered = self._deliver_or_retry(user_id)
+        self.start()
+        return delivered
+
+    def deliver(self, user_id):
+        """user_id의 도착할 편지를 지금 배송하고 다음 배송일을 힙에 넣음 - 도착 처리한 편지 목록"""
+        user_storage = self.storage_for(user_id)
+        delivered = user_storage.deliver_due(datetime.fromtimestamp(self.clock()))
+        self.delivered += len(delivered)
+        next_date = user_storage.next_delivery()
+        if next_date is not None:
+            self.schedule(user_id, next_date)
+        return delivered
+
+    def _deliver_or_retry(self, user_id):
+        try:
+            return self.deliver(user_id)
+        except Exception:
+            # 어떤 오류든 스레드/페이지를 멈추지 않고 기록한 뒤 나중에 다시 시도
+            logger.exception("편지 배송 실패 (user=%s) - %d초 뒤 다시 시도", user_id, RETRY_SECONDS)
+            self._push(user_id, self.clock() + RETRY_SECONDS)
+            return []
+
+    def run_pending(self):
+        """시각이 된 사용자들 배송 - 배송한 편지 수"""
+        count = 0
+        while True:
+            with self._cond:
+                if not self._heap or self._heap[0][0] > self.clock():
+                    return count
+                due, user_id = heapq.heappop(self._heap)
+                if self._scheduled.get(user_id) != due:
+                    continue
+                del self._scheduled[user_id]
+            count += len(self._deliver_or_retry(user_id))
+
+    def seconds_until_next(self):
+        with self._cond:
+            if not self._heap:
+                return None
+            return max(self._heap[0][0] - self.clock(), 0)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="letter-delivery", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                wait = MAX_SLEEP_SECONDS if not self._heap else self._heap[0][0] - self.clock()
+                if wait > 0:
+                    # schedule()이 더 이른 배송을 넣으면 notify로 깨어남
+                    self._cond.wait(min(wait, MAX_SLEEP_SECONDS))
+                    continue
+            self.run_pending()
+
+
+# 앱 프로세스 공용 스케줄러 (스레드는 첫 watch()에서 시작)
+scheduler = DeliveryScheduler()
+
+
+def user_ids(users_dir=None):
+    """data/users/ 아래 사용자 식별자들"""
+    users_dir = users_dir or storage.USERS_DIR
+    if not os.path.isdir(users_dir):
+        return []
+    return sorted(name for name in os.listdir(users_dir) if storage.is_valid_user_id(name))
+
+
+def tick(now=None, users_dir=None):
+    """모든 사용자에 대해 배송 한 번 - {사용자: 도착 처리한 편지 수} (없으면 빠짐)"""
+    now = now or datetime.now()
+    delivered = {}
+    for user_id in user_ids(users_dir):
+        count = len(storage.create_storage(user_id=user_id).deliver_due(now))
+        if count:
+            delivered[user_id] = count
+    return delivered
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="미래 편지 배송")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("tick", help="배송일이 지난 편지를 모두 도착 처리 (cron용)")
+    args = parser.parse_args(argv)
+
+    if args.command == "tick":
+        delivered = tick()
+        print(json.dumps({"users": len(delivered), "delivered": sum(delivered.values())}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# emotion_registry.py - 감정 레지스트리 (감정 이름 ↔ 작은 정수 번호)
+#
+# 달력 색 표(EMOTION_COLORS)와 탐색 화면 설정 표(EMOTIONS_CONFIG)를 감정 번호 하나로 묶습니다.
+#   번호 0..   : EMOTION_COLORS 순서, 그 뒤에 설정 표에만 있는 감정
+#   color(번호): 달력 색 (달력 표에 없으면 설정 표의 색), 0xRRGGBB로 묶은 정수
+#   config(번호): 설정 표 항목 (없으면 None)
+# 번호는 두 표의 감정에만 붙이고 고정입니다. 표에 없는 감정(예: 가져온 파일의 임의 값)은 번호가 없으며
+# (code()가 None), 그런 기록은 쓰는 쪽(calendar_table)이 원래 값 그대로 따로 둡니다.
+# 번호는 프로세스 안에서만 쓰고 파일에는 저장하지 않으므로, 표 순서가 바뀌어도 데이터는 그대로입니다.
+
+from app_data import EMOTION_COLORS, EMOTIONS_CONFIG
+
+# 색 묶음(uint32): 하위 24비트 RGB, UPPERCASE_COLOR 비트는 "#RRGGBB"처럼 대문자로 적힌 색
+UPPERCASE_COLOR = 1 << 24
+
+
+def pack_color(color):
+    """"#rrggbb"/"#RRGGBB" → uint32 (그 외 형식은 원래 문자열로 되돌릴 수 없으므로 None)"""
+    if not isinstance(color, str) or len(color) != 7 or color[0] != "#":
+        return None
+    try:
+        rgb = int(color[1:], 16)
+    except ValueError:
+        return None
+    if color == f"#{rgb:06x}":
+        return rgb
+    if color == f"#{rgb:06X}":
+        return rgb | UPPERCASE_COLOR
+    return None
+
+
+def unpack_color(packed):
+    """pack_color의 역변환"""
+    if packed & UPPERCASE_COLOR:
+        return f"#{packed & 0xFFFFFF:06X}"
+    return f"#{packed:06x}"
+
+
+class EmotionRegistry:
+    """감정 이름, 번호, 색, 설정 - 만든 뒤에는 바뀌지 않음"""
+
+    def __init__(self, colors, configs):
+        self.names = []
+        self._codes = {}
+        self._colors = []
+        self._configs = []
+        for name in list(colors) + [name for name in configs if name not in colors]:
+            config = configs.get(name)
+            self._add(name, colors.get(name) or config["color"], config)
+
+    def _add(self, name, color, config):
+        self._colors.append(pack_color(color))
+        self._configs.append(config)
+        self.names.append(name)
+        self._codes[name] = len(self.names) - 1
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._codes
+
+    def code(self, name):
+        """감정 번호 (표에 없는 감정이면 None)"""
+        return self._codes.get(name)
+
+    def name(self, code):
+        return self.names[code]
+
+    def color(self, code):
+        """달력 기본 색 묶음 (없으면 None)"""
+        return self._colors[code]
+
+    def config(self, code):
+        return self._configs[code]
+
+
+registry = EmotionRegistry(EMOTION_COLORS, EMOTIONS_CONFIG)
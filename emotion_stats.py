@@ -0,0 +1,122 @@
+# emotion_stats.py - 감정 달력 통계 집계 (📊 내 통계 탭)
+#
+# 감정별 기록 일수, 총 기록 일수, 연속 기록 구간(streaks.StreakEngine)을 저장 시점에 갱신해
+# emotion_stats.json에 보관합니다. 통계 탭은 전체 기록을 훑지 않고 이 숫자들만 읽습니다.
+# 파일에는 달력 파일들의 (mtime, size) 서명을 함께 저장해, 달력이 외부에서
+# 바뀌었거나 압축되었으면 한 번 다시 계산합니다.
+
+import json
+
+from calendar_table import CalendarTable
+from read_cache import file_signature, shared_cache
+from streaks import StreakEngine
+from write_coordinator import atomic_write_json
+
+
+def empty_stats():
+    return {
+        "counts": {},
+        "total_days": 0,
+        "last_day": None,
+        "last_emotion": None,
+        # 연속 구간 [[시작 서수, 끝 서수], ...] (streaks.StreakEngine)
+        "runs": [],
+        # last_day로 끝나는 연속 기록 일수
+        "current_streak": 0,
+        "longest_streak": 0,
+    }
+
+
+def with_streaks(stats, engine):
+    """엔진의 연속 구간으로 streak 항목 채우기"""
+    stats["runs"] = engine.runs()
+    stats["current_streak"] = engine.streak_ending(stats["last_day"]) if stats["last_day"] else 0
+    stats["longest_streak"] = engine.longest_streak()
+    return stats
+
+
+def build(calendar_data):
+    """달력 전체로 통계 계산"""
+    stats = empty_stats()
+    if isinstance(calendar_data, CalendarTable):
+        # 감정별 일수는 감정 번호 배열에서 바로, 마지막 날은 배열 끝
+        stats["counts"] = calendar_data.emotion_counts()
+        stats["last_day"] = calendar_data.last_day()
+        if stats["last_day"]:
+            stats["last_emotion"] = calendar_data[stats["last_day"]]["emotion"]
+    else:
+        for day in sorted(calendar_data):
+            emotion = calendar_data[day]["emotion"]
+            stats["counts"][emotion] = stats["counts"].get(emotion, 0) + 1
+            stats["last_day"] = day
+            stats["last_emotion"] = emotion
+    stats["total_days"] = len(calendar_data)
+    return with_streaks(stats, StreakEngine.from_calendar(calendar_data))
+
+
+def apply_day(stats, day, entry):
+    """하루치 저장을 통계에 반영 - 이전 감정을 알 수 없는 경우(삭제, 과거 날짜 덮어쓰기)는 None"""
+    engine = StreakEngine(stats["runs"])
+    exists = engine.contains(day)
+    if entry is None or (exists and day != stats["last_day"]):
+        return None
+
+    updated = dict(stats, counts=dict(stats["counts"]))
+    counts = updated["counts"]
+    if exists:
+        # 같은 날 덮어쓰기: 이전 감정 차감
+        previous = stats["last_emotion"]
+        counts[previous] -= 1
+        if counts[previous] == 0:
+            del counts[previous]
+    else:
+        updated["total_days"] += 1
+        engine.add_day(day)
+
+    emotion = entry["emotion"]
+    counts[emotion] = counts.get(emotion, 0) + 1
+    if stats["last_day"] is None or day >= stats["last_day"]:
+        updated["last_day"] = day
+        updated["last_emotion"] = emotion
+    return with_streaks(updated, engine)
+
+
+def current_streak(stats, today):
+    """today까지 이어진 연속 기록 일수 (오늘 기록이 없으면 0)"""
+    if stats["last_day"] != today:
+        return 0
+    return stats["current_streak"]
+
+
+def streaks_between(stats, start_day, end_day):
+    """기간과 겹치는 연속 기록들 [(시작일, 끝일, 일수), ...]"""
+    return StreakEngine(stats["runs"]).streaks_between(start_day, end_day)
+
+
+def most_common_emotion(stats):
+    counts = stats["counts"]
+    return max(counts, key=counts.get) if counts else None
+
+
+# 파일 보관
+def _read(stats_path):
+    try:
+        with open(stats_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def load(stats_path, calendar_paths):
+    """저장된 통계 - 달력 파일과 서명이 다르면 None"""
+    saved = shared_cache.get(("emotion_stats", stats_path), [stats_path], lambda: _read(stats_path))
+    if saved is None or saved["signature"] != [list(s) if s else None for s in file_signature(calendar_paths)]:
+        return None
+    return saved["stats"]
+
+
+def save(stats_path, calendar_paths, stats):
+    """통계 저장 - 달력 파일을 쓴 직후 호출"""
+    signature = [list(s) if s else None for s in file_signature(calendar_paths)]
+    atomic_write_json(stats_path, {"signature": signature, "stats": stats}, indent=None)
+    shared_cache.invalidate(("emotion_stats", stats_path))
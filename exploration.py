@@ -0,0 +1,107 @@
+# exploration.py - 감정 탐색 진행 상태 (세션별, 프로세스 공용 저장소)
+#
+# 감정 탐색(감정 선택 → 한 단어 → 시점과 상황 → 통찰)의 진행 상태를 st.session_state 대신
+# 이 모듈의 저장소에 세션 아이디별로 둡니다. 세션 쪽에는 세션 아이디만 남습니다.
+#   emotion : 감정 번호 (emotion_registry) - 아이콘/설명/키워드는 공용 표에서 찾음
+#   step    : 단계 (1~3)
+#   word    : 한 단어 (빠른 선택이면 공용 키워드 문자열 그대로)
+#   timing  : 시점 번호 (TIMING_OPTIONS)
+#   context : 상황 메모
+# IDLE_SECONDS 동안 건드리지 않은 상태는 저장소를 쓸 때(어느 세션이든) 함께 지우므로,
+# 창을 열어 둔 채 떠난 세션의 상태도 그 세션이 다시 실행되지 않아도 정리됩니다.
+# 지워진 세션은 감정 선택부터 다시 시작합니다.
+
+import threading
+import time
+from collections import OrderedDict
+
+from app_data import TIMING_OPTIONS
+from emotion_registry import registry
+
+# 이 시간(초) 동안 아무 진행이 없으면 탐색 상태를 지움
+IDLE_SECONDS = 30 * 60
+
+
+class Exploration:
+    """한 세션의 탐색 진행 상태 - 값은 번호와 사용자가 입력한 글자뿐"""
+
+    __slots__ = ("emotion", "step", "word", "timing", "context", "touched")
+
+    def __init__(self, emotion, touched):
+        self.emotion = emotion
+        self.step = 1
+        self.word = ""
+        self.timing = None
+        self.context = ""
+        self.touched = touched
+
+    @property
+    def emotion_name(self):
+        return registry.name(self.emotion)
+
+    @property
+    def config(self):
+        """EMOTIONS_CONFIG 항목 (공용 표 - 고치지 말 것)"""
+        return registry.config(self.emotion) or {}
+
+    @property
+    def timing_label(self):
+        return TIMING_OPTIONS[self.timing] if self.timing is not None else ""
+
+
+class ExplorationStore:
+    """세션 아이디 → Exploration, 오래 쉰 상태부터 지움"""
+
+    def __init__(self, idle_seconds=IDLE_SECONDS, clock=time.monotonic):
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        # 마지막으로 건드린 순서 (앞쪽이 가장 오래 쉰 세션)
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._states)
+
+    def _expire(self, now):
+        while self._states:
+            session_id, state = next(iter(self._states.items()))
+            if now - state.touched < self.idle_seconds:
+                break
+            del self._states[session_id]
+            self.expired += 1
+
+    def expire(self):
+        """오래 쉰 상태 지우기 - 지운 개수"""
+        with self._lock:
+            before = len(self._states)
+            self._expire(self.clock())
+            return before - len(self._states)
+
+    def get(self, session_id):
+        """세션의 진행 상태 (없거나 오래 쉬어 지워졌으면 None) - 가져오면 쉰 시간이 다시 시작됨"""
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            state = self._states.get(session_id)
+            if state is not None:
+                state.touched = now
+                self._states.move_to_end(session_id)
+            return state
+
+    def start(self, session_id, emotion):
+        """emotion(감정 이름)으로 새 탐색 시작"""
+        now = self.clock()
+        state = Exploration(registry.code(emotion), now)
+        with self._lock:
+            self._expire(now)
+            self._states[session_id] = state
+            self._states.move_to_end(session_id)
+        return state
+
+    def clear(self, session_id):
+        with self._lock:
+            return self._states.pop(session_id, None) is not None
+
+
+store = ExplorationStore()
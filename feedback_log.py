@@ -0,0 +1,145 @@
+# feedback_log.py - 콘텐츠 피드백 이벤트 로그 + 누적 카운터
+#
+# "도움됐어요" 클릭은 content_feedback.jsonl에 한 줄만 덧붙이고,
+# content_feedback_counts.json의 (콘텐츠 id, 감정)별 카운터만 증가시킵니다.
+# 카운터 파일은 자신이 반영한 이벤트 로그의 바이트 위치(offset)를 함께 저장하므로,
+# 카운터 갱신 전에 중단되었더라도 다음 읽기에서 남은 꼬리만 반영하면 됩니다.
+# 중단된 추가가 남긴 끊긴 줄은 다음 추가가 줄을 끝내 두고, 읽을 때 건너뜁니다.
+# 예전 content_feedback.json({"feedbacks": [...]})은 읽기 전용으로 함께 집계합니다.
+
+import json
+import os
+
+from read_cache import shared_cache
+from write_coordinator import atomic_write_json, file_lock
+
+
+def content_key(event):
+    """카운터 키 - 콘텐츠 id가 없으면 제목 사용"""
+    return event.get("content_id") or event.get("content_title", "")
+
+
+def _empty_counts():
+    return {"offset": 0, "counts": {}}
+
+
+def add_event(counts, event):
+    """{콘텐츠 키: {감정: 카운터}}에 이벤트 하나 반영"""
+    per_emotion = counts.setdefault(content_key(event), {})
+    counter = per_emotion.setdefault(event.get("emotion", "unknown"), {"helpful": 0, "total": 0})
+    counter["total"] += 1
+    if event.get("is_helpful"):
+        counter["helpful"] += 1
+
+
+def _read_legacy(legacy_path):
+    if legacy_path and os.path.exists(legacy_path):
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("feedbacks", [])
+    return []
+
+
+def _read_events_from(events_path, offset):
+    """offset 이후의 완전한 이벤트 줄과 마지막으로 읽은 위치"""
+    events = []
+    if not os.path.exists(events_path):
+        return events, offset
+    with open(events_path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                # 아직 쓰는 중인 마지막 줄
+                break
+            offset += len(raw)
+            event = _parse_line(raw)
+            if event is not None:
+                events.append(event)
+    return events, offset
+
+
+def _parse_line(raw):
+    """이벤트 한 줄 - 빈 줄이나 쓰다 끊긴 줄이면 None"""
+    if not raw.strip():
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        # 중단된 추가가 남긴 조각 (다음 추가가 줄을 끝내 두었음)
+        return None
+
+
+def _read_counts(counts_path):
+    if os.path.exists(counts_path):
+        with open(counts_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return None
+
+
+def _catch_up(events_path, counts_path, legacy_path):
+    """카운터를 이벤트 로그 끝까지 맞춤 - 호출자가 잠금을 쥐고 있어야 함"""
+    counts = _read_counts(counts_path)
+    changed = False
+    if counts is None:
+        counts = _empty_counts()
+        for event in _read_legacy(legacy_path):
+            add_event(counts["counts"], event)
+        changed = True
+
+    events, offset = _read_events_from(events_path, counts["offset"])
+    for event in events:
+        add_event(counts["counts"], event)
+    if offset != counts["offset"]:
+        counts["offset"] = offset
+        changed = True
+    return counts, changed
+
+
+def append(events_path, counts_path, event, legacy_path=None):
+    """이벤트 한 줄 추가 + 카운터 증분 갱신"""
+    append_many(events_path, counts_path, [event], legacy_path)
+
+
+def append_many(events_path, counts_path, events, legacy_path=None):
+    """이벤트 여러 개 추가 - 잠금과 카운터 파일 저장은 한 번만, 추가한 이벤트 수"""
+    count = 0
+    with file_lock(events_path):
+        counts, _ = _catch_up(events_path, counts_path, legacy_path)
+        with open(events_path, "a+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    # 앞선 추가가 줄 중간에서 끊김 - 새 이벤트가 그 조각에 붙지 않도록 줄을 끝냄
+                    f.write(b"\n")
+            for event in events:
+                f.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+                add_event(counts["counts"], event)
+                count += 1
+            counts["offset"] = f.tell()
+        atomic_write_json(counts_path, counts, indent=None)
+    shared_cache.invalidate(("feedback_counts", counts_path))
+    return count
+
+
+def counts(events_path, counts_path, legacy_path=None):
+    """{콘텐츠 키: {감정: {"helpful": n, "total": n}}} - 읽기 전용"""
+    def load():
+        with file_lock(events_path):
+            current, changed = _catch_up(events_path, counts_path, legacy_path)
+            if changed:
+                atomic_write_json(counts_path, current, indent=None)
+        return current["counts"]
+
+    # 카운터 파일과 이벤트 로그 중 하나라도 바뀌면 다시 읽음
+    return shared_cache.get(("feedback_counts", counts_path), [counts_path, events_path], load)
+
+
+def iter_events(events_path, legacy_path=None):
+    """예전 JSON 피드백과 이벤트 로그를 오래된 순으로"""
+    yield from _read_legacy(legacy_path)
+    if os.path.exists(events_path):
+        with open(events_path, "rb") as f:
+            for raw in f:
+                event = _parse_line(raw) if raw.endswith(b"\n") else None
+                if event is not None:
+                    yield event
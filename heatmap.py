@@ -0,0 +1,107 @@
+# heatmap.py - 연간/여러 해 감정 히트맵 (GitHub 기여 그래프 형식)
+#
+# 달력 데이터를 날짜 인덱스 DataFrame으로 바꾼 뒤, 주/요일 위치 계산, 색 매핑,
+# 연도별 집계, SVG 조각 생성까지 모두 pandas/NumPy 벡터 연산으로 처리합니다.
+# (날짜마다 도는 파이썬 루프 없음 - 10년치도 1초 안에 그림)
+
+import numpy as np
+import pandas as pd
+
+from calendar_table import CalendarTable
+
+# 날짜 서수 → datetime64[D] 변환용 (1970-01-01의 서수)
+EPOCH_ORDINAL = 719163
+
+EMPTY_COLOR = "#ebedf0"
+CELL_SIZE = 11
+CELL_GAP = 2
+LABEL_WIDTH = 44
+YEAR_GAP = 16
+WEEKS_PER_YEAR = 54
+YEAR_HEIGHT = 7 * (CELL_SIZE + CELL_GAP) + YEAR_GAP
+
+
+def ordinal_days(ordinals):
+    """날짜 서수 배열 → datetime64[ns] 배열"""
+    days = np.frombuffer(ordinals, dtype=np.int32) - EPOCH_ORDINAL
+    return days.astype("datetime64[D]").astype("datetime64[ns]")
+
+
+def calendar_frame(calendar_data):
+    """{"YYYY-MM-DD": 기록} → 날짜 인덱스 DataFrame (emotion, note, color 열)"""
+    if not calendar_data:
+        return pd.DataFrame(columns=["emotion", "note", "color"], index=pd.DatetimeIndex([]))
+    if isinstance(calendar_data, CalendarTable):
+        # 이미 날짜순 열 배열 - 하루씩 dict를 만들지 않고 바로 DataFrame으로
+        columns = calendar_data.columns(("emotion", "note", "color"))
+        return pd.DataFrame(columns, index=pd.DatetimeIndex(ordinal_days(calendar_data.ordinals)))
+    frame = pd.DataFrame.from_dict(calendar_data, orient="index")
+    frame.index = pd.to_datetime(frame.index, format="%Y-%m-%d")
+    return frame.sort_index()
+
+
+def year_summary(frame):
+    """연도별 기록 일수와 가장 많은 감정"""
+    if frame.empty:
+        return pd.DataFrame(columns=["days", "top_emotion"])
+    years = frame.index.year
+    days = frame.groupby(years).size()
+    by_emotion = frame.groupby([years, frame["emotion"]]).size()
+    top_emotion = by_emotion.groupby(level=0).idxmax().map(lambda key: key[1])
+    return pd.DataFrame({"days": days, "top_emotion": top_emotion})
+
+
+def _escape(values):
+    return (
+        values.str.replace("&", "&amp;", regex=False)
+        .str.replace("<", "&lt;", regex=False)
+        .str.replace(">", "&gt;", regex=False)
+        .str.replace('"', "&quot;", regex=False)
+    )
+
+
+def heatmap_svg(frame, first_year, last_year, emotion_colors=None):
+    """first_year~last_year 히트맵 SVG - 한 해가 한 줄(53주 x 7요일)"""
+    days = pd.date_range(f"{first_year}-01-01", f"{last_year}-12-31", freq="D")
+    aligned = frame.reindex(days)
+
+    weekday = days.weekday.to_numpy()
+    day_of_year = days.dayofyear.to_numpy()
+    # 1월 1일의 요일만큼 밀어서 그 해의 주 번호 계산
+    jan1_weekday = (weekday - (day_of_year - 1)) % 7
+    week = (day_of_year - 1 + jan1_weekday) // 7
+    year_row = days.year.to_numpy() - first_year
+
+    x = LABEL_WIDTH + week * (CELL_SIZE + CELL_GAP)
+    y = year_row * YEAR_HEIGHT + weekday * (CELL_SIZE + CELL_GAP)
+
+    recorded = aligned["emotion"].notna().to_numpy()
+    colors = aligned["color"]
+    if emotion_colors:
+        colors = colors.fillna(aligned["emotion"].map(emotion_colors))
+    colors = _escape(colors.fillna(EMPTY_COLOR).astype(str))
+
+    date_labels = pd.Series(days.strftime("%Y-%m-%d"), index=days)
+    details = _escape(
+        aligned["emotion"].fillna("").astype(str) + ": " + aligned["note"].fillna("").astype(str)
+    )
+    titles = date_labels.where(~recorded, date_labels + " " + details)
+
+    rects = (
+        '<rect x="' + pd.Series(x, index=days).astype(str)
+        + '" y="' + pd.Series(y, index=days).astype(str)
+        + f'" width="{CELL_SIZE}" height="{CELL_SIZE}" rx="2" fill="' + colors
+        + '"><title>' + titles + "</title></rect>"
+    )
+
+    labels = [
+        f'<text x="0" y="{row * YEAR_HEIGHT + CELL_SIZE * 4}" font-size="11" fill="#555">{year}</text>'
+        for row, year in enumerate(range(first_year, last_year + 1))
+    ]
+    width = LABEL_WIDTH + WEEKS_PER_YEAR * (CELL_SIZE + CELL_GAP)
+    height = (last_year - first_year + 1) * YEAR_HEIGHT
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" style="max-width: 100%; height: auto;">'
+        + "".join(labels) + rects.str.cat() + "</svg>"
+    )
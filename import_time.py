@@ -0,0 +1,70 @@
+# import_time.py - 모듈 import 시간 측정 (python -X importtime 결과 요약)
+#
+# 새 파이썬 프로세스에서 `python -X importtime -c "import app"`을 실행하고,
+# stderr에 찍히는 모듈별 시간(마이크로초)을 모아 JSON으로 출력합니다.
+# 결과를 파일로 남겨 두면 커밋마다 앱 시작 비용을 비교할 수 있습니다.
+#
+#   python import_time.py                 # app 측정
+#   python import_time.py storage --top 5 --output import_time.json
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# 앱 import 시 불러오지 않아야 하는 무거운 모듈
+HEAVY_MODULES = ("pandas", "numpy")
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력 → [(모듈, self μs, cumulative μs, 깊이), ...]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def measure(module="app", top=10, python=sys.executable):
+    """module을 새 프로세스에서 import하고 시간 요약을 반환"""
+    script = (
+        f"import sys, json; import {module}; "
+        f"print(json.dumps([name for name in {list(HEAVY_MODULES)!r} if name in sys.modules]))"
+    )
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", script],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "import 실패")
+
+    rows = parse_importtime(result.stderr)
+    target = next((row for row in reversed(rows) if row[0] == module and row[3] == 0), None)
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": round(target[2] / 1000, 1) if target else None,
+        "self_ms": round(target[1] / 1000, 1) if target else None,
+        "modules_loaded": len(rows),
+        "heavy_modules_loaded": json.loads(result.stdout.strip().splitlines()[-1]),
+        "slowest_self_ms": [{"module": name, "ms": round(self_us / 1000, 1)} for name, self_us, _, _ in slowest],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="모듈 import 시간 측정")
+    parser.add_argument("module", nargs="?", default="app")
+    parser.add_argument("--top", type=int, default=10, help="self 시간이 긴 모듈 몇 개를 보여줄지")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    report = measure(args.module, args.top)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
@@ -0,0 +1,116 @@
+# insights.py - 감정 탐색 3단계의 통찰 문구 템플릿
+#
+# 문구는 코드가 아니라 data/insights.json에 둡니다. 형식:
+#   {감정: {시점: {"main_message": "...", "encouragement": "..."}}}
+# 시점 키는 app_data.TIMING_OPTIONS 값("방금 전부터" … "오래전부터") 또는 모든 시점에 쓰는 "*"이고,
+# 감정 키 "*"는 파일에 없는 감정에 씁니다. 시점별 항목에는 바꾸고 싶은 필드만 적으면 되고,
+# 빠진 필드는 감정별 "*" → 공통 시점별 → 공통 "*" → app_data.DEFAULT_INSIGHT 순으로 채웁니다.
+# 본문에는 {word}(사용자가 고른 감정 단어), {timing}, {context} 자리표시자를 쓸 수 있습니다.
+#
+# 파일은 처음 쓸 때 한 번 파싱해 (감정, 시점)마다 필드가 다 채워진 표로 컴파일하고,
+# shared_cache에 (mtime, size)로 검증해 두므로 문구를 고쳐도 재시작 없이 반영됩니다.
+# 통찰 하나를 만드는 일은 표 조회 한 번과 자리표시자 치환뿐입니다.
+#
+#   python insights.py check      # 문구 파일 검사 (감정/시점별 변형 개수)
+
+import argparse
+import json
+import os
+import re
+
+from app_data import DEFAULT_INSIGHT, TIMING_OPTIONS
+from read_cache import shared_cache
+
+INSIGHTS_PATH = os.path.join("data", "insights.json")
+FIELDS = tuple(DEFAULT_INSIGHT)
+ANY = "*"
+
+_PLACEHOLDER = re.compile(r"\{(word|timing|context)\}")
+
+
+def compile_template(text):
+    """'...{word}...' → ("...", "word", "...") - 홀수 번째 조각이 자리표시자 이름"""
+    if not isinstance(text, str):
+        raise ValueError(f"문구는 문자열이어야 합니다: {text!r}")
+    return tuple(_PLACEHOLDER.split(text))
+
+
+def render(template, values):
+    if len(template) == 1:
+        return template[0]
+    return "".join(values[part] if i % 2 else part for i, part in enumerate(template))
+
+
+def _fields(variants, timing):
+    entry = variants.get(timing) or {}
+    if not isinstance(entry, dict):
+        raise ValueError(f"{timing!r} 항목은 객체여야 합니다")
+    unknown = set(entry) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"알 수 없는 필드: {', '.join(sorted(unknown))}")
+    return entry
+
+
+def compile_insights(data):
+    """insights.json 내용 → {(감정, 시점): {필드: 템플릿}} (빠진 필드는 미리 채움)"""
+    if not isinstance(data, dict) or not all(isinstance(variants, dict) for variants in data.values()):
+        raise ValueError("insights.json은 {감정: {시점: {...}}} 형식이어야 합니다")
+    common = data.get(ANY, {})
+    timings = set(TIMING_OPTIONS).union(*data.values()) | {ANY}
+    compiled = {}
+    for emotion in set(data) | {ANY}:
+        variants = data.get(emotion, {})
+        for timing in timings:
+            merged = dict(DEFAULT_INSIGHT)
+            merged.update(_fields(common, ANY))
+            merged.update(_fields(common, timing))
+            merged.update(_fields(variants, ANY))
+            merged.update(_fields(variants, timing))
+            compiled[(emotion, timing)] = {field: compile_template(text) for field, text in merged.items()}
+    return compiled
+
+
+def _read(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return compile_insights(json.load(f))
+    except FileNotFoundError:
+        return compile_insights({})
+
+
+def load(path=INSIGHTS_PATH):
+    """컴파일된 문구 표 - 파일이 바뀌지 않았으면 프로세스 캐시 그대로"""
+    return shared_cache.get(("insights", path), [path], lambda: _read(path))
+
+
+def get_insight(emotion, word="", timing="", context="", path=INSIGHTS_PATH):
+    """{"main_message": ..., "encouragement": ...}"""
+    try:
+        table = load(path)
+    except ValueError:
+        # 깨진 문구 파일 - 기본 문구로 계속 (python insights.py check로 확인)
+        return dict(DEFAULT_INSIGHT)
+    templates = (
+        table.get((emotion, timing)) or table.get((emotion, ANY))
+        or table.get((ANY, timing)) or table[(ANY, ANY)]
+    )
+    values = {"word": word, "timing": timing, "context": context}
+    return {field: render(template, values) for field, template in templates.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="통찰 문구 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    check_parser = subparsers.add_parser("check", help="문구 파일을 컴파일해 검사")
+    check_parser.add_argument("--path", default=INSIGHTS_PATH)
+    args = parser.parse_args(argv)
+
+    with open(args.path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    compile_insights(data)
+    variants = {emotion: sorted(timing for timing in timings if timing != ANY) for emotion, timings in data.items()}
+    print(json.dumps({"emotions": len(data), "variants": variants}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
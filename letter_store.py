@@ -0,0 +1,429 @@
+# letter_store.py - 편지 헤더 인덱스 + 본문 파일 (FileStorage용)
+#
+# 편지함 목록에는 헤더(아이디, 날짜, 읽음 여부)만 필요하고, 본문은 펼친 편지 하나만 필요합니다.
+# 그래서 편지를 두 파일로 나눠 저장합니다.
+#   letters.hdr  : 파일 머리(24바이트) + 편지마다 고정 길이 헤더 레코드 (추가 순서)
+#   letters.body : 본문 JSON 한 줄씩 덧붙이기만 하는 파일 - 헤더에 위치(offset, 길이)를 기록
+# 날짜는 'YYYY-MM-DD' 바이트 그대로 두어 정렬/비교에 디코딩이 필요 없고,
+# 읽음 표시와 배송(도착 시각 기록)은 헤더 레코드의 해당 필드만 제자리에서 덮어씁니다.
+# 파싱한 헤더와 배송일순 정렬은 shared_cache에 (mtime, size)로 검증해 둡니다.
+# 파일 머리에는 도착한 편지 수와 그중 읽지 않은 편지 수도 두어, 쓰기마다 잠금 안에서 함께 고칩니다.
+# 새 편지 배지(counts)는 이 머리만 읽으므로 편지 수와 관계없이 헤더 파일 전체를 파싱하지 않습니다.
+#
+# 예전 future_letters.json은 헤더 파일이 없을 때(처음 열 때) 한 번만 가져옵니다. 그 뒤로는 헤더/본문 파일이
+# 원본이므로, 예전 파일이 밖에서 바뀌어도(touch, git checkout, 백업 복원) 다시 가져오지 않습니다 -
+# 다시 가져오면 그 사이에 쓴 편지가 사라지기 때문입니다. 예전 파일의 편지를 더하려면 transfer.py로 가져옵니다.
+# 파일 머리에는 가져온 예전 파일의 서명을 기록만 해 둡니다.
+
+import bisect
+import json
+import os
+import struct
+
+from read_cache import file_signature, shared_cache
+from write_coordinator import file_lock
+
+HEADERS_NAME = "letters.hdr"
+BODIES_NAME = "letters.body"
+
+MAGIC = b"MCLTR003"
+# 매직, 가져온 future_letters.json의 (mtime_ns, size), 도착한 편지 수, 새 편지 수
+FILE_HEADER = struct.Struct("<8sqqII")
+COUNTS = struct.Struct("<II")
+COUNTS_OFFSET = 24
+# 아이디, 배송일, 작성일, 읽음, 읽은 시각, 도착 시각, 본문 위치, 본문 길이
+RECORD = struct.Struct("<40s10s10sB19s19sQI")
+READ_FIELDS = struct.Struct("<B19s")
+READ_OFFSET = 60
+ARRIVED_OFFSET = 80
+HEADER_KEYS = ("delivery_date", "write_date", "is_read", "read_date", "delivered_at")
+# 예전 형식 - 처음 열 때 변환 (V1: 도착 시각 필드 없음, V1/V2: 파일 머리에 카운터 없음)
+MAGIC_V1 = b"MCLTR001"
+MAGIC_V2 = b"MCLTR002"
+OLD_FILE_HEADER = struct.Struct("<8sqq")
+RECORD_V1 = struct.Struct("<40s10s10sB19sQI")
+
+
+def _fixed(value, size, name):
+    data = (value or "").encode("utf-8")
+    if len(data) > size:
+        raise ValueError(f"편지 {name}가 너무 깁니다 ({len(data)} > {size}바이트): {value!r}")
+    return data
+
+
+def _pack(letter, offset, length):
+    return RECORD.pack(
+        _fixed(letter["id"], 40, "id"),
+        _fixed(letter["delivery_date"], 10, "delivery_date"),
+        _fixed(letter["write_date"], 10, "write_date"),
+        1 if letter.get("is_read") else 0,
+        _fixed(letter.get("read_date"), 19, "read_date"),
+        _fixed(letter.get("delivered_at"), 19, "delivered_at"),
+        offset,
+        length,
+    )
+
+
+def _text(data):
+    return data.rstrip(b"\0").decode("utf-8")
+
+
+def _header(record):
+    return {
+        "id": _text(record[0]),
+        "delivery_date": _text(record[1]),
+        "write_date": _text(record[2]),
+        "is_read": bool(record[3]),
+        "read_date": _text(record[4]) or None,
+        "delivered_at": _text(record[5]) or None,
+    }
+
+
+def _counts(records):
+    """레코드들의 (도착한 편지 수, 새 편지 수)"""
+    arrived = [record for record in records if record[5].strip(b"\0")]
+    return len(arrived), sum(1 for record in arrived if not record[3])
+
+
+def _letter_counts(letters):
+    """편지 dict들의 (도착한 편지 수, 새 편지 수)"""
+    arrived = [letter for letter in letters if letter.get("delivered_at")]
+    return len(arrived), sum(1 for letter in arrived if not letter.get("is_read"))
+
+
+def _body_line(letter):
+    body = {key: value for key, value in letter.items() if key not in HEADER_KEYS}
+    return (json.dumps(body, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class HeaderView:
+    """헤더 파일 한 번 파싱한 결과 - 배송일순 정렬 포함 (읽기 전용)"""
+
+    def __init__(self, data):
+        magic, mtime_ns, size, _, new = FILE_HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("편지 헤더 파일 형식이 아닙니다")
+        self.legacy_signature = (mtime_ns, size)
+        body = memoryview(data)[FILE_HEADER.size:]
+        # 쓰다 끊긴 마지막 레코드는 무시
+        body = body[:len(body) - len(body) % RECORD.size]
+        self.records = list(RECORD.iter_unpack(body))
+        # 배송일 오름차순 슬롯 목록 - 뒤에서부터 읽으면 최신순 (같은 날은 나중에 쓴 편지 먼저)
+        deliveries = [record[1] for record in self.records]
+        self.order = sorted(range(len(deliveries)), key=deliveries.__getitem__)
+        self.deliveries = [deliveries[slot] for slot in self.order]
+        self._slots = None
+        self._arrived = None
+        self._new_count = new
+
+    def with_read(self, slot, fields):
+        """slot 편지의 읽음 필드만 바꾼 새 뷰 - 정렬은 그대로 공유"""
+        view = object.__new__(HeaderView)
+        view.__dict__.update(self.__dict__)
+        view.records = list(self.records)
+        record = view.records[slot]
+        view.records[slot] = record[:3] + READ_FIELDS.unpack(fields) + record[5:]
+        if record[5].strip(b"\0") and not record[3]:
+            view._new_count -= 1
+        return view
+
+    def __len__(self):
+        return len(self.records)
+
+    def slot(self, letter_id):
+        if self._slots is None:
+            self._slots = {_text(record[0]): slot for slot, record in enumerate(self.records)}
+        return self._slots.get(letter_id)
+
+    def delivered_count(self, today):
+        return bisect.bisect_right(self.deliveries, today.encode("ascii"))
+
+    def delivered(self, today, offset=0, limit=None):
+        """배송일이 today 이전인 편지 헤더 (배송일 최신순) 중 offset부터 limit개"""
+        end = max(self.delivered_count(today) - offset, 0)
+        start = 0 if limit is None else max(end - limit, 0)
+        return [_header(self.records[slot]) for slot in reversed(self.order[start:end])]
+
+    # 도착 상태 (배송 스케줄러가 기록한 값만 읽음)
+    def arrived_order(self):
+        """도착한 편지 슬롯 - 도착 시각, 배송일 오름차순"""
+        if self._arrived is None:
+            records = self.records
+            self._arrived = sorted(
+                (slot for slot, record in enumerate(records) if record[5].strip(b"\0")),
+                key=lambda slot: (records[slot][5], records[slot][1]),
+            )
+        return self._arrived
+
+    def arrived(self, offset=0, limit=None):
+        """도착한 편지 헤더 (도착 최신순) 중 offset부터 limit개"""
+        order = self.arrived_order()
+        end = max(len(order) - offset, 0)
+        start = 0 if limit is None else max(end - limit, 0)
+        return [_header(self.records[slot]) for slot in reversed(order[start:end])]
+
+    def new_count(self):
+        """도착했지만 읽지 않은 편지 수 (파일 머리의 카운터)"""
+        return self._new_count
+
+    def pending(self, until=None):
+        """아직 도착하지 않은 편지 슬롯 (배송일순) - until('YYYY-MM-DD')까지만"""
+        end = len(self.order) if until is None else self.delivered_count(until)
+        return [slot for slot in self.order[:end] if not self.records[slot][5].strip(b"\0")]
+
+    def next_pending(self):
+        """아직 도착하지 않은 편지 중 가장 이른 배송일 (없으면 None)"""
+        for slot in self.order:
+            record = self.records[slot]
+            if not record[5].strip(b"\0"):
+                return _text(record[1])
+        return None
+
+    def headers(self):
+        return [_header(record) for record in self.records]
+
+
+class LetterStore:
+    """편지 헤더/본문 파일 - 쓰기는 헤더 파일 잠금 안에서"""
+
+    def __init__(self, base_dir, legacy_path):
+        self.headers_path = os.path.join(base_dir, HEADERS_NAME)
+        self.bodies_path = os.path.join(base_dir, BODIES_NAME)
+        self.legacy_path = legacy_path
+
+    # 읽기
+    def _read_view(self):
+        try:
+            with open(self.headers_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if data[:len(MAGIC)] in (MAGIC_V1, MAGIC_V2) and self._upgrade():
+            return self._read_view()
+        return HeaderView(data)
+
+    def _cached_view(self):
+        return shared_cache.get(("letter_headers", self.headers_path), [self.headers_path], self._read_view)
+
+    def _invalidate(self):
+        shared_cache.invalidate(("letter_headers", self.headers_path))
+        shared_cache.invalidate(("letters", self.headers_path))
+
+    def view(self):
+        """현재 HeaderView - 헤더 파일이 없으면 먼저 예전 파일을 가져옴"""
+        view = self._cached_view()
+        if view is None:
+            with file_lock(self.headers_path):
+                if self._read_view() is None:
+                    self._import_legacy()
+            self._invalidate()
+            view = self._cached_view()
+        return view
+
+    def counts(self):
+        """(도착한 편지 수, 새 편지 수, 전체 편지 수) - 헤더 파일 머리와 크기만 읽음"""
+        for _ in range(2):
+            try:
+                with open(self.headers_path, "rb") as f:
+                    data = f.read(FILE_HEADER.size)
+                    size = os.fstat(f.fileno()).st_size
+            except FileNotFoundError:
+                data = b""
+            if data[:len(MAGIC)] == MAGIC and len(data) == FILE_HEADER.size:
+                break
+            # 아직 없거나 예전 형식 - 가져오기/변환 후 다시
+            self.view()
+        arrived, new = COUNTS.unpack_from(data, COUNTS_OFFSET)
+        return arrived, new, (size - FILE_HEADER.size) // RECORD.size
+
+    def _upgrade(self):
+        """예전 형식 헤더 파일을 현재 형식으로 변환 - 변환했으면 True"""
+        with file_lock(self.headers_path):
+            with open(self.headers_path, "rb") as f:
+                data = f.read()
+            magic, mtime_ns, size = OLD_FILE_HEADER.unpack_from(data)
+            body = data[OLD_FILE_HEADER.size:]
+            if magic == MAGIC_V1:
+                body = body[:len(body) - len(body) % RECORD_V1.size]
+                records = [record[:5] + (b"",) + record[5:] for record in RECORD_V1.iter_unpack(body)]
+            elif magic == MAGIC_V2:
+                body = body[:len(body) - len(body) % RECORD.size]
+                records = list(RECORD.iter_unpack(body))
+            else:
+                return False
+            header = FILE_HEADER.pack(MAGIC, mtime_ns, size, *_counts(records))
+            _replace_file(self.headers_path, [header] + [RECORD.pack(*record) for record in records])
+        return True
+
+    def body(self, letter_id):
+        """편지 본문 {"id", "title", "content", ...} - 없으면 None"""
+        for _ in range(2):
+            view = self.view()
+            slot = view.slot(letter_id)
+            if slot is None:
+                return None
+            offset, length = view.records[slot][6:8]
+            with open(self.bodies_path, "rb") as f:
+                f.seek(offset)
+                data = f.read(length)
+            try:
+                body = json.loads(data)
+            except ValueError:
+                body = None
+            if body is not None and body.get("id") == letter_id:
+                return body
+            # 읽는 사이 전체 재작성됨 - 헤더를 다시 읽고 한 번 더
+            self._invalidate()
+        return None
+
+    def letters(self):
+        """전체 편지 (추가 순서) - 헤더와 본문을 합친 예전 형식"""
+        return shared_cache.get(("letters", self.headers_path), [self.headers_path, self.bodies_path], self._read_all)
+
+    def iter_letters(self):
+        """전체 편지를 추가 순서로 하나씩 - 본문 파일 전체를 메모리에 올리지 않음 (내보내기용)"""
+        view = self.view()
+        with open(self.bodies_path, "rb") as f:
+            for record in view.records:
+                offset, length = record[6:8]
+                f.seek(offset)
+                letter = json.loads(f.read(length))
+                letter.update((key, value) for key, value in _header(record).items() if key != "id")
+                yield letter
+
+    def _read_all(self):
+        view = self.view()
+        with open(self.bodies_path, "rb") as f:
+            data = f.read()
+        letters = []
+        for record in view.records:
+            offset, length = record[6:8]
+            letter = json.loads(data[offset:offset + length])
+            letter.update((key, value) for key, value in _header(record).items() if key != "id")
+            letters.append(letter)
+        return letters
+
+    # 쓰기 (헤더 파일 잠금 안에서)
+    def _import_legacy(self):
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                letters = json.load(f)["letters"]
+        except FileNotFoundError:
+            letters = []
+        self._write_all(letters)
+
+    def _write_all(self, letters):
+        legacy = file_signature([self.legacy_path])[0] or (0, 0)
+        bodies, records, offset = [], [], 0
+        for letter in letters:
+            line = _body_line(letter)
+            records.append(_pack(letter, offset, len(line)))
+            bodies.append(line)
+            offset += len(line)
+        # 본문을 먼저 바꾸고 헤더를 바꿈 - 그 사이에 읽은 본문은 id 확인으로 걸러짐
+        _replace_file(self.bodies_path, bodies)
+        _replace_file(self.headers_path, [FILE_HEADER.pack(MAGIC, *legacy, *_letter_counts(letters))] + records)
+
+    def _add_counts(self, arrived, new):
+        """파일 머리의 카운터에 더함 (헤더 파일 잠금 안에서)"""
+        if not arrived and not new:
+            return
+        with open(self.headers_path, "r+b") as f:
+            f.seek(COUNTS_OFFSET)
+            current = COUNTS.unpack(f.read(COUNTS.size))
+            f.seek(COUNTS_OFFSET)
+            f.write(COUNTS.pack(max(current[0] + arrived, 0), max(current[1] + new, 0)))
+
+    def replace_all(self, letters):
+        with file_lock(self.headers_path):
+            self._write_all(letters)
+        self._invalidate()
+
+    def add(self, letter):
+        self.view()
+        line = _body_line(letter)
+        with file_lock(self.headers_path):
+            with open(self.bodies_path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(line)
+            with open(self.headers_path, "ab") as f:
+                f.write(_pack(letter, offset, len(line)))
+            self._add_counts(*_letter_counts([letter]))
+        self._invalidate()
+
+    def add_many(self, letters):
+        """편지 여러 통을 잠금 한 번으로 추가 - 이미 있는 아이디는 건너뛰고, 추가한 편지 목록을 돌려줌"""
+        self.view()
+        added = []
+        with file_lock(self.headers_path):
+            view = self._read_view()
+            seen = set()
+            bodies, records = [], []
+            with open(self.bodies_path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                for letter in letters:
+                    if letter["id"] in seen or view.slot(letter["id"]) is not None:
+                        continue
+                    seen.add(letter["id"])
+                    line = _body_line(letter)
+                    records.append(_pack(letter, offset, len(line)))
+                    bodies.append(line)
+                    added.append(letter)
+                    offset += len(line)
+                f.write(b"".join(bodies))
+            if added:
+                with open(self.headers_path, "ab") as f:
+                    f.write(b"".join(records))
+                self._add_counts(*_letter_counts(added))
+        self._invalidate()
+        return added
+
+    def mark_read(self, letter_id, read_date):
+        """헤더 레코드 하나의 읽음 필드만 덮어씀 - 편지가 없으면 False"""
+        fields = READ_FIELDS.pack(1, _fixed(read_date, 19, "read_date"))
+        self.view()
+        with file_lock(self.headers_path):
+            # 잠금 안에서 다시 읽음 - 그 사이의 배송(deliver_due) 기록이 캐시에서 빠지지 않도록
+            view = self._read_view()
+            slot = view.slot(letter_id)
+            if slot is None:
+                return False
+            record = view.records[slot]
+            with open(self.headers_path, "r+b") as f:
+                f.seek(FILE_HEADER.size + RECORD.size * slot + READ_OFFSET)
+                f.write(fields)
+            if record[5].strip(b"\0") and not record[3]:
+                self._add_counts(0, -1)
+        # 다시 파싱하지 않고 바뀐 레코드 하나만 고친 뷰를 새 서명으로 캐시
+        self._invalidate()
+        shared_cache.get(("letter_headers", self.headers_path), [self.headers_path], lambda: view.with_read(slot, fields))
+        return True
+
+    def deliver_due(self, today, arrived_at):
+        """배송일이 today 이전인데 아직 도착하지 않은 편지에 도착 시각 기록 - 도착 처리한 헤더 목록
+
+        잠금 안에서 파일을 다시 읽어 확인하므로 여러 프로세스가 동시에 불러도 편지마다 한 번만 도착합니다.
+        """
+        fields = _fixed(arrived_at, 19, "delivered_at").ljust(19, b"\0")
+        self.view()
+        with file_lock(self.headers_path):
+            view = self._read_view()
+            due = view.pending(today) if view is not None else []
+            if not due:
+                return []
+            with open(self.headers_path, "r+b") as f:
+                for slot in due:
+                    f.seek(FILE_HEADER.size + RECORD.size * slot + ARRIVED_OFFSET)
+                    f.write(fields)
+            self._add_counts(len(due), sum(1 for slot in due if not view.records[slot][3]))
+        self._invalidate()
+        return [dict(_header(view.records[slot]), delivered_at=arrived_at) for slot in due]
+
+
+def _replace_file(path, chunks):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(chunks))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,225 @@
+# profiling.py - rerun 단위 성능 추적 (선택 사항)
+#
+# 서버 쪽 MINDFUL_PROFILE 환경 변수로 켭니다.
+#   timing   : 페이지/섹션 함수와 저장소 호출 시간만 기록
+#   cprofile : 위 기록 + 그 rerun 전체의 cProfile 상위 함수
+# 주소의 ?profile= 값은 서버에서 MINDFUL_PROFILE_QUERY=1로 허용했을 때만 따릅니다 (방문자가 켜지 못하도록).
+# rerun 하나가 끝나면 기록 한 줄을 JSONL 추적 파일(MINDFUL_PROFILE_TRACE)에 덧붙이고,
+# 앱은 같은 기록을 접을 수 있는 디버그 패널로 보여줍니다.
+# user_id는 일기에 들어가는 열쇠(?user=)이므로 기록에는 프로세스마다 다른 솔트로 만든 해시만 남기고,
+# 추적 파일이 TRACE_MAX_BYTES를 넘으면 <파일>.1로 밀어내 최대 두 파일만 유지합니다.
+# 꺼져 있을 때 timed 데코레이터와 wrap_storage는 스레드 로컬 확인 한 번만 합니다.
+
+import contextlib
+import cProfile
+import functools
+import hashlib
+import json
+import os
+import pstats
+import secrets
+import threading
+import time
+from datetime import datetime
+
+from write_coordinator import file_lock
+
+MODES = ("timing", "cprofile")
+ENV_MODE = os.environ.get("MINDFUL_PROFILE", "")
+# ?profile= 값을 따를지 (서버 설정)
+QUERY_ENABLED = os.environ.get("MINDFUL_PROFILE_QUERY", "").strip().lower() in ("1", "true", "on")
+TRACE_PATH = os.environ.get("MINDFUL_PROFILE_TRACE", os.path.join("data", "profile_trace.jsonl"))
+TRACE_MAX_BYTES = int(os.environ.get("MINDFUL_PROFILE_TRACE_MAX_BYTES", str(10 * 1024 * 1024)))
+CPROFILE_TOP = 25
+# 기록에 그대로 남기지 않고 해시로 바꾸는 값
+HASHED_KEYS = ("user_id",)
+_SALT = secrets.token_bytes(16)
+
+# Streamlit은 세션마다 별도 스레드에서 스크립트를 실행하므로 rerun 기록은 스레드별로 둠
+_local = threading.local()
+
+
+def requested_mode(query_value=None, allow_query=None):
+    """환경 변수(또는 서버가 허용한 경우 ?profile= 값)로 정한 모드 (꺼져 있으면 None)"""
+    if not (QUERY_ENABLED if allow_query is None else allow_query):
+        query_value = None
+    for value in (query_value, ENV_MODE):
+        value = (value or "").strip().lower()
+        if value in MODES:
+            return value
+        if value in ("1", "true", "on"):
+            return "timing"
+    return None
+
+
+def anonymize(value):
+    """같은 프로세스 안에서만 비교할 수 있는 짧은 해시 (원래 값은 되돌릴 수 없음)"""
+    if value is None:
+        return None
+    return hashlib.sha256(_SALT + str(value).encode("utf-8")).hexdigest()[:12]
+
+
+def current():
+    """지금 스레드에서 진행 중인 RerunProfile (없으면 None)"""
+    return getattr(_local, "profile", None)
+
+
+class RerunProfile:
+    """rerun 하나 동안의 구간(span) 시간과 저장소 호출 집계"""
+
+    def __init__(self, mode, **context):
+        self.mode = mode
+        # 기록에 함께 남길 값 (세션, 사용자, 페이지 등) - rerun 중에 갱신 가능
+        self.context = context
+        self.spans = []
+        self.storage_calls = {}
+        self._depth = 0
+        self._started = None
+        self._profiler = None
+        self.record = None
+
+    @contextlib.contextmanager
+    def span(self, name, kind):
+        index = len(self.spans)
+        self.spans.append({"name": name, "kind": kind, "depth": self._depth, "ms": None})
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.spans[index]["ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+    def add_storage_call(self, method, elapsed):
+        entry = self.storage_calls.setdefault(method, {"calls": 0, "ms": 0.0})
+        entry["calls"] += 1
+        entry["ms"] += elapsed * 1000
+
+    def start(self):
+        self._started = time.perf_counter()
+        if self.mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # 다른 세션이 이미 프로파일러를 쓰는 중 (파이썬 3.12+는 하나만 허용)
+                self._profiler = None
+
+    def finish(self):
+        total_ms = (time.perf_counter() - self._started) * 1000
+        cprofile_rows = None
+        if self._profiler is not None:
+            self._profiler.disable()
+            cprofile_rows = top_functions(self._profiler)
+        elif self.mode == "cprofile":
+            cprofile_rows = "busy"
+
+        context = {key: anonymize(value) if key in HASHED_KEYS else value for key, value in self.context.items()}
+        self.record = {
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            **context,
+            "mode": self.mode,
+            "total_ms": round(total_ms, 3),
+            "spans": self.spans,
+            "storage": {
+                method: {"calls": entry["calls"], "ms": round(entry["ms"], 3)}
+                for method, entry in sorted(self.storage_calls.items(), key=lambda item: -item[1]["ms"])
+            },
+            "storage_ms": round(sum(entry["ms"] for entry in self.storage_calls.values()), 3),
+        }
+        if cprofile_rows is not None:
+            self.record["cprofile"] = cprofile_rows
+        return self.record
+
+
+def top_functions(profiler, limit=CPROFILE_TOP):
+    """cProfile 결과 중 누적 시간 상위 함수들"""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({function})",
+            "calls": calls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        })
+    rows.sort(key=lambda row: row["cumtime_ms"], reverse=True)
+    return rows[:limit]
+
+
+def append_trace(record, trace_path=None, max_bytes=None):
+    """기록 한 줄을 JSONL 추적 파일에 덧붙임 - max_bytes를 넘게 되면 먼저 <파일>.1로 밀어냄"""
+    trace_path = trace_path or TRACE_PATH
+    max_bytes = TRACE_MAX_BYTES if max_bytes is None else max_bytes
+    directory = os.path.dirname(trace_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    with file_lock(trace_path):
+        try:
+            size = os.path.getsize(trace_path)
+        except FileNotFoundError:
+            size = 0
+        if size and size + len(data) > max_bytes:
+            os.replace(trace_path, trace_path + ".1")
+        with open(trace_path, "ab") as f:
+            f.write(data)
+
+
+@contextlib.contextmanager
+def rerun(mode, trace_path=None, **context):
+    """rerun 전체를 추적 - 예외(st.rerun 포함)로 끝나도 기록은 남김"""
+    profile = RerunProfile(mode, **context)
+    _local.profile = profile
+    profile.start()
+    try:
+        yield profile
+    finally:
+        _local.profile = None
+        append_trace(profile.finish(), trace_path)
+
+
+def timed(kind="section"):
+    """함수 실행을 현재 rerun의 구간으로 기록하는 데코레이터"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profile = current()
+            if profile is None:
+                return fn(*args, **kwargs)
+            with profile.span(fn.__name__, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ProfiledStorage:
+    """저장소 메서드 호출 시간을 현재 rerun에 집계하는 얇은 감싸개"""
+
+    def __init__(self, storage, profile):
+        self._storage = storage
+        self._profile = profile
+
+    def __getattr__(self, name):
+        attribute = getattr(self._storage, name)
+        if not callable(attribute):
+            return attribute
+
+        profile = self._profile
+
+        @functools.wraps(attribute)
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                profile.add_storage_call(name, time.perf_counter() - started)
+        return call
+
+
+def wrap_storage(storage):
+    """추적 중이면 ProfiledStorage, 아니면 저장소 그대로"""
+    profile = current()
+    if profile is None:
+        return storage
+    return ProfiledStorage(storage, profile)
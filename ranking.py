@@ -0,0 +1,295 @@
+# ranking.py - "도움됐어요" 피드백 기반 콘텐츠 순위
+#
+# 콘텐츠마다 (도움됨, 전체) 투표 수를 반감기(HALF_LIFE_DAYS)로 감쇠시켜 보관하고,
+# 베타 사전분포를 둔 베이즈 평균 (도움됨 + α) / (전체 + α + β)로 점수를 매깁니다.
+# 투표가 없는 콘텐츠는 사전 평균(0.5)이고, 오래된 투표일수록 영향이 줄어듭니다.
+#
+# 감정별 상위 TOP_K개를 [점수, 콘텐츠 키, 목록 위치] 형태로 미리 정렬해 두고 투표가 올 때마다
+# 그 항목만 고치므로, 추천 화면은 목록 정렬 없이 앞의 k개만 읽습니다 (O(k)).
+# 목록 크기가 바뀌었거나, 위치가 맞지 않거나, 하루가 지났으면 그 감정만 O(N log K)로 다시 만듭니다.
+# 순위는 사용자별이 아니라 앱 전체 공용(data/content_ranking.json)입니다.
+#
+# 투표 한 번마다 상태 전체를 다시 쓰지 않도록, 투표는 투표 로그(content_ranking.json.votes)에 한 줄만
+# 덧붙이고 상태 파일(스냅샷)은 SNAPSHOT_EVERY번마다 한 줄 JSON으로 다시 씁니다.
+# 스냅샷은 자신이 반영한 투표 로그의 바이트 위치(offset)를 함께 저장하고, 읽을 때는 스냅샷에 로그의 꼬리만
+# 다시 적용합니다. 프로세스마다 적용한 상태를 기억해 두므로 읽기마다 새로 덧붙은 투표만 읽습니다.
+
+import argparse
+import heapq
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import feedback_log
+from read_cache import file_signature
+from write_coordinator import file_lock, get_writer, read_json
+
+RANKING_PATH = os.environ.get("MINDFUL_RANKING_PATH", os.path.join("data", "content_ranking.json"))
+HALF_LIFE_DAYS = float(os.environ.get("MINDFUL_RANKING_HALF_LIFE_DAYS", "90"))
+PRIOR_HELPFUL = 1.0
+PRIOR_UNHELPFUL = 1.0
+# 추천에 쓰는 개수(3)보다 넉넉히 보관 - 순위가 내려간 항목을 대신할 후보
+TOP_K = 20
+REBUILD_SECONDS = 24 * 60 * 60
+VOTES_SUFFIX = ".votes"
+SNAPSHOT_EVERY = int(os.environ.get("MINDFUL_RANKING_SNAPSHOT_EVERY", "100"))
+
+
+def empty_state():
+    # items: {감정: {콘텐츠 키: [감쇠된 도움됨, 감쇠된 전체, 마지막 투표 시각]}}
+    # top:   {감정: {"built_at": 시각, "size": 목록 길이, "entries": [[점수, 키, 위치], ...]}}
+    # offset: 반영한 투표 로그의 바이트 위치
+    return {"items": {}, "top": {}, "offset": 0}
+
+
+def item_key(item):
+    """카탈로그 항목 키 - feedback_log.content_key와 같은 규칙 (id, 없으면 제목)"""
+    return item.get("id") or item.get("title", "")
+
+
+def score(helpful, total):
+    """베이즈 평균 - 투표가 없으면 사전 평균"""
+    return (helpful + PRIOR_HELPFUL) / (total + PRIOR_HELPFUL + PRIOR_UNHELPFUL)
+
+
+def decayed(entry, now):
+    """[도움됨, 전체, 시각]을 now 시점으로 감쇠한 (도움됨, 전체)"""
+    helpful, total, updated_at = entry
+    factor = 0.5 ** (max(now - updated_at, 0) / (HALF_LIFE_DAYS * 86400))
+    return helpful * factor, total * factor
+
+
+def entry_score(entry, now):
+    if entry is None:
+        return score(0, 0)
+    return score(*decayed(entry, now))
+
+
+def _sort_key(top_entry):
+    # 점수 높은 순, 같으면 목록 앞쪽 먼저
+    return (-top_entry[0], top_entry[2])
+
+
+def build_top(emotion_items, catalog_items, now, k=TOP_K):
+    """감정 하나의 상위 k개 - heapq로 O(N log k)"""
+    scored = (
+        [entry_score(emotion_items.get(item_key(item)), now), item_key(item), position]
+        for position, item in enumerate(catalog_items)
+    )
+    entries = heapq.nsmallest(k, scored, key=_sort_key)
+    return {"built_at": now, "size": len(catalog_items), "entries": entries}
+
+
+def add_vote(state, emotion, key, position, is_helpful, now):
+    """투표 하나를 카운터와 상위 목록에 반영 (state를 제자리 수정)"""
+    emotion_items = state["items"].setdefault(emotion, {})
+    entry = emotion_items.get(key)
+    helpful, total = decayed(entry, now) if entry else (0.0, 0.0)
+    entry = [helpful + (1 if is_helpful else 0), total + 1, now]
+    emotion_items[key] = entry
+
+    top = state["top"].get(emotion)
+    if top is None:
+        return
+    candidate = [entry_score(entry, now), key, position]
+    others = [top_entry for top_entry in top["entries"] if top_entry[1] != key]
+    was_listed = len(others) < len(top["entries"])
+    worst = max(others, key=_sort_key) if others else None
+    if worst is not None and _sort_key(candidate) > _sort_key(worst):
+        if len(others) >= TOP_K:
+            # 목록 밖에 그대로 남음
+            return
+        if was_listed and top["size"] > len(top["entries"]):
+            # 목록 끝으로 밀려났는데 목록 밖 후보가 더 높을 수 있으므로 다음 조회 때 다시 만듦
+            del state["top"][emotion]
+            return
+    others.append(candidate)
+    others.sort(key=_sort_key)
+    del others[TOP_K:]
+    top["entries"] = others
+
+
+def top_is_valid(top, catalog_items, now, k):
+    if top is None or top["size"] != len(catalog_items) or now - top["built_at"] > REBUILD_SECONDS:
+        return False
+    entries = top["entries"]
+    if len(entries) < min(k, len(catalog_items)):
+        return False
+    for _, key, position in entries[:k]:
+        if position >= len(catalog_items) or item_key(catalog_items[position]) != key:
+            return False
+    return True
+
+
+# 파일 보관 (투표 로그 + 그룹 커밋 writer로 쓰는 스냅샷)
+def votes_path(path):
+    return path + VOTES_SUFFIX
+
+
+def _replay(state, path):
+    """state["offset"] 이후의 투표를 state에 적용 (제자리 수정) - 적용한 투표 수"""
+    offset = state.get("offset", 0)
+    try:
+        f = open(votes_path(path), "rb")
+    except FileNotFoundError:
+        return 0
+    count = 0
+    with f:
+        if os.fstat(f.fileno()).st_size <= offset:
+            return 0
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                # 아직 쓰는 중인 마지막 줄
+                break
+            offset += len(raw)
+            try:
+                vote = json.loads(raw)
+            except ValueError:
+                # 중단된 추가가 남긴 조각
+                continue
+            add_vote(state, vote["emotion"], vote["key"], vote["position"], vote["helpful"], vote["at"])
+            count += 1
+    state["offset"] = offset
+    return count
+
+
+def _load_current(path):
+    """스냅샷 + 투표 로그 꼬리 - writer가 잠금 안에서 부름"""
+    state = read_json(path, empty_state)
+    _replay(state, path)
+    return state
+
+
+# 경로 → {"signature": 스냅샷 서명, "state": 로그까지 적용한 상태, "pending": 스냅샷 이후 투표 수}
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def _writer(path):
+    def forget(state):
+        with _loaded_lock:
+            _loaded.pop(path, None)
+
+    return get_writer(path, default_factory=empty_state, load=lambda: _load_current(path), on_commit=forget, indent=None)
+
+
+def _loaded_state(path):
+    with _loaded_lock:
+        signature = file_signature([path])
+        loaded = _loaded.get(path)
+        if loaded is None or loaded["signature"] != signature:
+            loaded = _loaded[path] = {"signature": signature, "state": read_json(path, empty_state), "pending": 0}
+        loaded["pending"] += _replay(loaded["state"], path)
+        return loaded
+
+
+def load(path=None):
+    """순위 상태 (스냅샷 + 그 뒤 투표) - 읽기 전용"""
+    return _loaded_state(path or RANKING_PATH)["state"]
+
+
+def record_vote(emotion, key, position, is_helpful, now=None, path=None):
+    """피드백 한 건 반영 - position은 카탈로그 목록에서의 위치
+
+    투표 로그에 한 줄만 덧붙이고, 스냅샷 이후 투표가 SNAPSHOT_EVERY개 쌓였을 때만 스냅샷을 다시 씁니다.
+    """
+    path = path or RANKING_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    now = now if now is not None else time.time()
+    vote = {"emotion": emotion, "key": key, "position": position, "helpful": bool(is_helpful), "at": now}
+    data = (json.dumps(vote, ensure_ascii=False) + "\n").encode("utf-8")
+    with file_lock(path):
+        with open(votes_path(path), "a+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    # 앞선 추가가 줄 중간에서 끊김 - 새 투표가 그 조각에 붙지 않도록 줄을 끝냄
+                    data = b"\n" + data
+            f.write(data)
+    if _loaded_state(path)["pending"] >= SNAPSHOT_EVERY:
+        snapshot(path)
+
+
+def snapshot(path=None):
+    """투표 로그를 스냅샷에 반영해 다시 씀 (writer의 load가 로그 꼬리를 적용)"""
+    path = path or RANKING_PATH
+    _writer(path).update(lambda state: None)
+
+
+def top_contents(emotion, catalog_items, k=3, now=None, path=None):
+    """점수 상위 k개 [(목록 위치, 항목), ...] - 보통은 저장된 상위 목록만 읽음"""
+    path = path or RANKING_PATH
+    now = now if now is not None else time.time()
+    top = load(path)["top"].get(emotion)
+    if not top_is_valid(top, catalog_items, now, k):
+        def rebuild(state):
+            state["top"][emotion] = build_top(state["items"].get(emotion, {}), catalog_items, now)
+            return state["top"][emotion]
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        top = _writer(path).update(rebuild)
+    return [(position, catalog_items[position]) for _, _, position in top["entries"][:k]]
+
+
+def _event_time(event, default):
+    try:
+        return datetime.fromisoformat(event["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return default
+
+
+def rebuild_from_events(events, catalog, now=None):
+    """피드백 이벤트 전체로 순위 상태를 새로 계산 (시간순으로 감쇠 반영)"""
+    now = now if now is not None else time.time()
+    state = empty_state()
+    positions = {
+        emotion: {item_key(item): position for position, item in enumerate(items)}
+        for emotion, items in catalog.items()
+    }
+    for event in sorted(events, key=lambda event: _event_time(event, now)):
+        emotion = event.get("emotion", "unknown")
+        key = feedback_log.content_key(event)
+        add_vote(state, emotion, key, positions.get(emotion, {}).get(key, 0), event.get("is_helpful"),
+                 _event_time(event, now))
+    for emotion, items in catalog.items():
+        state["top"][emotion] = build_top(state["items"].get(emotion, {}), items, now)
+    return state
+
+
+def main(argv=None):
+    import storage
+
+    parser = argparse.ArgumentParser(description="콘텐츠 순위 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="모든 사용자의 피드백 기록으로 순위 다시 계산")
+    rebuild_parser.add_argument("--contents", default=os.path.join("data", "contents.json"))
+    rebuild_parser.add_argument("--output", default=RANKING_PATH)
+    args = parser.parse_args(argv)
+
+    with open(args.contents, "r", encoding="utf-8") as f:
+        catalog = json.load(f)
+
+    events = list(storage.create_storage().load_feedback()["feedbacks"])
+    users = sorted(os.listdir(storage.USERS_DIR)) if os.path.isdir(storage.USERS_DIR) else []
+    for user_id in users:
+        if storage.is_valid_user_id(user_id):
+            events.extend(storage.create_storage(user_id=user_id).load_feedback()["feedbacks"])
+
+    state = rebuild_from_events(events, catalog)
+
+    def replace(data):
+        # 피드백 기록에 이미 들어 있는 투표는 다시 적용하지 않도록 로그 위치는 그대로 둠
+        offset = data.get("offset", 0)
+        data.clear()
+        data.update(state, offset=offset)
+
+    _writer(args.output).update(replace)
+    print(json.dumps({"events": len(events), "users": len(users), "emotions": len(state["top"])}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
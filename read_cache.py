@@ -0,0 +1,80 @@
+# read_cache.py - 프로세스 공용 파일 읽기 캐시
+#
+# Streamlit은 클릭할 때마다 스크립트 전체를 다시 실행하므로,
+# 바뀌지 않은 JSON 파일은 다시 파싱하지 않도록 (mtime, size)로 검증해 캐시합니다.
+# 캐시된 값은 여러 세션이 공유하므로 읽기 전용으로 다뤄야 합니다.
+
+import os
+import threading
+from collections import OrderedDict
+
+
+def file_signature(paths):
+    """파일들의 (mtime_ns, size) 묶음 - 없는 파일은 None"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class FileCache:
+    """파일 변경 시각/크기로 무효화되는 LRU 캐시"""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, paths, loader):
+        """paths가 바뀌지 않았으면 캐시된 값, 아니면 loader() 결과를 캐시하고 반환"""
+        signature = file_signature(paths)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            self._entries[key] = (signature, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """적중/실패 횟수와 현재 항목 수"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+shared_cache = FileCache(max_entries=int(os.environ.get("MINDFUL_CACHE_ENTRIES", "128")))
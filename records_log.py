@@ -0,0 +1,238 @@
+# records_log.py - 인덱스가 있는 감정 기록 로그 (records.txt)
+#
+# records.txt 형식('[timestamp] text' 한 줄씩)은 그대로 두고,
+#   - 최근 N개는 파일 끝에서 거꾸로 읽어 필요한 바이트만 읽고
+#   - 기간 조회는 희소 오프셋 인덱스(records.txt.idx)를 이진 탐색해
+#     시작 지점부터만 읽습니다.
+# 인덱스는 INDEX_INTERVAL_BYTES마다 한 줄('timestamp<TAB>offset')만 기록합니다.
+# 파일은 항상 시각 순으로 유지합니다 - tail과 between이 이 순서에 기댑니다. 시각이 없는 예전 기록은 맨 앞에 둡니다.
+# 파일 마지막 기록보다 오래된 기록(가져오기로 채우는 예전 기록)이 섞여 들어오면, 새 기록은 그대로 덧붙이고
+# 오래된 기록만 모아 정렬한 뒤 파일과 병합해 다시 쓰고 인덱스를 재생성합니다.
+
+import bisect
+import heapq
+import os
+import re
+import threading
+from collections import Counter
+
+RECORD_LINE_PATTERN = re.compile(r"^\[([^\]]+)\] (.*)$")
+
+INDEX_SUFFIX = ".idx"
+INDEX_INTERVAL_BYTES = 4096
+TAIL_BLOCK_BYTES = 4096
+
+_lock = threading.Lock()
+# 경로별 마지막으로 색인한 오프셋
+_last_indexed = {}
+
+
+def parse_record_line(line):
+    """'[timestamp] text' 형식의 기록 한 줄을 (timestamp, text)로 분리"""
+    line = line.rstrip("\n")
+    match = RECORD_LINE_PATTERN.match(line)
+    if match:
+        return match.group(1), match.group(2)
+    return None, line
+
+
+def format_record_line(timestamp, text):
+    """(timestamp, text)를 records.txt 형식으로"""
+    if timestamp is None:
+        return text
+    return f"[{timestamp}] {text}"
+
+
+def index_path(path):
+    return path + INDEX_SUFFIX
+
+
+def _read_index(path):
+    """인덱스 파일을 (timestamps, offsets) 두 리스트로"""
+    timestamps, offsets = [], []
+    try:
+        with open(index_path(path), "r", encoding="utf-8") as f:
+            for line in f:
+                timestamp, _, offset = line.rstrip("\n").rpartition("\t")
+                if timestamp:
+                    timestamps.append(timestamp)
+                    offsets.append(int(offset))
+    except FileNotFoundError:
+        pass
+    return timestamps, offsets
+
+
+def _last_index_offset(path):
+    if path not in _last_indexed:
+        _, offsets = _read_index(path)
+        _last_indexed[path] = offsets[-1] if offsets else None
+    return _last_indexed[path]
+
+
+def append(path, timestamp, text):
+    """기록 한 줄 추가 - 필요하면 인덱스에도 한 줄 추가"""
+    append_many(path, [(timestamp, text)])
+
+
+def append_many(path, records):
+    """(timestamp, text)들을 파일을 한 번만 열어 차례로 추가 - 추가한 줄 수
+
+    records는 하나씩 소비하므로 제너레이터를 넘기면 기록 수와 관계없이 메모리가 일정합니다.
+    파일 마지막 기록보다 오래된 기록만 모아 두었다가 파일과 병합합니다.
+    """
+    count = 0
+    index_lines = []
+    late = []
+    with _lock:
+        last = _last_index_offset(path)
+        newest = _last_timestamp(path)
+        with open(path, "ab") as f:
+            offset = f.tell()
+            for timestamp, text in records:
+                count += 1
+                if newest is not None and (timestamp or "") < newest:
+                    late.append((timestamp, text))
+                    continue
+                data = (format_record_line(timestamp, text) + "\n").encode("utf-8")
+                if timestamp is not None and (last is None or offset - last >= INDEX_INTERVAL_BYTES or offset < last):
+                    index_lines.append(f"{timestamp}\t{offset}\n")
+                    last = offset
+                f.write(data)
+                offset += len(data)
+                if timestamp is not None:
+                    newest = timestamp
+
+        if index_lines:
+            with open(index_path(path), "a", encoding="utf-8") as f:
+                f.writelines(index_lines)
+            _last_indexed[path] = last
+        if late:
+            _merge(path, late)
+    return count
+
+
+def _last_timestamp(path):
+    """파일 마지막 기록의 시각 - 파일이 비었거나 시각이 없으면 None"""
+    lines = tail(path, 1)
+    return lines[0][0] if lines else None
+
+
+def _sort_keys(lines):
+    """(정렬 키, 줄) - 시각이 없는 줄은 맨 앞"""
+    for raw in lines:
+        timestamp, _ = parse_record_line(raw.decode("utf-8", errors="replace"))
+        yield timestamp or "", raw
+
+
+def _merge(path, late):
+    """정렬된 파일과 오래된 기록들을 병합해 다시 쓰고 인덱스 재생성 (_lock 안에서)
+
+    같은 시각이면 파일에 있던 기록이 먼저 옵니다.
+    """
+    late.sort(key=lambda record: record[0] or "")
+    added = ((timestamp or "", (format_record_line(timestamp, text) + "\n").encode("utf-8")) for timestamp, text in late)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(path, "rb") as source, open(tmp_path, "wb") as f:
+        for _, raw in heapq.merge(_sort_keys(source), added, key=lambda item: item[0]):
+            f.write(raw if raw.endswith(b"\n") else raw + b"\n")
+    os.replace(tmp_path, path)
+    _rebuild_index(path)
+
+
+def rebuild_index(path):
+    """records.txt 전체를 한 번 읽어 인덱스 재생성"""
+    with _lock:
+        return _rebuild_index(path)
+
+
+def _rebuild_index(path):
+    entries = []
+    last = None
+    offset = 0
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            for raw in f:
+                timestamp, _ = parse_record_line(raw.decode("utf-8", errors="replace").rstrip("\n"))
+                if timestamp is not None and (last is None or offset - last >= INDEX_INTERVAL_BYTES):
+                    entries.append(f"{timestamp}\t{offset}\n")
+                    last = offset
+                offset += len(raw)
+
+    tmp_path = index_path(path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(entries)
+    os.replace(tmp_path, index_path(path))
+    _last_indexed[path] = last
+    return len(entries)
+
+
+def _index_is_stale(path, offsets):
+    size = os.path.getsize(path)
+    if not offsets:
+        return size > 0
+    return offsets[-1] >= size
+
+
+def tail(path, n):
+    """마지막 n개 기록을 최신순 (timestamp, text) 리스트로 - 끝에서부터 필요한 만큼만 읽음"""
+    if n <= 0 or not os.path.exists(path):
+        return []
+
+    lines = []
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0 and len(lines) < n:
+            step = min(TAIL_BLOCK_BYTES, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step) + remainder
+            parts = chunk.split(b"\n")
+            # 첫 조각은 줄 중간일 수 있으므로 다음 블록과 합침
+            remainder = parts[0]
+            for part in reversed(parts[1:]):
+                if part.strip():
+                    lines.append(part)
+                    if len(lines) == n:
+                        break
+        if len(lines) < n and position == 0 and remainder.strip():
+            lines.append(remainder)
+
+    return [parse_record_line(line.decode("utf-8", errors="replace").strip()) for line in lines]
+
+
+def between(path, start, end):
+    """start <= timestamp <= end 인 기록을 오래된 순으로 - 인덱스 이진 탐색 후 그 구간만 읽음"""
+    if not os.path.exists(path):
+        return []
+
+    timestamps, offsets = _read_index(path)
+    if _index_is_stale(path, offsets):
+        rebuild_index(path)
+        timestamps, offsets = _read_index(path)
+
+    # start보다 앞선 마지막 인덱스 지점부터 읽기 시작
+    position = bisect.bisect_left(timestamps, start) - 1
+    offset = offsets[position] if position >= 0 else 0
+
+    results = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            timestamp, text = parse_record_line(raw.decode("utf-8", errors="replace").strip())
+            if timestamp is None:
+                continue
+            if timestamp > end:
+                break
+            if timestamp >= start:
+                results.append((timestamp, text))
+    return results
+
+
+def count_per_day(path):
+    """날짜('YYYY-MM-DD')별 기록 수 - 줄 앞의 '[YYYY-MM-DD'만 보고 세므로 본문은 디코딩하지 않음"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "rb") as f:
+        counts = Counter(line[1:11] for line in f if line[:1] == b"[")
+    return {day.decode("utf-8", errors="replace"): count for day, count in counts.items()}
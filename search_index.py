@@ -0,0 +1,282 @@
+# search_index.py - 달력 메모, 감정 기록, 편지 전문 검색
+#
+# 한국어는 띄어쓰기와 조사 때문에 단어 단위 색인이 잘 맞지 않으므로,
+# 단어마다 글자 1-gram과 2-gram을 토큰으로 쓰는 역색인을 둡니다. ("과제 마감" → 과, 제, 과제, 마, 감, 마감)
+# 질의의 모든 토큰을 가진 문서를 정렬된 posting 목록의 이분 탐색으로 좁힌 뒤,
+# 질의 단어가 실제로 들어 있는지 확인하고, 문구 그대로 일치하는 문서를 먼저, 그 안에서는 최신순으로 돌려줍니다.
+# 문서 번호가 저장 순서라 최신 문서부터 훑다가 결과가 다 차면 멈추므로 흔한 단어도 빠릅니다.
+#
+# 저장은 search/ 폴더의 두 파일:
+#   search.log      : 추가/삭제 연산 JSONL (덧붙이기만 함 - 저장할 때마다 한 줄)
+#   search.snapshot : 메모리 색인 전체(marshal)와 그때까지 반영한 로그 위치
+# 검색할 때 스냅샷을 읽고 로그 꼬리만 재생하며, 꼬리가 SNAPSHOT_EVERY_BYTES를 넘으면 스냅샷을 새로 씁니다.
+# 로그가 없으면(처음 사용) backfill()이 주는 기존 데이터로 한 번 채웁니다.
+
+import bisect
+import hashlib
+import json
+import marshal
+import os
+import re
+import threading
+import unicodedata
+from array import array
+
+from write_coordinator import file_lock
+
+LOG_NAME = "search.log"
+SNAPSHOT_NAME = "search.snapshot"
+SNAPSHOT_EVERY_BYTES = 1 << 20
+KINDS = ("note", "record", "letter")
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+# 토큰화
+def normalize(text):
+    return unicodedata.normalize("NFC", text or "").lower()
+
+
+def words(text):
+    return _WORD_PATTERN.findall(normalize(text))
+
+
+def tokenize(text):
+    """문서의 토큰 집합 - 단어별 글자 1-gram + 2-gram"""
+    tokens = set()
+    for word in words(text):
+        tokens.update(word)
+        tokens.update(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def query_tokens(word):
+    """질의 단어 하나의 토큰 - 두 글자 이상이면 2-gram만 (1-gram보다 posting이 짧음)"""
+    if len(word) == 1:
+        return {word}
+    return {word[i:i + 2] for i in range(len(word) - 1)}
+
+
+# 색인 항목 (키, 종류, 날짜, 본문)
+def note_entry(day, entry):
+    return (f"note:{day}", "note", day, entry.get("note", "") if entry else "")
+
+
+def record_entry(timestamp, text):
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+    return (f"record:{timestamp or ''}:{digest}", "record", timestamp or "", text)
+
+
+def letter_entry(letter):
+    # 편지는 배송일 기준 - 검색 화면은 until로 아직 도착하지 않은 편지를 거름
+    return (f"letter:{letter['id']}", "letter", letter.get("delivery_date", ""), letter.get("content", ""))
+
+
+class SearchIndex:
+    """로그 + 스냅샷으로 보관하는 역색인 - 메모리 색인은 처음 검색할 때 만듦"""
+
+    def __init__(self, directory, backfill=None):
+        self.directory = directory
+        self.log_path = os.path.join(directory, LOG_NAME)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_NAME)
+        # backfill(): 색인이 없을 때 채울 (키, 종류, 날짜, 본문) 항목들
+        self.backfill = backfill
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._offset = 0
+        self._snapshot_offset = 0
+        self._docs = []
+        self._doc_ids = {}
+        self._postings = {}
+        self._live = 0
+
+    # 쓰기 (로그에 덧붙이기만 - 메모리 색인은 다음 검색 때 따라잡음)
+    def _ensure_log(self):
+        if os.path.exists(self.log_path):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # 날짜순으로 넣어 문서 번호 순서가 최신순 정렬 기준이 되게 함
+        entries = sorted(self.backfill(), key=lambda entry: entry[2]) if self.backfill else []
+        with file_lock(self.log_path):
+            if not os.path.exists(self.log_path):
+                tmp_path = self.log_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.writelines(_add_line(*entry) for entry in entries)
+                os.replace(tmp_path, self.log_path)
+
+    def _append_lines(self, lines):
+        self._ensure_log()
+        with file_lock(self.log_path):
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+
+    def add(self, key, kind, date, text):
+        """문서 추가 (같은 키가 있으면 교체)"""
+        self._append_lines([_add_line(key, kind, date, text)])
+
+    def add_many(self, entries):
+        self._append_lines([_add_line(*entry) for entry in entries])
+
+    def remove(self, key):
+        self._append_lines([json.dumps({"k": key, "del": 1}, ensure_ascii=False) + "\n"])
+
+    def replace_kind(self, kind, entries):
+        """kind 종류 문서 전체를 entries로 교체 (전체 저장용)"""
+        entries = list(entries)
+        with self._lock:
+            self._sync()
+            keep = {entry[0] for entry in entries}
+            stale = [doc[0] for doc in self._docs if doc is not None and doc[1] == kind and doc[0] not in keep]
+        lines = [json.dumps({"k": key, "del": 1}, ensure_ascii=False) + "\n" for key in stale]
+        self._append_lines(lines + [_add_line(*entry) for entry in entries])
+
+    # 메모리 색인
+    def _apply(self, op):
+        key = op["k"]
+        previous = self._doc_ids.pop(key, None)
+        if previous is not None:
+            self._docs[previous] = None
+            self._live -= 1
+        if op.get("del"):
+            return
+        doc_id = len(self._docs)
+        self._docs.append([key, op["t"], op["d"], op["x"]])
+        self._doc_ids[key] = doc_id
+        self._live += 1
+        for token in tokenize(op["x"]):
+            postings = self._postings.get(token)
+            if postings is None:
+                self._postings[token] = array("I", [doc_id])
+            else:
+                if not isinstance(postings, array):
+                    postings = self._postings[token] = _from_bytes(postings)
+                postings.append(doc_id)
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = marshal.load(f)
+        except (FileNotFoundError, EOFError, ValueError, TypeError):
+            return
+        self._docs = snapshot["docs"]
+        # posting은 bytes 그대로 두었다가 처음 쓸 때 array로 바꿈
+        self._postings = snapshot["postings"]
+        self._doc_ids = {doc[0]: doc_id for doc_id, doc in enumerate(self._docs) if doc is not None}
+        self._live = len(self._doc_ids)
+        self._offset = self._snapshot_offset = snapshot["offset"]
+
+    def _sync(self):
+        """호출자가 self._lock을 쥐고 있어야 함 - 스냅샷 로드 + 로그 꼬리 재생"""
+        self._ensure_log()
+        if not self._loaded:
+            self._load_snapshot()
+            self._loaded = True
+        if os.path.getsize(self.log_path) < self._offset:
+            # 로그가 새로 만들어짐 - 처음부터 다시
+            self._docs, self._doc_ids, self._postings, self._live = [], {}, {}, 0
+            self._offset = self._snapshot_offset = 0
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                self._offset += len(raw)
+                if raw.strip():
+                    self._apply(json.loads(raw))
+        if self._offset - self._snapshot_offset >= SNAPSHOT_EVERY_BYTES:
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        postings = {
+            token: (postings.tobytes() if isinstance(postings, array) else postings)
+            for token, postings in self._postings.items()
+        }
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            marshal.dump({"offset": self._offset, "docs": self._docs, "postings": postings}, f)
+        os.replace(tmp_path, self.snapshot_path)
+        self._snapshot_offset = self._offset
+
+    def _postings_for(self, token):
+        postings = self._postings.get(token)
+        if postings is not None and not isinstance(postings, array):
+            postings = self._postings[token] = _from_bytes(postings)
+        return postings
+
+    def __len__(self):
+        with self._lock:
+            self._sync()
+            return self._live
+
+    # 검색
+    def search(self, query, limit=20, kinds=None, until=None):
+        """[{"key", "kind", "date", "text", "phrase"}, ...] - 문구 그대로 일치 먼저, 그다음 최신순
+
+        until: 이 값보다 날짜가 늦은 문서 제외 (아직 도착하지 않은 편지 등)
+        """
+        query_words = words(query)
+        if not query_words:
+            return []
+        phrase = " ".join(query_words)
+        with self._lock:
+            self._sync()
+            tokens = set()
+            for word in query_words:
+                tokens |= query_tokens(word)
+            postings = []
+            for token in tokens:
+                token_postings = self._postings_for(token)
+                if not token_postings:
+                    return []
+                postings.append(token_postings)
+            postings.sort(key=len)
+
+            # 문서 번호는 저장 순서(≈ 날짜순)이므로 가장 짧은 posting을 뒤에서부터 훑고
+            # 나머지 posting은 이분 탐색으로 확인 - 문구 일치가 limit개 모이면 멈춤
+            phrase_hits, word_hits = [], []
+            for doc_id in reversed(postings[0]):
+                if not all(_contains(other, doc_id) for other in postings[1:]):
+                    continue
+                doc = self._docs[doc_id]
+                if doc is None or (kinds and doc[1] not in kinds) or (until and doc[2] > until):
+                    continue
+                text = normalize(doc[3])
+                if not all(word in text for word in query_words):
+                    continue
+                if len(query_words) == 1 or phrase in " ".join(_WORD_PATTERN.findall(text)):
+                    phrase_hits.append(doc)
+                    if len(phrase_hits) >= limit:
+                        break
+                elif len(word_hits) < limit:
+                    word_hits.append(doc)
+
+        hits = [(doc, True) for doc in phrase_hits] + [(doc, False) for doc in word_hits]
+        return [
+            {"key": doc[0], "kind": doc[1], "date": doc[2], "text": doc[3], "phrase": is_phrase}
+            for doc, is_phrase in hits[:limit]
+        ]
+
+
+def _add_line(key, kind, date, text):
+    return json.dumps({"k": key, "t": kind, "d": date, "x": text}, ensure_ascii=False) + "\n"
+
+
+def _from_bytes(data):
+    postings = array("I")
+    postings.frombytes(data)
+    return postings
+
+
+def _contains(postings, doc_id):
+    position = bisect.bisect_left(postings, doc_id)
+    return position < len(postings) and postings[position] == doc_id
+
+
+def snippet(text, query, width=40):
+    """질의 단어 주변 본문 일부"""
+    query_words = words(query)
+    lowered = normalize(text)
+    position = min((lowered.find(word) for word in query_words if word in lowered), default=0)
+    start = max(position - width // 2, 0)
+    end = min(start + width + sum(len(word) for word in query_words), len(text))
+    return ("…" if start > 0 else "") + text[start:end] + ("…" if end < len(text) else "")
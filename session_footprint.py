@@ -0,0 +1,155 @@
+# session_footprint.py - 세션 하나가 붙잡고 있는 메모리(바이트) 측정
+#
+# streamlit.testing(AppTest)으로 app.py를 실제로 실행해 정해 둔 경로(홈, 감정 탐색 끝까지, 감정 달력,
+# 탐색하다 오래 쉰 뒤)를 지나간 다음, 그 세션 몫의 객체 크기를 더합니다.
+#   session_state : 세션의 SessionState (사용자 값 + 위젯 값/메타데이터)
+#   exploration   : exploration.store에 있는 그 세션의 탐색 상태
+# 모듈, 클래스, 함수와 앱 모듈들이 전역으로 가진 표(EMOTIONS_CONFIG 등)에서 닿는 객체는
+# 모든 세션이 같이 쓰므로 세지 않습니다 (세션/사용자별 값을 모아 두는 전역 저장소 안쪽은 공용에서 제외).
+# Streamlit은 세션이 한 번이라도 그린 위젯의 메타데이터를 계속 들고 있으므로 위젯 수도 함께 보고합니다.
+# 사용자 데이터는 임시 폴더에 만들고 끝나면 지웁니다.
+#
+#   python session_footprint.py
+#   python session_footprint.py --sessions 10000 --output footprint.json
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import types
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# 세지 않는 객체 종류 (프로세스 공용)
+SHARED_TYPES = (
+    types.ModuleType, type, types.FunctionType, types.BuiltinFunctionType, types.CodeType,
+    types.MethodDescriptorType, types.WrapperDescriptorType,
+)
+
+
+def _walk(roots, seen):
+    """roots에서 닿는 객체들 (공용 종류와 seen은 건너뜀)"""
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        yield obj
+        stack.extend(gc.get_referents(obj))
+
+
+def _per_session_stores():
+    """세션/사용자별 값을 모아 두는 전역 저장소들 - 안쪽은 공용이 아님"""
+    import delivery
+    import exploration
+
+    return [exploration.store, delivery.scheduler]
+
+
+def shared_ids(root=ROOT):
+    """root 아래 앱 모듈들의 전역 값에서 닿는 객체 id"""
+    seen = {id(store) for store in _per_session_stores()}
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None) or ""
+        if os.path.abspath(path).startswith(root + os.sep):
+            for _ in _walk(vars(module).values(), seen):
+                pass
+    return seen
+
+
+def deep_size(obj, shared):
+    """obj에서 닿는 세션 몫 객체들의 sys.getsizeof 합"""
+    return sum(sys.getsizeof(item) for item in _walk([obj], set(shared)))
+
+
+def _measure(at):
+    import exploration
+
+    shared = shared_ids()
+    state = at.session_state._state._state
+    keys = {key: deep_size(value, shared) for key, value in at.session_state.items()}
+    explored = exploration.store.get(at.session_state["session_id"])
+    session_bytes = deep_size(state, shared)
+    exploration_bytes = deep_size(explored, shared) if explored is not None else 0
+    return {
+        "bytes": session_bytes + exploration_bytes,
+        "session_state": session_bytes,
+        "exploration": exploration_bytes,
+        "widgets": len(state._new_widget_state.widget_metadata),
+        "keys": dict(sorted(keys.items(), key=lambda item: -item[1])),
+    }
+
+
+def _open(page):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    at.run()
+    if page:
+        at.sidebar.selectbox[0].set_value(page).run()
+    return at
+
+
+def _explore(at):
+    """감정 선택 → 빠른 단어 → 시점/상황 → 통찰까지"""
+    at.button(key="emotion_불안").click().run()
+    at.button(key="quick_바람").click().run()
+    at.text_area(key="emotion_timing").input("과제 마감이 겹쳐서 잠을 못 잤어요").run()
+    at.button(key="next2").click().run()
+    return at
+
+
+def measure():
+    """경로별 {"bytes", "session_state", "exploration", "keys": {키: 바이트}}"""
+    import exploration
+
+    journeys = {}
+    journeys["home"] = _measure(_open(None))
+    at = _explore(_open("🎯 감정 탐색"))
+    journeys["exploration"] = _measure(at)
+
+    # 오래 쉰 뒤: 시계를 IDLE_SECONDS만큼 돌리고 다른 세션이 저장소를 쓰면 지워짐
+    clock = exploration.store.clock
+    exploration.store.clock = lambda: clock() + exploration.IDLE_SECONDS
+    try:
+        exploration.store.expire()
+        journeys["exploration.idle"] = _measure(at)
+        at.run()
+        journeys["exploration.idle.rerun"] = _measure(at)
+    finally:
+        exploration.store.clock = clock
+
+    journeys["calendar"] = _measure(_open("🌈 감정 달력"))
+    return journeys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="세션 하나가 붙잡고 있는 메모리 측정")
+    parser.add_argument("--sessions", type=int, default=10_000, help="이만큼의 세션이면 몇 MB인지 함께 표시")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="mindful_sessions_") as users_dir:
+        os.environ["MINDFUL_USERS_DIR"] = users_dir
+        import storage
+
+        storage.USERS_DIR = users_dir
+        journeys = measure()
+    report = {
+        "journeys": journeys,
+        "sessions": args.sessions,
+        "mb_for_sessions": {
+            name: round(journey["bytes"] * args.sessions / 1024 / 1024, 1) for name, journey in journeys.items()
+        },
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,994 @@
+# storage.py - 마음의 나침반 저장소 계층
+#
+# 앱의 모든 영속화(감정 달력, 미래 편지, 감정 기록, 콘텐츠 피드백)는
+# Storage 인터페이스를 거칩니다.
+#   - FileStorage: 기존 JSON/TXT 파일 (기본값)
+#   - SqliteStorage: 표준 라이브러리 sqlite3 (WAL 모드 + 인덱스)
+# 저장소 선택: 환경 변수 MINDFUL_STORAGE=files|sqlite
+
+import argparse
+import itertools
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+
+import calendar_journal
+import emotion_stats
+import feedback_log
+import letter_store
+import records_log
+import search_index
+from calendar_table import CalendarTable
+from read_cache import file_signature, shared_cache
+from streaks import StreakEngine, to_ordinal
+from write_coordinator import file_lock, get_writer
+from records_log import parse_record_line
+
+
+LETTER_HEADER_KEYS = ("id", "write_date", "delivery_date", "is_read", "read_date", "delivered_at")
+# 일괄 추가(가져오기, 옮기기)에서 한 번에 메모리에 두는 최대 행 수
+BULK_CHUNK_ROWS = 5000
+
+
+def _chunks(items, size=None):
+    """iterable을 size개씩 잘라 리스트로 - 전체를 메모리에 올리지 않음"""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size or BULK_CHUNK_ROWS))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _mark_read(letters_data, letter_id, read_date):
+    for letter in letters_data["letters"]:
+        if letter["id"] == letter_id:
+            letter["is_read"] = True
+            letter["read_date"] = read_date
+            break
+
+
+class Storage:
+    """저장소 인터페이스 - 조회 메서드는 전체 로드 기반 기본 구현 제공"""
+
+    # 감정 달력
+    def load_calendar(self):
+        raise NotImplementedError
+
+    def save_calendar(self, calendar_data):
+        raise NotImplementedError
+
+    def save_calendar_day(self, day, entry):
+        raise NotImplementedError
+
+    def calendar_version(self):
+        """달력이 바뀔 때마다 달라지는 값 (렌더링 캐시 키)"""
+        raise NotImplementedError
+
+    def iter_calendar(self):
+        """(날짜, 기록)을 날짜순으로 하나씩"""
+        yield from sorted(self.load_calendar().items())
+
+    def save_calendar_days(self, days):
+        """(날짜, 기록) 여러 개를 한 번에 저장 (기록이 None이면 삭제) - 저장한 날 수
+
+        하루씩 save_calendar_day를 부르는 대신 한 번의 커밋으로 반영합니다 (지난 기록 일괄 입력용).
+        """
+        calendar_data = dict(self.load_calendar())
+        count = 0
+        for day, entry in days:
+            if entry is None:
+                calendar_data.pop(day, None)
+            else:
+                calendar_data[day] = entry
+            count += 1
+        self.save_calendar(calendar_data)
+        return count
+
+    def calendar_between(self, start_day, end_day):
+        """start_day~end_day(포함) 기간의 달력 기록"""
+        return {
+            day: entry for day, entry in self.load_calendar().items()
+            if start_day <= day <= end_day
+        }
+
+    def emotion_counts(self):
+        """감정별 기록 일수"""
+        return dict(Counter(entry["emotion"] for entry in self.load_calendar().values()))
+
+    def emotion_stats(self):
+        """감정별 일수, 총 일수, 마지막 기록일, 연속 기록 (emotion_stats.build 형식)"""
+        return emotion_stats.build(self.load_calendar())
+
+    def streaks_between(self, start_day, end_day):
+        """기간과 겹치는 연속 기록들 [(시작일, 끝일, 일수), ...]"""
+        return emotion_stats.streaks_between(self.emotion_stats(), start_day, end_day)
+
+    # 미래 편지
+    def load_letters(self):
+        raise NotImplementedError
+
+    def save_letters(self, letters_data):
+        raise NotImplementedError
+
+    def add_letter(self, letter):
+        letters_data = self.load_letters()
+        letters_data["letters"].append(letter)
+        self.save_letters(letters_data)
+
+    def iter_letters(self):
+        """전체 편지를 하나씩"""
+        yield from self.load_letters()["letters"]
+
+    def add_letters(self, letters):
+        """편지 여러 통을 한 번에 추가 (이미 있는 아이디는 건너뜀) - 추가한 편지 수"""
+        letters_data = self.load_letters()
+        seen = {letter["id"] for letter in letters_data["letters"]}
+        added = [letter for letter in letters if not (letter["id"] in seen or seen.add(letter["id"]))]
+        if added:
+            self.save_letters({"letters": letters_data["letters"] + added})
+        return len(added)
+
+    def mark_letter_read(self, letter_id, read_date):
+        letters_data = self.load_letters()
+        _mark_read(letters_data, letter_id, read_date)
+        self.save_letters(letters_data)
+
+    # 배송 상태 - delivery.py 스케줄러가 deliver_due로 기록하고, 화면은 기록된 상태만 읽음
+    def deliver_due(self, now):
+        """배송일이 지난 편지에 도착 시각(now) 기록 - 이번에 도착 처리한 편지 헤더 목록 (편지마다 한 번)"""
+        today, arrived_at = now.strftime("%Y-%m-%d"), now.strftime("%Y-%m-%d %H:%M:%S")
+        letters = [dict(letter) for letter in self.load_letters()["letters"]]
+        due = [letter for letter in letters if not letter.get("delivered_at") and letter["delivery_date"] <= today]
+        if due:
+            for letter in due:
+                letter["delivered_at"] = arrived_at
+            self.save_letters({"letters": letters})
+        return [{key: letter.get(key) for key in LETTER_HEADER_KEYS} for letter in due]
+
+    def next_delivery(self):
+        """아직 도착하지 않은 편지 중 가장 이른 배송일 (없으면 None)"""
+        return min(
+            (letter["delivery_date"] for letter in self.load_letters()["letters"] if not letter.get("delivered_at")),
+            default=None,
+        )
+
+    def mailbox_counts(self):
+        """{"new": 도착했지만 안 읽은 편지, "arrived": 도착한 편지, "waiting": 배송 대기}"""
+        letters = self.load_letters()["letters"]
+        arrived = [letter for letter in letters if letter.get("delivered_at")]
+        return {
+            "new": sum(1 for letter in arrived if not letter.get("is_read", False)),
+            "arrived": len(arrived),
+            "waiting": len(letters) - len(arrived),
+        }
+
+    def letter_headers(self, offset=0, limit=None):
+        """도착한 편지의 헤더 {"id", "write_date", "delivery_date", "is_read", "read_date", "delivered_at"} (도착 최신순)"""
+        letters = sorted(
+            (letter for letter in self.load_letters()["letters"] if letter.get("delivered_at")),
+            key=lambda letter: (letter["delivered_at"], letter["delivery_date"]),
+            reverse=True,
+        )
+        end = None if limit is None else offset + limit
+        return [{key: letter.get(key) for key in LETTER_HEADER_KEYS} for letter in letters[offset:end]]
+
+    def letter_body(self, letter_id):
+        """편지 본문 {"title", "content", ...} - 없으면 None"""
+        for letter in self.load_letters()["letters"]:
+            if letter["id"] == letter_id:
+                return letter
+        return None
+
+    # 감정 기록
+    def append_record(self, timestamp, text):
+        raise NotImplementedError
+
+    def append_records(self, records):
+        """(timestamp, text) 여러 개를 한 번에 추가 - 추가한 수"""
+        count = 0
+        for timestamp, text in records:
+            self.append_record(timestamp, text)
+            count += 1
+        return count
+
+    def iter_records(self):
+        """(timestamp, text)를 시각 순으로 - 시각이 없는 예전 기록이 먼저"""
+        raise NotImplementedError
+
+    def records_version(self):
+        """감정 기록이 추가될 때마다 달라지는 값 (분석 캐시 키)"""
+        raise NotImplementedError
+
+    def records_per_day(self):
+        """{"YYYY-MM-DD": 그날 기록 수} (시각이 없는 기록은 뺌)"""
+        return dict(Counter(timestamp[:10] for timestamp, _ in self.iter_records() if timestamp))
+
+    def recent_records(self, n):
+        """최근 기록 n개 (최신순)"""
+        records = list(self.iter_records())[-n:] if n > 0 else []
+        return list(reversed(records))
+
+    def records_between(self, start, end):
+        """start <= timestamp <= end 인 기록 (오래된 순)"""
+        return [
+            (timestamp, text) for timestamp, text in self.iter_records()
+            if timestamp is not None and start <= timestamp <= end
+        ]
+
+    # 콘텐츠 피드백
+    def append_feedback(self, feedback):
+        raise NotImplementedError
+
+    def load_feedback(self):
+        raise NotImplementedError
+
+    def iter_feedback(self):
+        """피드백 이벤트를 오래된 순으로 하나씩"""
+        yield from self.load_feedback()["feedbacks"]
+
+    def append_feedbacks(self, feedbacks):
+        """피드백 여러 개를 한 번에 추가 - 추가한 수"""
+        count = 0
+        for feedback in feedbacks:
+            self.append_feedback(feedback)
+            count += 1
+        return count
+
+    def feedback_counts(self):
+        """{콘텐츠 id: {감정: {"helpful": n, "total": n}}}"""
+        counts = {}
+        for feedback in self.load_feedback()["feedbacks"]:
+            feedback_log.add_event(counts, feedback)
+        return counts
+
+    # 검색 (달력 메모, 감정 기록, 편지 본문)
+    def search_dir(self):
+        """검색 색인 폴더"""
+        raise NotImplementedError
+
+    def text_index(self):
+        """이 저장소의 search_index.SearchIndex - 처음 만들 때 기존 데이터로 채움"""
+        index = getattr(self, "_text_index", None)
+        if index is None:
+            index = self._text_index = search_index.SearchIndex(self.search_dir(), backfill=self._search_entries)
+        return index
+
+    def _search_entries(self):
+        for day, entry in self.load_calendar().items():
+            yield search_index.note_entry(day, entry)
+        for timestamp, text in self.iter_records():
+            yield search_index.record_entry(timestamp, text)
+        for letter in self.load_letters()["letters"]:
+            yield search_index.letter_entry(letter)
+
+    def search(self, query, limit=20, kinds=None, until=None):
+        """본문 검색 [{"key", "kind", "date", "text", "phrase"}, ...] - 문구 일치 먼저, 최신순"""
+        return self.text_index().search(query, limit, kinds, until)
+
+    def _index_calendar_day(self, day, entry):
+        if entry is None:
+            self.text_index().remove(search_index.note_entry(day, None)[0])
+        else:
+            self.text_index().add(*search_index.note_entry(day, entry))
+
+    def _index_calendar_days(self, days):
+        self.text_index().add_many(search_index.note_entry(day, entry) for day, entry in days if entry is not None)
+        for day, entry in days:
+            if entry is None:
+                self._index_calendar_day(day, None)
+
+    def close(self):
+        """열어 둔 연결 정리 (get_storage의 LRU에서 밀려날 때) - 파일 저장소는 할 일 없음"""
+
+
+class FileStorage(Storage):
+    """기존 JSON/TXT 파일 저장소
+
+    JSON 파일 수정은 write_coordinator의 그룹 커밋 writer를 거쳐
+    잠금 + 원자적 교체로 저장됩니다. 편지는 letter_store의 헤더/본문 파일에 둡니다.
+    """
+
+    def __init__(self, base_dir=".", calendar_mode="journal"):
+        self.base_dir = base_dir
+        # "journal"(하루치만 덧붙임) 또는 "snapshot"(전체 파일 재작성)
+        self.calendar_mode = calendar_mode
+        self.calendar_path = os.path.join(base_dir, "emotion_calendar.json")
+        self.stats_path = os.path.join(base_dir, "emotion_stats.json")
+        self.letters_path = os.path.join(base_dir, "future_letters.json")
+        self.records_path = os.path.join(base_dir, "records.txt")
+        # 예전 형식(전체 JSON)은 읽기만 하고, 새 피드백은 JSONL 이벤트 로그에 추가
+        self.legacy_feedback_path = os.path.join(base_dir, "content_feedback.json")
+        self.feedback_path = os.path.join(base_dir, "content_feedback.jsonl")
+        self.feedback_counts_path = os.path.join(base_dir, "content_feedback_counts.json")
+
+        self._calendar_writer = get_writer(
+            self.calendar_path,
+            load=lambda: calendar_journal.load_calendar(self.calendar_path),
+            on_commit=self._on_calendar_commit,
+        )
+        # 편지는 헤더 인덱스 + 본문 파일 (future_letters.json은 가져오기 원본)
+        self.letter_store = letter_store.LetterStore(base_dir, self.letters_path)
+
+    def search_dir(self):
+        return os.path.join(self.base_dir, "search")
+
+    # 읽기 메서드는 shared_cache를 거치므로 반환값을 직접 수정하지 않습니다.
+    def _calendar_paths(self):
+        journal = calendar_journal.journal_path(self.calendar_path)
+        return [self.calendar_path, journal + calendar_journal.COMPACTING_SUFFIX, journal]
+
+    def load_calendar(self):
+        return shared_cache.get(
+            ("calendar", self.calendar_path),
+            self._calendar_paths(),
+            lambda: CalendarTable.from_dict(calendar_journal.load_calendar(self.calendar_path)),
+        )
+
+    def calendar_between(self, start_day, end_day):
+        return self.load_calendar().between(start_day, end_day)
+
+    def save_calendar(self, calendar_data):
+        calendar_journal.write_snapshot(self.calendar_path, calendar_data)
+        # 같은 프로세스의 쓰기는 mtime 해상도와 관계없이 즉시 무효화
+        shared_cache.invalidate(("calendar", self.calendar_path))
+        emotion_stats.save(self.stats_path, self._calendar_paths(), emotion_stats.build(calendar_data))
+        self.text_index().replace_kind(
+            "note", [search_index.note_entry(day, entry) for day, entry in calendar_data.items()]
+        )
+
+    def save_calendar_day(self, day, entry):
+        if self.calendar_mode != "journal":
+            self._calendar_writer.update(lambda calendar_data: calendar_data.__setitem__(day, entry))
+            self._index_calendar_day(day, entry)
+            return
+
+        with file_lock(self.stats_path):
+            stats = emotion_stats.load(self.stats_path, self._calendar_paths())
+            calendar_journal.append_entry(self.calendar_path, day, entry)
+            shared_cache.invalidate(("calendar", self.calendar_path))
+
+            # 통계는 저장 시점에 증분 갱신 (불가능한 경우에만 다시 계산)
+            updated = emotion_stats.apply_day(stats, day, entry) if stats is not None else None
+            if updated is None:
+                updated = emotion_stats.build(self.load_calendar())
+            emotion_stats.save(self.stats_path, self._calendar_paths(), updated)
+        self._index_calendar_day(day, entry)
+
+    def save_calendar_days(self, days):
+        # 저널에 하루씩 덧붙이지 않고 그룹 커밋 writer로 스냅샷을 한 번만 다시 씀 (통계도 한 번만 계산)
+        days = dict(days)
+
+        def apply(calendar_data):
+            for day, entry in days.items():
+                if entry is None:
+                    calendar_data.pop(day, None)
+                else:
+                    calendar_data[day] = entry
+
+        if days:
+            self._calendar_writer.update(apply)
+            self._index_calendar_days(days.items())
+        return len(days)
+
+    def _on_calendar_commit(self, calendar_data):
+        # 스냅샷에 저널 내용까지 반영되었으므로 저널 정리
+        calendar_journal.discard_journals(self.calendar_path)
+        shared_cache.invalidate(("calendar", self.calendar_path))
+        emotion_stats.save(self.stats_path, self._calendar_paths(), emotion_stats.build(calendar_data))
+
+    def emotion_stats(self):
+        stats = emotion_stats.load(self.stats_path, self._calendar_paths())
+        if stats is None:
+            with file_lock(self.stats_path):
+                stats = emotion_stats.build(self.load_calendar())
+                emotion_stats.save(self.stats_path, self._calendar_paths(), stats)
+        return stats
+
+    def emotion_counts(self):
+        return self.emotion_stats()["counts"]
+
+    def calendar_version(self):
+        return file_signature(self._calendar_paths())
+
+    def compact_calendar(self):
+        return calendar_journal.compact(self.calendar_path)
+
+    def load_letters(self):
+        return {"letters": self.letter_store.letters()}
+
+    def save_letters(self, letters_data):
+        self.letter_store.replace_all(letters_data["letters"])
+        self.text_index().replace_kind("letter", [search_index.letter_entry(letter) for letter in letters_data["letters"]])
+
+    def add_letter(self, letter):
+        self.letter_store.add(letter)
+        self.text_index().add(*search_index.letter_entry(letter))
+
+    def iter_letters(self):
+        return self.letter_store.iter_letters()
+
+    def add_letters(self, letters):
+        count = 0
+        for chunk in _chunks(letters):
+            added = self.letter_store.add_many(chunk)
+            self.text_index().add_many(search_index.letter_entry(letter) for letter in added)
+            count += len(added)
+        return count
+
+    def mark_letter_read(self, letter_id, read_date):
+        self.letter_store.mark_read(letter_id, read_date)
+
+    def deliver_due(self, now):
+        return self.letter_store.deliver_due(now.strftime("%Y-%m-%d"), now.strftime("%Y-%m-%d %H:%M:%S"))
+
+    def next_delivery(self):
+        return self.letter_store.view().next_pending()
+
+    def mailbox_counts(self):
+        arrived, new, total = self.letter_store.counts()
+        return {"new": new, "arrived": arrived, "waiting": total - arrived}
+
+    def letter_headers(self, offset=0, limit=None):
+        return self.letter_store.view().arrived(offset, limit)
+
+    def letter_body(self, letter_id):
+        return self.letter_store.body(letter_id)
+
+    def append_record(self, timestamp, text):
+        records_log.append(self.records_path, timestamp, text)
+        self.text_index().add(*search_index.record_entry(timestamp, text))
+
+    def append_records(self, records):
+        count = 0
+        for chunk in _chunks(records):
+            count += records_log.append_many(self.records_path, chunk)
+            self.text_index().add_many(search_index.record_entry(timestamp, text) for timestamp, text in chunk)
+        return count
+
+    def iter_records(self):
+        if not os.path.exists(self.records_path):
+            return
+        with open(self.records_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield parse_record_line(line.strip())
+
+    def records_version(self):
+        return file_signature([self.records_path])
+
+    def records_per_day(self):
+        return records_log.count_per_day(self.records_path)
+
+    def recent_records(self, n):
+        return records_log.tail(self.records_path, n)
+
+    def records_between(self, start, end):
+        return records_log.between(self.records_path, start, end)
+
+    def load_feedback(self):
+        return {"feedbacks": list(self.iter_feedback())}
+
+    def iter_feedback(self):
+        return feedback_log.iter_events(self.feedback_path, self.legacy_feedback_path)
+
+    def append_feedback(self, feedback):
+        feedback_log.append(self.feedback_path, self.feedback_counts_path, feedback, self.legacy_feedback_path)
+
+    def append_feedbacks(self, feedbacks):
+        return feedback_log.append_many(self.feedback_path, self.feedback_counts_path, feedbacks, self.legacy_feedback_path)
+
+    def feedback_counts(self):
+        return feedback_log.counts(self.feedback_path, self.feedback_counts_path, self.legacy_feedback_path)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+-- 달력 저장과 같은 트랜잭션에서 갱신하는 통계 (emotion_stats.build 형식 JSON, 한 행)
+CREATE TABLE IF NOT EXISTS emotion_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    calendar_version INTEGER NOT NULL,
+    stats TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS calendar (
+    date TEXT PRIMARY KEY,
+    emotion TEXT NOT NULL,
+    note TEXT,
+    color TEXT,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_calendar_emotion ON calendar(emotion);
+
+CREATE TABLE IF NOT EXISTS letters (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    content TEXT,
+    write_date TEXT,
+    delivery_date TEXT NOT NULL,
+    is_read INTEGER NOT NULL DEFAULT 0,
+    read_date TEXT,
+    write_time TEXT,
+    delivered_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_letters_delivery ON letters(delivery_date);
+CREATE INDEX IF NOT EXISTS idx_letters_unread ON letters(is_read, delivery_date);
+CREATE INDEX IF NOT EXISTS idx_letters_arrival ON letters(delivered_at, delivery_date);
+
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_timestamp ON records(timestamp);
+
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_id TEXT,
+    content_title TEXT,
+    is_helpful INTEGER,
+    emotion TEXT,
+    timestamp TEXT,
+    session_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_emotion ON feedback(emotion);
+
+CREATE TABLE IF NOT EXISTS feedback_counts (
+    content_key TEXT NOT NULL,
+    emotion TEXT NOT NULL,
+    helpful INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (content_key, emotion)
+);
+"""
+
+CALENDAR_COLUMNS = ("emotion", "note", "color", "timestamp")
+LETTER_COLUMNS = (
+    "id", "title", "content", "write_date", "delivery_date", "is_read", "read_date", "write_time", "delivered_at"
+)
+INSERT_LETTER = f"INSERT INTO letters ({', '.join(LETTER_COLUMNS)}) VALUES ({', '.join('?' * len(LETTER_COLUMNS))})"
+FEEDBACK_COLUMNS = ("content_id", "content_title", "is_helpful", "emotion", "timestamp", "session_id")
+
+
+class SqliteStorage(Storage):
+    """sqlite3 저장소 - 날짜/배송일/감정 인덱스로 조회"""
+
+    def __init__(self, db_path="mindful_compass.db"):
+        self.db_path = db_path
+        # Streamlit은 세션마다 다른 스레드에서 실행되므로 스레드별 연결 사용
+        self._local = threading.local()
+        # close()가 모든 스레드의 연결을 닫을 수 있도록 연 연결을 모아 둠 (세대가 바뀌면 다시 엶)
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        with self._connect() as conn:
+            # 이전 버전 데이터베이스에 없는 열 추가
+            columns = [row["name"] for row in conn.execute("PRAGMA table_info(feedback)")]
+            if columns and "content_id" not in columns:
+                conn.execute("ALTER TABLE feedback ADD COLUMN content_id TEXT")
+            columns = [row["name"] for row in conn.execute("PRAGMA table_info(letters)")]
+            if columns and "delivered_at" not in columns:
+                conn.execute("ALTER TABLE letters ADD COLUMN delivered_at TEXT")
+            conn.executescript(SQLITE_SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.generation != self._generation:
+            # 연결은 만든 스레드만 쓰고, 다른 스레드에서는 close()로 닫기만 함
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._local.generation = self._generation
+            self._local.conn = conn
+        return conn
+
+    def search_dir(self):
+        return self.db_path + ".search"
+
+    def close(self):
+        """이 저장소가 여러 스레드에서 연 연결을 모두 닫음 - 다시 쓰면 새로 엶"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            conn.close()
+        self._local.conn = None
+
+    # 감정 달력
+    @staticmethod
+    def _calendar_entry(row):
+        return {column: row[column] for column in CALENDAR_COLUMNS}
+
+    def load_calendar(self):
+        rows = self._connect().execute("SELECT * FROM calendar ORDER BY date")
+        return CalendarTable.from_items((row["date"], self._calendar_entry(row)) for row in rows)
+
+    def iter_calendar(self):
+        for row in self._connect().execute("SELECT * FROM calendar ORDER BY date"):
+            yield row["date"], self._calendar_entry(row)
+
+    @staticmethod
+    def _bump_calendar_version(conn):
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('calendar_version', 1)"
+            " ON CONFLICT(key) DO UPDATE SET value = value + 1"
+        )
+
+    @staticmethod
+    def _calendar_version(conn):
+        row = conn.execute("SELECT value FROM meta WHERE key = 'calendar_version'").fetchone()
+        return row[0] if row else 0
+
+    def calendar_version(self):
+        return self._calendar_version(self._connect())
+
+    def save_calendar(self, calendar_data):
+        with self._connect() as conn:
+            self._bump_calendar_version(conn)
+            conn.execute("DELETE FROM calendar")
+            conn.executemany(
+                "INSERT INTO calendar (date, emotion, note, color, timestamp) VALUES (?, ?, ?, ?, ?)",
+                [(day, *(entry.get(column) for column in CALENDAR_COLUMNS)) for day, entry in calendar_data.items()],
+            )
+            self._save_stats(conn, emotion_stats.build(calendar_data))
+        self.text_index().replace_kind(
+            "note", [search_index.note_entry(day, entry) for day, entry in calendar_data.items()]
+        )
+
+    def save_calendar_day(self, day, entry):
+        with self._connect() as conn:
+            # 버전을 먼저 올려 쓰기 잠금을 잡은 뒤 통계를 읽음 (다른 프로세스의 저장과 섞이지 않도록)
+            self._bump_calendar_version(conn)
+            stats = self._stored_stats(conn, self._calendar_version(conn) - 1)
+            if entry is None:
+                conn.execute("DELETE FROM calendar WHERE date = ?", (day,))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO calendar (date, emotion, note, color, timestamp) VALUES (?, ?, ?, ?, ?)",
+                    (day, *(entry.get(column) for column in CALENDAR_COLUMNS)),
+                )
+            # 통계는 같은 트랜잭션에서 증분 갱신 (불가능한 경우에만 다시 계산)
+            updated = emotion_stats.apply_day(stats, day, entry) if stats is not None else None
+            self._save_stats(conn, updated if updated is not None else self._build_stats(conn))
+        self._index_calendar_day(day, entry)
+
+    def save_calendar_days(self, days):
+        # 트랜잭션 하나 - 중간에 실패하면 아무 날도 저장되지 않음
+        count = 0
+        with self._connect() as conn:
+            self._bump_calendar_version(conn)
+            for chunk in _chunks(days):
+                conn.executemany("DELETE FROM calendar WHERE date = ?", [(day,) for day, entry in chunk if entry is None])
+                conn.executemany(
+                    "INSERT OR REPLACE INTO calendar (date, emotion, note, color, timestamp) VALUES (?, ?, ?, ?, ?)",
+                    [(day, *(entry.get(column) for column in CALENDAR_COLUMNS)) for day, entry in chunk if entry is not None],
+                )
+                self._index_calendar_days(chunk)
+                count += len(chunk)
+            self._save_stats(conn, self._build_stats(conn))
+        return count
+
+    def calendar_between(self, start_day, end_day):
+        rows = self._connect().execute(
+            "SELECT * FROM calendar WHERE date BETWEEN ? AND ? ORDER BY date", (start_day, end_day)
+        )
+        return {row["date"]: self._calendar_entry(row) for row in rows}
+
+    def emotion_counts(self):
+        rows = self._connect().execute("SELECT emotion, COUNT(*) FROM calendar GROUP BY emotion")
+        return {emotion: count for emotion, count in rows}
+
+    def _stored_stats(self, conn, calendar_version):
+        """저장된 통계 - calendar_version 때 계산한 것이 아니면 None"""
+        row = conn.execute("SELECT calendar_version, stats FROM emotion_stats WHERE id = 1").fetchone()
+        if row is None or row["calendar_version"] != calendar_version:
+            return None
+        return json.loads(row["stats"])
+
+    def _save_stats(self, conn, stats):
+        conn.execute(
+            "INSERT OR REPLACE INTO emotion_stats (id, calendar_version, stats) VALUES (1, ?, ?)",
+            (self._calendar_version(conn), json.dumps(stats, ensure_ascii=False, separators=(",", ":"))),
+        )
+
+    def emotion_stats(self):
+        conn = self._connect()
+        stats = self._stored_stats(conn, self._calendar_version(conn))
+        if stats is None:
+            # 통계 표가 생기기 전 데이터베이스 - 한 번 계산해 저장
+            with conn:
+                stats = self._build_stats(conn)
+                self._save_stats(conn, stats)
+        return stats
+
+    def _build_stats(self, conn):
+        """달력 표 전체로 통계 계산 (감정별 일수 GROUP BY + 연속 구간 질의)"""
+        stats = emotion_stats.empty_stats()
+        stats["counts"] = {emotion: count for emotion, count in conn.execute("SELECT emotion, COUNT(*) FROM calendar GROUP BY emotion")}
+        stats["total_days"] = sum(stats["counts"].values())
+        last = conn.execute("SELECT date, emotion FROM calendar ORDER BY date DESC LIMIT 1").fetchone()
+        if last is None:
+            return stats
+        stats["last_day"], stats["last_emotion"] = last["date"], last["emotion"]
+        # 연속 구간(gaps-and-islands): 날짜 - 순번이 같은 행들이 한 연속 기록
+        runs = conn.execute(
+            "SELECT MIN(date) AS first_day, MAX(date) AS last_day FROM ("
+            " SELECT date, julianday(date) - ROW_NUMBER() OVER (ORDER BY date) AS run FROM calendar"
+            ") GROUP BY run ORDER BY first_day"
+        )
+        engine = StreakEngine([(to_ordinal(row["first_day"]), to_ordinal(row["last_day"])) for row in runs])
+        return emotion_stats.with_streaks(stats, engine)
+
+    # 미래 편지
+    @staticmethod
+    def _letter(row):
+        letter = {column: row[column] for column in LETTER_COLUMNS}
+        letter["is_read"] = bool(letter["is_read"])
+        return letter
+
+    @staticmethod
+    def _letter_row(letter):
+        return tuple(
+            (1 if letter.get("is_read") else 0) if column == "is_read" else letter.get(column) for column in LETTER_COLUMNS
+        )
+
+    def load_letters(self):
+        rows = self._connect().execute("SELECT * FROM letters ORDER BY write_time")
+        return {"letters": [self._letter(row) for row in rows]}
+
+    def save_letters(self, letters_data):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM letters")
+            conn.executemany(
+                INSERT_LETTER,
+                [self._letter_row(letter) for letter in letters_data["letters"]],
+            )
+        self.text_index().replace_kind("letter", [search_index.letter_entry(letter) for letter in letters_data["letters"]])
+
+    def add_letter(self, letter):
+        with self._connect() as conn:
+            conn.execute(INSERT_LETTER, self._letter_row(letter))
+        self.text_index().add(*search_index.letter_entry(letter))
+
+    def iter_letters(self):
+        for row in self._connect().execute("SELECT * FROM letters ORDER BY write_time"):
+            yield self._letter(row)
+
+    def add_letters(self, letters):
+        count = 0
+        # 아이디가 겹치는 편지만 건너뜀 (다른 제약 위반은 그대로 오류)
+        insert = INSERT_LETTER + " ON CONFLICT(id) DO NOTHING"
+        with self._connect() as conn:
+            for chunk in _chunks(letters):
+                added = [
+                    letter for letter in chunk
+                    if conn.execute(insert, self._letter_row(letter)).rowcount
+                ]
+                self.text_index().add_many(search_index.letter_entry(letter) for letter in added)
+                count += len(added)
+        return count
+
+    def mark_letter_read(self, letter_id, read_date):
+        with self._connect() as conn:
+            conn.execute("UPDATE letters SET is_read = 1, read_date = ? WHERE id = ?", (read_date, letter_id))
+
+    @staticmethod
+    def _letter_header(row):
+        return {key: (bool(row[key]) if key == "is_read" else row[key]) for key in LETTER_HEADER_KEYS}
+
+    def deliver_due(self, now):
+        # 조건부 UPDATE 한 번 - 동시에 호출돼도 같은 편지를 두 번 돌려주지 않음
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"UPDATE letters SET delivered_at = ? WHERE delivered_at IS NULL AND delivery_date <= ? "
+                f"RETURNING {', '.join(LETTER_HEADER_KEYS)}",
+                (now.strftime("%Y-%m-%d %H:%M:%S"), now.strftime("%Y-%m-%d")),
+            ).fetchall()
+        return [self._letter_header(row) for row in rows]
+
+    def next_delivery(self):
+        return self._connect().execute(
+            "SELECT MIN(delivery_date) FROM letters WHERE delivered_at IS NULL"
+        ).fetchone()[0]
+
+    def mailbox_counts(self):
+        row = self._connect().execute(
+            "SELECT COUNT(*), COUNT(delivered_at), "
+            "COALESCE(SUM(delivered_at IS NOT NULL AND is_read = 0), 0) FROM letters"
+        ).fetchone()
+        return {"new": row[2], "arrived": row[1], "waiting": row[0] - row[1]}
+
+    def letter_headers(self, offset=0, limit=None):
+        rows = self._connect().execute(
+            f"SELECT {', '.join(LETTER_HEADER_KEYS)} FROM letters WHERE delivered_at IS NOT NULL "
+            "ORDER BY delivered_at DESC, delivery_date DESC LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset),
+        )
+        return [self._letter_header(row) for row in rows]
+
+    def letter_body(self, letter_id):
+        row = self._connect().execute("SELECT * FROM letters WHERE id = ?", (letter_id,)).fetchone()
+        return self._letter(row) if row is not None else None
+
+    # 감정 기록
+    def append_record(self, timestamp, text):
+        with self._connect() as conn:
+            conn.execute("INSERT INTO records (timestamp, text) VALUES (?, ?)", (timestamp, text))
+        self.text_index().add(*search_index.record_entry(timestamp, text))
+
+    def append_records(self, records):
+        count = 0
+        with self._connect() as conn:
+            for chunk in _chunks(records):
+                conn.executemany("INSERT INTO records (timestamp, text) VALUES (?, ?)", chunk)
+                self.text_index().add_many(search_index.record_entry(timestamp, text) for timestamp, text in chunk)
+                count += len(chunk)
+        return count
+
+    def iter_records(self):
+        for row in self._connect().execute("SELECT timestamp, text FROM records ORDER BY timestamp, id"):
+            yield row["timestamp"], row["text"]
+
+    def records_version(self):
+        # 기록은 추가만 되므로 마지막 id가 버전
+        return self._connect().execute("SELECT MAX(id) FROM records").fetchone()[0] or 0
+
+    def records_per_day(self):
+        rows = self._connect().execute(
+            "SELECT substr(timestamp, 1, 10), COUNT(*) FROM records WHERE timestamp IS NOT NULL GROUP BY 1"
+        )
+        return dict(rows.fetchall())
+
+    def recent_records(self, n):
+        rows = self._connect().execute(
+            "SELECT timestamp, text FROM records ORDER BY timestamp DESC, id DESC LIMIT ?", (n,)
+        )
+        return [(row["timestamp"], row["text"]) for row in rows]
+
+    def records_between(self, start, end):
+        rows = self._connect().execute(
+            "SELECT timestamp, text FROM records WHERE timestamp BETWEEN ? AND ? ORDER BY timestamp, id",
+            (start, end),
+        )
+        return [(row["timestamp"], row["text"]) for row in rows]
+
+    # 콘텐츠 피드백
+    def append_feedback(self, feedback):
+        self.append_feedbacks([feedback])
+
+    def append_feedbacks(self, feedbacks):
+        count = 0
+        with self._connect() as conn:
+            for chunk in _chunks(feedbacks):
+                conn.executemany(
+                    "INSERT INTO feedback (content_id, content_title, is_helpful, emotion, timestamp, session_id)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [tuple(feedback.get(column) for column in FEEDBACK_COLUMNS) for feedback in chunk],
+                )
+                conn.executemany(
+                    "INSERT INTO feedback_counts (content_key, emotion, helpful, total) VALUES (?, ?, ?, 1)"
+                    " ON CONFLICT(content_key, emotion) DO UPDATE SET helpful = helpful + excluded.helpful, total = total + 1",
+                    [
+                        (feedback_log.content_key(feedback), feedback.get("emotion", "unknown"), 1 if feedback.get("is_helpful") else 0)
+                        for feedback in chunk
+                    ],
+                )
+                count += len(chunk)
+        return count
+
+    def feedback_counts(self):
+        counts = {}
+        for row in self._connect().execute("SELECT content_key, emotion, helpful, total FROM feedback_counts"):
+            counts.setdefault(row["content_key"], {})[row["emotion"]] = {"helpful": row["helpful"], "total": row["total"]}
+        return counts
+
+    def load_feedback(self):
+        return {"feedbacks": list(self.iter_feedback())}
+
+    def iter_feedback(self):
+        for row in self._connect().execute("SELECT * FROM feedback ORDER BY id"):
+            feedback = {column: row[column] for column in FEEDBACK_COLUMNS}
+            feedback["is_helpful"] = bool(feedback["is_helpful"])
+            yield feedback
+
+
+def migrate(source, target):
+    """source 저장소의 모든 데이터를 target 저장소로 복사 - 종류마다 스트리밍 + 일괄 저장 한 번"""
+    return {
+        "calendar": target.save_calendar_days(source.iter_calendar()),
+        "letters": target.add_letters(source.iter_letters()),
+        "records": target.append_records(source.iter_records()),
+        "feedback": target.append_feedbacks(source.iter_feedback()),
+    }
+
+
+USERS_DIR = os.environ.get("MINDFUL_USERS_DIR", os.path.join("data", "users"))
+USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+# 메모리에 유지할 사용자별 저장소 수
+MAX_CACHED_STORAGES = 1024
+
+
+def is_valid_user_id(user_id):
+    """경로에 안전하게 쓸 수 있는 사용자 식별자인지"""
+    return isinstance(user_id, str) and bool(USER_ID_PATTERN.match(user_id))
+
+
+def user_data_dir(user_id):
+    """사용자별 데이터 폴더 (data/users/<id>/)"""
+    if not is_valid_user_id(user_id):
+        raise ValueError(f"잘못된 사용자 식별자: {user_id!r}")
+    return os.path.join(USERS_DIR, user_id)
+
+
+def create_storage(backend=None, user_id=None):
+    """환경 변수 설정에 맞는 저장소 생성 - user_id가 없으면 기존 공용 파일 사용"""
+    backend = backend or os.environ.get("MINDFUL_STORAGE", "files")
+    base_dir = "."
+    if user_id is not None:
+        base_dir = user_data_dir(user_id)
+        os.makedirs(base_dir, exist_ok=True)
+
+    if backend == "sqlite":
+        if user_id is None:
+            return SqliteStorage(os.environ.get("MINDFUL_SQLITE_PATH", "mindful_compass.db"))
+        return SqliteStorage(os.path.join(base_dir, "mindful_compass.db"))
+    if backend == "files":
+        return FileStorage(base_dir, calendar_mode=os.environ.get("MINDFUL_CALENDAR_MODE", "journal"))
+    raise ValueError(f"알 수 없는 저장소: {backend}")
+
+
+_storages = OrderedDict()
+_storage_lock = threading.Lock()
+
+
+def get_storage(user_id=None):
+    """사용자별 저장소 (user_id가 없으면 프로세스 공용 저장소)
+
+    LRU에서 밀려난 저장소는 close()로 연결을 닫습니다.
+    """
+    evicted = []
+    with _storage_lock:
+        storage = _storages.get(user_id)
+        if storage is None:
+            storage = create_storage(user_id=user_id)
+            _storages[user_id] = storage
+            while len(_storages) > MAX_CACHED_STORAGES:
+                evicted.append(_storages.popitem(last=False)[1])
+        else:
+            _storages.move_to_end(user_id)
+    for old in evicted:
+        old.close()
+    return storage
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="마음의 나침반 저장소 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="기존 JSON/TXT 파일을 SQLite나 사용자 폴더로 옮기기")
+    migrate_parser.add_argument("--source", default=".", help="기존 데이터 파일 폴더")
+    target = migrate_parser.add_mutually_exclusive_group()
+    target.add_argument("--db", default="mindful_compass.db", help="SQLite 파일 경로")
+    target.add_argument("--user", help="data/users/<id>/ 사용자 폴더로 옮기기")
+
+    args = parser.parse_args(argv)
+    if args.command == "migrate":
+        if args.user:
+            counts = migrate(FileStorage(args.source), create_storage(user_id=args.user))
+        else:
+            counts = migrate(FileStorage(args.source), SqliteStorage(args.db))
+        print(json.dumps(counts, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
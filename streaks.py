@@ -0,0 +1,140 @@
+# streaks.py - 연속 기록(streak) 엔진
+#
+# 기록한 날짜들을 날짜 서수의 연속 구간 [시작, 끝] 목록(run-length)으로 보관합니다.
+# 하루 추가/삭제는 이분 탐색 + 인접 구간 병합이고,
+# 현재/최장 연속 기록은 바로 읽으며, 기간 내 연속 기록 조회도 이분 탐색으로 찾습니다.
+# 기존 {"YYYY-MM-DD": {...}} 달력 구조에서 바로 만들 수 있습니다.
+
+import bisect
+from datetime import date
+
+from calendar_table import CalendarTable
+
+
+def to_ordinal(day):
+    """'YYYY-MM-DD' → 날짜 서수"""
+    return date.fromisoformat(day).toordinal()
+
+
+def to_day(ordinal):
+    """날짜 서수 → 'YYYY-MM-DD'"""
+    return date.fromordinal(ordinal).isoformat()
+
+
+class StreakEngine:
+    """겹치지도 맞닿지도 않는 연속 구간들의 정렬 목록"""
+
+    def __init__(self, runs=()):
+        self._starts = []
+        self._ends = []
+        for start, end in runs:
+            self._starts.append(start)
+            self._ends.append(end)
+        self._longest = max((end - start + 1 for start, end in runs), default=0)
+
+    @classmethod
+    def from_calendar(cls, calendar_data):
+        """달력 데이터(날짜 키)로 엔진 생성 - CalendarTable이면 날짜 서수 배열을 그대로 사용"""
+        if isinstance(calendar_data, CalendarTable):
+            return cls.from_ordinals(calendar_data.ordinals)
+        return cls.from_ordinals(to_ordinal(day) for day in calendar_data)
+
+    @classmethod
+    def from_ordinals(cls, ordinals):
+        runs = []
+        for ordinal in sorted(set(ordinals)):
+            if runs and runs[-1][1] == ordinal - 1:
+                runs[-1][1] = ordinal
+            else:
+                runs.append([ordinal, ordinal])
+        return cls(runs)
+
+    def runs(self):
+        """[[시작 서수, 끝 서수], ...] - 저장용"""
+        return [[start, end] for start, end in zip(self._starts, self._ends)]
+
+    def _find(self, ordinal):
+        """ordinal을 포함하는 구간 번호 (없으면 None)"""
+        position = bisect.bisect_right(self._starts, ordinal) - 1
+        if position >= 0 and self._ends[position] >= ordinal:
+            return position
+        return None
+
+    def contains(self, day):
+        return self._find(to_ordinal(day)) is not None
+
+    def add_day(self, day):
+        """하루 기록 추가 - 앞뒤 구간과 맞닿으면 병합"""
+        ordinal = to_ordinal(day)
+        if self._find(ordinal) is not None:
+            return
+        position = bisect.bisect_right(self._starts, ordinal)
+        joins_left = position > 0 and self._ends[position - 1] == ordinal - 1
+        joins_right = position < len(self._starts) and self._starts[position] == ordinal + 1
+
+        if joins_left and joins_right:
+            self._ends[position - 1] = self._ends[position]
+            del self._starts[position]
+            del self._ends[position]
+            position -= 1
+        elif joins_left:
+            position -= 1
+            self._ends[position] = ordinal
+        elif joins_right:
+            self._starts[position] = ordinal
+        else:
+            self._starts.insert(position, ordinal)
+            self._ends.insert(position, ordinal)
+
+        self._longest = max(self._longest, self._ends[position] - self._starts[position] + 1)
+
+    def remove_day(self, day):
+        """하루 기록 삭제 - 구간 중간이면 둘로 나눔"""
+        ordinal = to_ordinal(day)
+        position = self._find(ordinal)
+        if position is None:
+            return
+        start, end = self._starts[position], self._ends[position]
+        was_longest = end - start + 1 == self._longest
+
+        del self._starts[position]
+        del self._ends[position]
+        if ordinal < end:
+            self._starts.insert(position, ordinal + 1)
+            self._ends.insert(position, end)
+        if start < ordinal:
+            self._starts.insert(position, start)
+            self._ends.insert(position, ordinal - 1)
+
+        if was_longest:
+            self._longest = max((e - s + 1 for s, e in zip(self._starts, self._ends)), default=0)
+
+    def streak_ending(self, day):
+        """day로 끝나는(day까지 이어진) 연속 기록 일수"""
+        ordinal = to_ordinal(day)
+        position = self._find(ordinal)
+        if position is None:
+            return 0
+        return ordinal - self._starts[position] + 1
+
+    def current_streak(self, today):
+        """오늘까지 이어진 연속 기록 일수 (오늘 기록이 없으면 0)"""
+        if not self._ends or self._ends[-1] != to_ordinal(today):
+            return 0
+        return self._ends[-1] - self._starts[-1] + 1
+
+    def longest_streak(self):
+        return self._longest
+
+    def streaks_between(self, start_day, end_day):
+        """기간과 겹치는 연속 기록들 [(시작일, 끝일, 일수), ...] - 기간 밖 부분은 잘라냄"""
+        first, last = to_ordinal(start_day), to_ordinal(end_day)
+        position = max(bisect.bisect_right(self._starts, first) - 1, 0)
+        streaks = []
+        while position < len(self._starts) and self._starts[position] <= last:
+            start = max(self._starts[position], first)
+            end = min(self._ends[position], last)
+            if start <= end:
+                streaks.append((to_day(start), to_day(end), end - start + 1))
+            position += 1
+        return streaks
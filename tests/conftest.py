@@ -0,0 +1,26 @@
+import pytest
+
+from storage import FileStorage, SqliteStorage
+
+BACKENDS = ("files", "sqlite")
+
+
+def make_storage(kind, path):
+    """kind("files"/"sqlite") 저장소를 path 폴더에"""
+    path.mkdir(parents=True, exist_ok=True)
+    if kind == "files":
+        return FileStorage(str(path))
+    return SqliteStorage(str(path / "mindful_compass.db"))
+
+
+@pytest.fixture(params=BACKENDS)
+def storage(request, tmp_path):
+    """두 저장소 구현 각각으로 한 번씩"""
+    return make_storage(request.param, tmp_path)
+
+
+def make_letter(letter_id, delivery_date, content="미래의 나"):
+    return {
+        "id": letter_id, "title": "", "content": content, "write_date": "2025-09-06",
+        "delivery_date": delivery_date, "is_read": False, "read_date": None, "write_time": letter_id,
+    }
@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analytics
+
+
+def day(offset):
+    return (date(2024, 12, 30) + timedelta(days=offset)).isoformat()
+
+
+# 2024-12-30(월)부터: 기쁨, 기쁨, 불안, (빈 날), 불안, 기쁨, 평온
+EMOTIONS = ["기쁨", "기쁨", "불안", None, "불안", "기쁨", "평온"]
+CALENDAR = {day(i): {"emotion": emotion, "note": "", "color": "#fff"} for i, emotion in enumerate(EMOTIONS) if emotion}
+
+
+def make_history(per_day=None):
+    return analytics.MoodHistory(analytics.calendar_columns(CALENDAR), analytics.record_counts(per_day or {}))
+
+
+def test_columns_are_daily_and_ordered_by_frequency():
+    history = make_history({day(-2): 1, day(3): 2, "잘못된 날": 5})
+    assert history.emotions == ("기쁨", "불안", "평온")
+    assert len(history) == 9
+    assert history.days[0] == pd.Timestamp(day(-2))
+    assert history.codes.tolist() == [-1, -1, 0, 0, 1, -1, 1, 0, 2]
+    assert history.records.tolist() == [1, 0, 0, 0, 0, 2, 0, 0, 0]
+    assert history.recorded_days == 6
+
+
+def test_rolling_share_matches_a_plain_loop():
+    history = make_history()
+    share = history.rolling_share(3)
+    for i in range(len(history)):
+        window = [e for e in EMOTIONS[max(i - 2, 0):i + 1] if e]
+        for emotion in history.emotions:
+            assert share.iloc[i][emotion] == pytest.approx(window.count(emotion) / len(window))
+    assert list(history.rolling_share(7, last=2).index) == list(history.days[-2:])
+    assert history.activity(2, last=1).tolist() == [0.0]
+
+
+def test_seasonality_and_transitions():
+    history = make_history()
+    weekday = history.seasonality("weekday")
+    assert list(weekday.index) == list(analytics.WEEKDAY_LABELS)
+    # 월요일은 12-30(기쁨) 하루뿐, 목요일(01-02)은 기록 없음
+    assert weekday.loc["월"].tolist() == [1.0, 0.0, 0.0]
+    assert np.isnan(weekday.loc["목"]).all()
+    month = history.seasonality("month")
+    assert month.loc["12월"].tolist() == [1.0, 0.0, 0.0]
+    assert month.loc["1월"].tolist() == pytest.approx([0.25, 0.5, 0.25])
+
+    counts = history.transitions(normalize=False)
+    # 기쁨→기쁨, 기쁨→불안, 불안→기쁨, 기쁨→평온 (빈 날을 건너는 쌍은 셈하지 않음)
+    assert counts.loc["기쁨"].tolist() == [1, 1, 1]
+    assert counts.loc["불안"].tolist() == [1, 0, 0]
+    assert history.transitions().loc["기쁨"].tolist() == pytest.approx([1 / 3] * 3)
+
+
+def test_empty_history():
+    history = analytics.MoodHistory(analytics.calendar_columns({}), analytics.record_counts({}))
+    assert history.recorded_days == 0
+    assert history.rolling_share(7).empty and history.transitions().empty
+
+
+def test_load_is_cached_per_data_version(storage, tmp_path):
+    owner = str(tmp_path)
+    storage.save_calendar(CALENDAR)
+    storage.append_record(f"{day(1)} 10:00:00", "기록")
+    storage.append_record(None, "시각 없는 기록")
+
+    history = analytics.load(owner, storage)
+    assert analytics.load(owner, storage) is history
+    assert history.records.sum() == 1
+
+    storage.append_record(f"{day(1)} 11:00:00", "기록")
+    updated = analytics.load(owner, storage)
+    assert updated is not history
+    assert updated.records.sum() == 2
+    assert updated.emotions == history.emotions
@@ -3,3 +3,31 @@ def test_import_app_module():
     module = importlib.import_module('app')
     assert hasattr(module, 'main')
 
+
+def test_import_app_has_no_heavy_imports():
+    import import_time
+    report = import_time.measure('app', top=3)
+    assert report['total_ms'] is not None
+    assert report['heavy_modules_loaded'] == []
+
+
+def test_import_app_does_not_touch_page(monkeypatch):
+    import importlib
+    import streamlit as st
+    import app
+
+    calls = []
+    monkeypatch.setattr(st, 'set_page_config', lambda *a, **kw: calls.append('config'))
+    monkeypatch.setattr(st, 'markdown', lambda *a, **kw: calls.append('markdown'))
+    importlib.reload(app)
+    assert calls == []
+
+
+def test_parse_importtime():
+    import import_time
+    rows = import_time.parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   json.decoder\n"
+        "import time:       300 |        420 | json\n"
+    )
+    assert rows == [('json.decoder', 120, 120, 1), ('json', 300, 420, 0)]
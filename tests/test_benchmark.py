@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+
+import benchmark
+from storage import FileStorage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_generate_matches_file_formats(tmp_path):
+    sizes = benchmark.generate(str(tmp_path), calendar_days=60, records=500, letters=40, contents_per_emotion=3)
+    storage = FileStorage(str(tmp_path))
+
+    assert len(storage.load_calendar()) == sizes["calendar_days"]
+    assert sizes["calendar_days"] >= 15
+    assert len(list(storage.iter_records())) == 500
+    assert len(storage.load_letters()["letters"]) == 40
+    with open(tmp_path / "data" / "contents.json", encoding="utf-8") as f:
+        assert sum(len(items) for items in json.load(f).values()) == sizes["contents"]
+
+
+def test_generate_is_deterministic(tmp_path):
+    for name in ("a", "b"):
+        benchmark.generate(str(tmp_path / name), calendar_days=30, records=20, letters=5, contents_per_emotion=1, seed=7)
+    for filename in ("emotion_calendar.json", "records.txt", "future_letters.json"):
+        assert (tmp_path / "a" / filename).read_bytes() == (tmp_path / "b" / filename).read_bytes()
+
+
+def test_streamlit_stub_swallows_calls():
+    st = benchmark.StreamlitStub({"selected_emotion": "불안"})
+    col1, col2 = st.columns([3, 1])
+    with col1, st.expander("제목"):
+        st.write("내용")
+    assert st.button("눌러보기") is False
+    assert st.session_state.selected_emotion == "불안"
+    assert st.calls == 2
+
+
+def test_measure_outputs_json(tmp_path):
+    benchmark.generate(str(tmp_path), calendar_days=30, records=100, letters=20, contents_per_emotion=2)
+    result = subprocess.run(
+        [sys.executable, "benchmark.py", "measure", str(tmp_path), "--repeat", "1",
+         "--only", "load_emotion_calendar", "get_new_letters_count", "show_simple_mailbox"],
+        capture_output=True, text=True, cwd=ROOT, check=True,
+    )
+    results = json.loads(result.stdout)
+    assert {"load_emotion_calendar", "get_new_letters_count", "show_simple_mailbox.data"} <= set(results)
+    assert all(timing["repeat"] == 1 and timing["min_ms"] >= 0 for timing in results.values())
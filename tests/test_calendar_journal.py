@@ -0,0 +1,41 @@
+import calendar_journal
+
+
+def test_append_and_compact_round_trip(tmp_path):
+    snapshot = str(tmp_path / "emotion_calendar.json")
+    calendar_journal.write_snapshot(snapshot, {"2025-09-06": {"emotion": "희망", "note": "a"}})
+
+    calendar_journal.append_entry(snapshot, "2025-09-07", {"emotion": "평온", "note": "b"})
+    calendar_journal.append_entry(snapshot, "2025-09-06", {"emotion": "행복", "note": "c"})
+
+    expected = {
+        "2025-09-06": {"emotion": "행복", "note": "c"},
+        "2025-09-07": {"emotion": "평온", "note": "b"},
+    }
+    assert calendar_journal.load_calendar(snapshot) == expected
+
+    assert calendar_journal.compact(snapshot) == 2
+    assert not (tmp_path / "emotion_calendar.json.journal").exists()
+    assert calendar_journal.load_calendar(snapshot) == expected
+
+
+def test_truncated_journal_line_is_ignored(tmp_path):
+    snapshot = str(tmp_path / "emotion_calendar.json")
+    calendar_journal.append_entry(snapshot, "2025-09-07", {"emotion": "평온"})
+    with open(calendar_journal.journal_path(snapshot), "a", encoding="utf-8") as f:
+        f.write('{"date": "2025-09-08", "entr')
+
+    assert calendar_journal.load_calendar(snapshot) == {"2025-09-07": {"emotion": "평온"}}
+
+
+def test_append_after_a_torn_line_is_kept(tmp_path):
+    snapshot = str(tmp_path / "emotion_calendar.json")
+    calendar_journal.append_entry(snapshot, "2020-01-01", {"emotion": "평온"})
+    with open(calendar_journal.journal_path(snapshot), "a", encoding="utf-8") as f:
+        f.write('{"date": "2020-01-02", "entr')
+    calendar_journal.append_entry(snapshot, "2020-01-03", {"emotion": "희망"})
+
+    expected = {"2020-01-01": {"emotion": "평온"}, "2020-01-03": {"emotion": "희망"}}
+    assert calendar_journal.load_calendar(snapshot) == expected
+    calendar_journal.compact(snapshot)
+    assert calendar_journal.load_calendar(snapshot) == expected
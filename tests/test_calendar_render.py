@@ -0,0 +1,25 @@
+import calendar_render
+
+
+def test_month_html_matches_day_cells():
+    month_html = calendar_render.build_month_html(2025, 9, {
+        "2025-09-06": {"emotion": "희망", "note": "새로운 \"도전\"", "color": "#98FB98"},
+    })
+
+    assert month_html.count("<strong>") == 7 + 1
+    assert "background-color: #98FB98" in month_html
+    assert 'title="희망: 새로운 &quot;도전&quot;"' in month_html
+    assert ">30</div>" in month_html
+
+
+def test_month_html_is_cached_by_version():
+    loads = []
+
+    def load_month():
+        loads.append(1)
+        return {}
+
+    first = calendar_render.month_html("test-user", 2025, 9, 1, load_month)
+    assert calendar_render.month_html("test-user", 2025, 9, 1, load_month) == first
+    calendar_render.month_html("test-user", 2025, 9, 2, load_month)
+    assert len(loads) == 2
@@ -0,0 +1,73 @@
+import pandas as pd
+
+import heatmap
+from calendar_table import CalendarTable
+from emotion_registry import pack_color, registry, unpack_color
+from storage import FileStorage
+from streaks import StreakEngine
+
+CALENDAR = {
+    "2025-09-06": {"emotion": "희망", "note": "과제 끝", "color": "#98FB98", "timestamp": "2025-09-06 16:18:04"},
+    "2025-09-01": {"emotion": "불안", "note": "", "color": "#ff6b6b", "timestamp": None},
+    "2025-09-02": {"emotion": "불안", "note": "", "color": "#FF6B6B", "timestamp": "2025-09-02 21:00:00"},
+    # 배열로 담지 못하는 기록은 원래 dict 그대로
+    "2025-09-03": {"emotion": "평온", "note": "", "color": "#fff", "timestamp": "t1"},
+    "2025-09-04": {"emotion": "설렘", "note": None, "color": "#AbCdEf", "timestamp": None},
+    "2025-09-05": {"emotion": "희망", "note": "x"},
+    "2025-08-31": {"emotion": "가져온 감정", "note": "", "color": "#123456", "timestamp": None},
+}
+
+
+def test_table_reads_back_the_same_calendar():
+    table = CalendarTable.from_dict(CALENDAR)
+
+    assert table == CALENDAR and CALENDAR == table
+    assert len(table) == len(CALENDAR)
+    assert list(table) == sorted(CALENDAR)
+    assert dict(table.items()) == CALENDAR
+    assert "2025-09-02" in table and "2025-09-07" not in table and "아무거나" not in table
+    assert table.get("2025-09-07") is None
+    table["2025-09-06"]["note"] = "고쳐도"
+    assert table["2025-09-06"]["note"] == "과제 끝"
+
+
+def test_range_counts_and_columns_come_from_the_arrays():
+    table = CalendarTable.from_dict(CALENDAR)
+
+    assert table.between("2025-09-02", "2025-09-04") == {day: CALENDAR[day] for day in ("2025-09-02", "2025-09-03", "2025-09-04")}
+    assert table.between("2025-10-01", "2025-10-31") == {}
+    assert table.emotion_counts() == {"희망": 2, "불안": 2, "평온": 1, "설렘": 1, "가져온 감정": 1}
+    assert StreakEngine.from_calendar(table).runs() == StreakEngine.from_calendar(CALENDAR).runs()
+
+    frame = heatmap.calendar_frame(table)
+    expected = heatmap.calendar_frame(CALENDAR)
+    columns = ["emotion", "note", "color"]
+    pd.testing.assert_frame_equal(frame[columns], expected[columns], check_index_type=False)
+
+
+def test_registry_unifies_color_and_config_tables():
+    assert registry.name(registry.code("무기력")) == "무기력"
+    assert unpack_color(registry.color(registry.code("무기력"))) == "#A9A9A9"
+    assert registry.config(registry.code("무기력"))["icon"] == "😴"
+    assert registry.config(registry.code("행복")) is None
+    assert unpack_color(pack_color("#98FB98")) == "#98FB98"
+    assert pack_color("#abc") is None
+
+
+def test_unknown_emotions_are_not_registered():
+    size = len(registry)
+    table = CalendarTable.from_dict({"2025-09-01": {"emotion": "처음 보는 감정", "note": "", "color": "#123456", "timestamp": None}})
+
+    assert table["2025-09-01"]["emotion"] == "처음 보는 감정"
+    assert registry.code("처음 보는 감정") is None and "처음 보는 감정" not in registry
+    assert len(registry) == size
+
+
+def test_file_storage_caches_the_table(tmp_path):
+    storage = FileStorage(str(tmp_path))
+    for day, entry in CALENDAR.items():
+        storage.save_calendar_day(day, entry)
+
+    assert isinstance(storage.load_calendar(), CalendarTable)
+    assert storage.load_calendar() == CALENDAR
+    assert storage.calendar_between("2025-09-05", "2025-09-30") == {day: CALENDAR[day] for day in ("2025-09-05", "2025-09-06")}
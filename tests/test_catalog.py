@@ -0,0 +1,79 @@
+import json
+import os
+import time
+
+import catalog
+
+
+def items(prefix, n):
+    return [{"id": f"{prefix}_{i}", "title": f"{prefix} {i}"} for i in range(n)]
+
+
+def make_catalog(tmp_path, **kwargs):
+    return catalog.Catalog(
+        directory=str(tmp_path / "contents"), legacy_path=str(tmp_path / "contents.json"), poll_seconds=0, **kwargs
+    )
+
+
+def test_default_and_legacy_file(tmp_path):
+    contents = make_catalog(tmp_path, default={"불안": items("default", 1)})
+    assert contents.current().items("불안")[0]["id"] == "default_0"
+
+    with open(tmp_path / "contents.json", "w", encoding="utf-8") as f:
+        json.dump({"불안": items("legacy", 2), "슬픔": items("sad", 1)}, f, ensure_ascii=False)
+    assert contents.check()
+    assert [item["id"] for item in contents.current().items("불안")] == ["legacy_0", "legacy_1"]
+    assert contents.current().items("없는 감정") == []
+
+
+def test_only_requested_shard_is_parsed(tmp_path):
+    catalog.write_catalog({"불안": items("anx", 3), "슬픔": items("sad", 2)}, str(tmp_path / "contents"))
+    snapshot = make_catalog(tmp_path).current()
+
+    assert snapshot.count("슬픔") == 2
+    assert snapshot.loaded_emotions() == []
+    assert len(snapshot.items("슬픔")) == 2
+    assert snapshot.loaded_emotions() == ["슬픔"]
+
+
+def test_swap_keeps_old_snapshot_consistent(tmp_path):
+    directory = str(tmp_path / "contents")
+    catalog.write_catalog({"불안": items("v1", 3), "슬픔": items("v1sad", 1)}, directory)
+    contents = make_catalog(tmp_path)
+    old = contents.current()
+    old.items("불안")
+
+    catalog.write_catalog({"불안": items("v2", 5), "슬픔": items("v1sad", 1)}, directory)
+    assert contents.check()
+    assert contents.swaps == 1
+    assert not contents.check()
+
+    new = contents.current()
+    assert new.version != old.version
+    # 이미 쓰던 감정은 교체 시 미리 읽어 둠
+    assert new.loaded_emotions() == ["불안"]
+    assert [item["id"] for item in new.items("불안")][-1] == "v2_4"
+    # 이전 스냅샷은 이전 세대 shard를 그대로 읽음
+    assert [item["id"] for item in old.items("불안")] == ["v1_0", "v1_1", "v1_2"]
+    assert old.items("슬픔")[0]["id"] == "v1sad_0"
+
+
+def test_write_catalog_keeps_one_previous_generation(tmp_path):
+    directory = str(tmp_path / "contents")
+    for version in range(3):
+        catalog.write_catalog({"불안": items(f"v{version}", 1)}, directory)
+    shard_files = [name for name in os.listdir(directory) if name.startswith("shard-")]
+    assert len(shard_files) == 2
+
+
+def test_watcher_swaps_in_background(tmp_path):
+    directory = str(tmp_path / "contents")
+    catalog.write_catalog({"불안": items("v1", 1)}, directory)
+    contents = catalog.Catalog(directory=directory, legacy_path=str(tmp_path / "none.json"), poll_seconds=0.02)
+    assert contents.current().items("불안")[0]["id"] == "v1_0"
+
+    catalog.write_catalog({"불안": items("v2", 1)}, directory)
+    deadline = time.time() + 5
+    while contents.swaps == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert contents.current().items("불안")[0]["id"] == "v2_0"
@@ -0,0 +1,86 @@
+import json
+from datetime import datetime
+
+import delivery
+import storage as storage_module
+from conftest import make_letter
+from storage import FileStorage
+
+
+def test_letters_are_delivered_exactly_once_with_arrival_time(storage):
+    storage.add_letter(make_letter("a", "2025-10-01"))
+    storage.add_letter(make_letter("b", "2025-10-03"))
+
+    delivered = storage.deliver_due(datetime(2025, 10, 2, 8, 30))
+    assert [(letter["id"], letter["delivered_at"]) for letter in delivered] == [("a", "2025-10-02 08:30:00")]
+    assert storage.deliver_due(datetime(2025, 10, 2, 9, 0)) == []
+    assert storage.next_delivery() == "2025-10-03"
+
+    assert [letter["id"] for letter in storage.deliver_due(datetime(2025, 10, 4, 0, 0))] == ["b"]
+    assert storage.next_delivery() is None
+    arrivals = {header["id"]: header["delivered_at"] for header in storage.letter_headers()}
+    assert arrivals == {"a": "2025-10-02 08:30:00", "b": "2025-10-04 00:00:00"}
+
+
+def test_scheduler_delivers_when_the_clock_reaches_the_delivery_date(tmp_path):
+    storages = {}
+    for user_id in ("u1", "u2"):
+        (tmp_path / user_id).mkdir()
+        storages[user_id] = FileStorage(str(tmp_path / user_id))
+    now = [delivery.due_timestamp("2025-10-01") + 3600]
+    scheduler = delivery.DeliveryScheduler(storage_for=storages.__getitem__, clock=lambda: now[0])
+
+    storages["u1"].add_letter(make_letter("old", "2025-09-30"))
+    storages["u1"].add_letter(make_letter("later", "2025-10-05"))
+    assert [letter["id"] for letter in scheduler.deliver("u1")] == ["old"]
+    storages["u2"].add_letter(make_letter("soon", "2025-10-03"))
+    scheduler.schedule("u2", "2025-10-03")
+
+    assert scheduler.run_pending() == 0
+    assert scheduler.seconds_until_next() == 2 * 86400 - 3600
+    now[0] = delivery.due_timestamp("2025-10-03")
+    assert scheduler.run_pending() == 1
+    assert storages["u2"].mailbox_counts() == {"new": 1, "arrived": 1, "waiting": 0}
+    now[0] = delivery.due_timestamp("2025-10-06")
+    assert scheduler.run_pending() == 1
+    assert scheduler.seconds_until_next() is None
+    assert scheduler.delivered == 3
+
+
+def test_any_delivery_error_is_retried_later(tmp_path):
+    import sqlite3
+
+    (tmp_path / "u1").mkdir()
+    user_storage = FileStorage(str(tmp_path / "u1"))
+    user_storage.add_letter(make_letter("a", "2025-09-30"))
+    now = [delivery.due_timestamp("2025-10-01")]
+    failures = [sqlite3.OperationalError("database is locked"), KeyError("delivery_date")]
+
+    def storage_for(user_id):
+        if failures:
+            raise failures.pop(0)
+        return user_storage
+
+    scheduler = delivery.DeliveryScheduler(storage_for=storage_for, clock=lambda: now[0])
+    assert scheduler.watch("u1") == []
+    assert scheduler.seconds_until_next() == delivery.RETRY_SECONDS
+    now[0] += delivery.RETRY_SECONDS
+    assert scheduler.run_pending() == 0
+    now[0] += delivery.RETRY_SECONDS
+    assert scheduler.run_pending() == 1
+    assert scheduler._thread.is_alive()
+
+
+def test_tick_delivers_every_user(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(storage_module, "USERS_DIR", str(tmp_path))
+    monkeypatch.setenv("MINDFUL_STORAGE", "files")
+    for user_id, dates in {"u1": ["2025-10-01", "2025-10-02"], "u2": ["2099-01-01"]}.items():
+        user_storage = storage_module.create_storage(user_id=user_id)
+        for i, delivery_date in enumerate(dates):
+            user_storage.add_letter(make_letter(f"{user_id}-{i}", delivery_date))
+    (tmp_path / "잘못된 이름").mkdir()
+
+    assert delivery.tick(datetime(2025, 10, 3)) == {"u1": 2}
+    assert delivery.tick(datetime(2025, 10, 3)) == {}
+    delivery.main(["tick"])
+    assert json.loads(capsys.readouterr().out) == {"users": 0, "delivered": 0}
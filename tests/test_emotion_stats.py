@@ -0,0 +1,54 @@
+import emotion_stats
+from storage import FileStorage, SqliteStorage
+
+
+def entry(emotion):
+    return {"emotion": emotion, "note": "", "color": "#FFD700", "timestamp": ""}
+
+
+def test_stats_are_maintained_at_write_time(tmp_path):
+    storage = FileStorage(str(tmp_path))
+    for day, emotion in [("2025-09-01", "행복"), ("2025-09-02", "평온"), ("2025-09-03", "행복"),
+                         ("2025-09-05", "불안"), ("2025-09-06", "불안")]:
+        storage.save_calendar_day(day, entry(emotion))
+    # 같은 날 감정을 바꾸면 이전 감정은 차감
+    storage.save_calendar_day("2025-09-06", entry("희망"))
+
+    stats = storage.emotion_stats()
+    assert stats == emotion_stats.build(storage.load_calendar())
+    assert stats["counts"] == {"행복": 2, "평온": 1, "불안": 1, "희망": 1}
+    assert stats["total_days"] == 5
+    assert stats["longest_streak"] == 3
+    assert emotion_stats.current_streak(stats, "2025-09-06") == 2
+    assert emotion_stats.current_streak(stats, "2025-09-07") == 0
+
+
+def test_backfill_of_past_day(tmp_path):
+    storage = FileStorage(str(tmp_path))
+    storage.save_calendar_day("2025-09-03", entry("행복"))
+    storage.save_calendar_day("2025-09-02", entry("평온"))
+
+    stats = storage.emotion_stats()
+    assert stats["total_days"] == 2
+    assert stats["current_streak"] == 2
+
+
+def test_sqlite_stats_are_kept_in_the_same_transaction(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "mindful_compass.db"))
+    for day, emotion in [("2025-09-01", "행복"), ("2025-09-02", "평온"), ("2025-09-04", "불안")]:
+        storage.save_calendar_day(day, entry(emotion))
+    storage.save_calendar_day("2025-09-04", entry("희망"))
+    storage.save_calendar_day("2025-09-03", entry("행복"))
+    storage.save_calendar_days([("2025-09-05", entry("희망")), ("2025-09-01", None)])
+
+    conn = storage._connect()
+    stored = storage._stored_stats(conn, storage.calendar_version())
+    assert stored == emotion_stats.build(storage.load_calendar())
+    assert stored["counts"] == {"평온": 1, "행복": 1, "희망": 2}
+    assert stored["longest_streak"] == 4
+    # 저장된 통계를 읽을 뿐 달력 표는 다시 훑지 않음
+    queries = []
+    conn.set_trace_callback(queries.append)
+    assert storage.emotion_stats() == stored
+    conn.set_trace_callback(None)
+    assert not any("FROM calendar" in query for query in queries)
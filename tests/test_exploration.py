@@ -0,0 +1,40 @@
+from exploration import ExplorationStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_state_keeps_ids_and_shared_config():
+    store = ExplorationStore(idle_seconds=60, clock=FakeClock())
+    state = store.start("a", "불안")
+
+    assert store.get("a") is state
+    assert state.emotion_name == "불안" and state.config["icon"]
+    assert state.step == 1 and state.timing_label == ""
+    state.timing = 0
+    assert state.timing_label
+    assert store.get("b") is None
+    assert store.clear("a") and not store.clear("a")
+    assert len(store) == 0
+
+
+def test_idle_states_expire_when_any_session_uses_the_store():
+    clock = FakeClock()
+    store = ExplorationStore(idle_seconds=60, clock=clock)
+    store.start("idle", "슬픔")
+    store.start("busy", "분노")
+
+    clock.now = 50
+    assert store.get("busy") is not None
+    clock.now = 100
+    assert store.get("busy") is not None
+    assert len(store) == 1 and store.get("idle") is None
+
+    clock.now = 200
+    assert store.expire() == 1
+    assert store.expired == 2 and len(store) == 0
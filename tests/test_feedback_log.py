@@ -0,0 +1,53 @@
+import json
+import os
+
+import feedback_log
+from storage import FileStorage
+
+
+def click(content_id, emotion="불안", is_helpful=True):
+    return {"content_id": content_id, "content_title": content_id, "is_helpful": is_helpful,
+            "emotion": emotion, "timestamp": "2025-09-06T15:00:00", "session_id": "s"}
+
+
+def test_counters_are_updated_per_click(storage):
+    storage.append_feedback(click("anxiety_001"))
+    storage.append_feedback(click("anxiety_001"))
+    storage.append_feedback(click("anxiety_001", emotion="스트레스", is_helpful=False))
+
+    assert storage.feedback_counts() == {
+        "anxiety_001": {"불안": {"helpful": 2, "total": 2}, "스트레스": {"helpful": 0, "total": 1}},
+    }
+    assert len(storage.load_feedback()["feedbacks"]) == 3
+
+
+def test_counters_catch_up_with_log_and_legacy_file(tmp_path):
+    storage = FileStorage(str(tmp_path))
+    (tmp_path / "content_feedback.json").write_text(
+        json.dumps({"feedbacks": [{"content_title": "옛 콘텐츠", "is_helpful": True, "emotion": "슬픔"}]}),
+        encoding="utf-8",
+    )
+    storage.append_feedback(click("anxiety_001"))
+    # 카운터 갱신 전에 중단된 것처럼 로그에만 직접 추가
+    with open(storage.feedback_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(click("anxiety_001")) + "\n")
+
+    counts = storage.feedback_counts()
+    assert counts["anxiety_001"]["불안"] == {"helpful": 2, "total": 2}
+    assert counts["옛 콘텐츠"]["슬픔"] == {"helpful": 1, "total": 1}
+
+
+def test_append_after_a_torn_line_is_kept(tmp_path):
+    storage = FileStorage(str(tmp_path))
+    storage.append_feedback(click("anxiety_001"))
+    # 쓰다 끊긴 줄 (한글 중간에서 잘림)
+    with open(storage.feedback_path, "ab") as f:
+        f.write(json.dumps(click("sad_001"), ensure_ascii=False).encode("utf-8")[:-5] + "불".encode("utf-8")[:2])
+    storage.append_feedback(click("anxiety_002"))
+
+    assert [event["content_id"] for event in feedback_log.iter_events(storage.feedback_path)] == ["anxiety_001", "anxiety_002"]
+    assert len(storage.load_feedback()["feedbacks"]) == 2
+    assert set(storage.feedback_counts()) == {"anxiety_001", "anxiety_002"}
+    # 카운터를 처음부터 다시 세어도 같음
+    os.remove(storage.feedback_counts_path)
+    assert set(FileStorage(str(tmp_path)).feedback_counts()) == {"anxiety_001", "anxiety_002"}
@@ -0,0 +1,27 @@
+import heatmap
+
+
+def test_heatmap_places_days_by_week_and_weekday():
+    frame = heatmap.calendar_frame({
+        "2025-01-01": {"emotion": "희망", "note": "<새해>", "color": "#98FB98", "timestamp": ""},
+        "2025-01-06": {"emotion": "불안", "note": "", "color": "#FF6B6B", "timestamp": ""},
+    })
+    svg = heatmap.heatmap_svg(frame, 2025, 2025)
+
+    assert svg.count("<rect") == 365
+    step = heatmap.CELL_SIZE + heatmap.CELL_GAP
+    # 2025-01-01은 수요일(첫 주), 2025-01-06은 월요일(둘째 주)
+    assert f'<rect x="{heatmap.LABEL_WIDTH}" y="{2 * step}"' in svg
+    assert f'<rect x="{heatmap.LABEL_WIDTH + step}" y="0"' in svg
+    assert "2025-01-01 희망: &lt;새해&gt;" in svg
+
+
+def test_year_summary():
+    frame = heatmap.calendar_frame({
+        "2024-12-31": {"emotion": "평온", "note": "", "color": "#87CEEB"},
+        "2025-01-01": {"emotion": "희망", "note": "", "color": "#98FB98"},
+        "2025-01-02": {"emotion": "희망", "note": "", "color": "#98FB98"},
+    })
+    summary = heatmap.year_summary(frame)
+    assert summary.loc[2025, "days"] == 2
+    assert summary.loc[2025, "top_emotion"] == "희망"
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+import insights
+from app_data import DEFAULT_INSIGHT
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "insights.json")
+
+
+def write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def test_shipped_file_compiles_for_every_emotion_and_timing():
+    table = insights.load()
+    for timing in insights.TIMING_OPTIONS:
+        insight = insights.get_insight("불안", "안개", timing)
+        assert "'안개' 같은 불안함" in insight["main_message"]
+        assert insight["encouragement"]
+    assert ("무기력", "오래전부터") in table
+
+
+def test_variant_fields_fall_back_in_order(path):
+    write(path, {
+        "*": {"*": {"main_message": "공통 {word}"}, "오래전부터": {"encouragement": "공통 오래"}},
+        "불안": {"*": {"main_message": "불안 {word} / {timing} / {context}"}, "방금 전부터": {"encouragement": "숨 고르기"}},
+    })
+    assert insights.get_insight("불안", "안개", "방금 전부터", "과제", path=path) == {
+        "main_message": "불안 안개 / 방금 전부터 / 과제",
+        "encouragement": "숨 고르기",
+    }
+    assert insights.get_insight("불안", "안개", "오래전부터", path=path)["encouragement"] == "공통 오래"
+    assert insights.get_insight("불안", "안개", "모르는 시점", path=path)["encouragement"] == DEFAULT_INSIGHT["encouragement"]
+    assert insights.get_insight("없는 감정", "{timing}", "", path=path)["main_message"] == "공통 {timing}"
+
+
+def test_templates_compile_once_and_reload_on_edit(path, monkeypatch):
+    write(path, {"불안": {"*": {"main_message": "v1 {word}"}}})
+    calls = []
+    original = insights.compile_insights
+    monkeypatch.setattr(insights, "compile_insights", lambda data: calls.append(1) or original(data))
+
+    for _ in range(5):
+        assert insights.get_insight("불안", "안개", path=path)["main_message"] == "v1 안개"
+    assert len(calls) == 1
+
+    write(path, {"불안": {"*": {"main_message": "바뀐 문구 {word}"}}})
+    assert insights.get_insight("불안", "안개", path=path)["main_message"] == "바뀐 문구 안개"
+
+
+def test_broken_file_falls_back_to_default(path):
+    write(path, {"불안": {"*": {"mian_message": "오타"}}})
+    with pytest.raises(ValueError):
+        insights.main(["check", "--path", path])
+    assert insights.get_insight("불안", "안개", path=path) == DEFAULT_INSIGHT
+    assert insights.get_insight("불안", "안개", path=str(path) + ".missing") == DEFAULT_INSIGHT
@@ -0,0 +1,177 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+import letter_store
+from conftest import make_letter
+from storage import FileStorage
+
+
+def write_legacy(path, letters):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"letters": letters}, f, ensure_ascii=False)
+
+
+def test_legacy_file_is_imported_only_once(tmp_path):
+    legacy = str(tmp_path / "future_letters.json")
+    write_legacy(legacy, [make_letter("a", "2025-09-13"), make_letter("b", "2025-10-01")])
+    store = letter_store.LetterStore(str(tmp_path), legacy)
+
+    assert [letter["id"] for letter in store.letters()] == ["a", "b"]
+    assert store.letters()[0] == dict(make_letter("a", "2025-09-13"), delivered_at=None)
+
+    store.add(make_letter("c", "2025-09-20"))
+    assert len(store.view()) == 3
+    # 예전 파일이 밖에서 바뀌거나(touch, 백업 복원) 없어져도 그 뒤에 쓴 편지는 그대로
+    os.utime(legacy, ns=(0, 0))
+    assert [letter["id"] for letter in store.letters()] == ["a", "b", "c"]
+    write_legacy(legacy, [make_letter("x", "2025-09-13")])
+    assert [letter["id"] for letter in store.letters()] == ["a", "b", "c"]
+    os.remove(legacy)
+    assert [letter["id"] for letter in letter_store.LetterStore(str(tmp_path), legacy).iter_letters()] == ["a", "b", "c"]
+
+
+def test_touching_the_legacy_file_keeps_new_letters(tmp_path):
+    write_legacy(str(tmp_path / "future_letters.json"), [make_letter("old", "2025-09-13")])
+    storage = FileStorage(str(tmp_path))
+    storage.add_letter(make_letter("new", "2025-09-20"))
+
+    os.utime(storage.letters_path)
+    assert [letter["id"] for letter in FileStorage(str(tmp_path)).iter_letters()] == ["old", "new"]
+
+
+def test_pages_are_read_from_headers_and_bodies_on_demand(tmp_path):
+    store = letter_store.LetterStore(str(tmp_path), str(tmp_path / "future_letters.json"))
+    for i in range(25):
+        store.add(make_letter(f"L{i:02d}", f"2025-10-{i + 1:02d}", content=f"본문 {i}"))
+
+    view = store.view()
+    assert view.delivered_count("2025-10-20") == 20
+    page = view.delivered("2025-10-20", offset=10, limit=10)
+    assert [header["id"] for header in page] == [f"L{i:02d}" for i in range(9, -1, -1)]
+    assert set(page[0]) == {"id", "delivery_date", "write_date", "is_read", "read_date", "delivered_at"}
+    assert store.body("L07")["content"] == "본문 7"
+    assert store.body("없음") is None
+
+
+def test_mark_read_rewrites_one_header_in_place(tmp_path):
+    store = letter_store.LetterStore(str(tmp_path), str(tmp_path / "future_letters.json"))
+    for i in range(5):
+        store.add(make_letter(f"L{i}", "2025-10-01"))
+    store.view()
+    headers_size = os.path.getsize(store.headers_path)
+    bodies_stat = os.stat(store.bodies_path)
+
+    assert store.mark_read("L3", "2025-10-02 09:00:00")
+    assert not store.mark_read("없음", "2025-10-02 09:00:00")
+
+    assert os.path.getsize(store.headers_path) == headers_size
+    assert os.stat(store.bodies_path).st_mtime_ns == bodies_stat.st_mtime_ns
+    read = [header["id"] for header in store.view().headers() if header["is_read"]]
+    assert read == ["L3"]
+    # 다른 프로세스(새 인스턴스)도 같은 결과
+    other = letter_store.LetterStore(str(tmp_path), str(tmp_path / "future_letters.json"))
+    assert other._read_view().headers()[3]["read_date"] == "2025-10-02 09:00:00"
+
+
+def test_new_count_matches_a_fresh_parse_after_mark_read(tmp_path):
+    store = letter_store.LetterStore(str(tmp_path), str(tmp_path / "future_letters.json"))
+    store.add(make_letter("arrived", "2025-10-01"))
+    store.add(make_letter("later", "2025-12-01"))
+    store.deliver_due("2025-10-01", "2025-10-01 09:00:00")
+    assert store.view().new_count() == 1
+
+    # 아직 도착하지 않은 편지를 읽음 표시해도 새 편지 수는 그대로
+    assert store.mark_read("later", "2025-10-02 09:00:00")
+    assert store.view().new_count() == store._read_view().new_count() == 1
+
+    # 캐시된 뷰를 얻은 뒤 다른 인스턴스(다른 프로세스)가 배송해도 읽음 표시 뒤 캐시에 반영됨
+    other = letter_store.LetterStore(str(tmp_path), str(tmp_path / "future_letters.json"))
+    store.add(make_letter("third", "2025-11-01"))
+    store.view()
+    other.deliver_due("2025-11-01", "2025-11-01 09:00:00")
+    assert store.mark_read("arrived", "2025-11-02 09:00:00")
+    assert store.view().new_count() == store._read_view().new_count() == 1
+
+
+def test_mailbox_counts_are_kept_in_the_file_header(tmp_path, monkeypatch):
+    store = letter_store.LetterStore(str(tmp_path), str(tmp_path / "future_letters.json"))
+
+    def recount():
+        view = store._read_view()
+        arrived = len(view.arrived_order())
+        return arrived, sum(1 for slot in view.arrived_order() if not view.records[slot][3]), len(view)
+
+    store.add(make_letter("a", "2025-10-01"))
+    store.add_many([make_letter("b", "2025-10-02"), dict(make_letter("c", "2025-09-01"), delivered_at="2025-09-01 09:00:00")])
+    assert store.counts() == recount() == (1, 1, 3)
+    store.deliver_due("2025-10-01", "2025-10-01 09:00:00")
+    store.mark_read("a", "2025-10-01 10:00:00")
+    store.mark_read("b", "2025-10-01 10:00:00")
+    assert store.counts() == recount() == (2, 1, 3)
+    store.replace_all(store.letters()[:2])
+    assert store.counts() == recount() == (1, 0, 2)
+
+    # 배지는 파일 머리만 읽음 - 헤더 전체를 파싱하지 않음
+    monkeypatch.setattr(letter_store, "HeaderView", None)
+    assert FileStorage(str(tmp_path)).mailbox_counts() == {"new": 0, "arrived": 1, "waiting": 1}
+
+
+def test_v2_header_file_gets_counters(tmp_path):
+    store = letter_store.LetterStore(str(tmp_path), str(tmp_path / "future_letters.json"))
+    store.add(make_letter("a", "2025-10-01"))
+    store.add(make_letter("b", "2025-10-02"))
+    store.deliver_due("2025-10-01", "2025-10-01 09:00:00")
+    # 파일 머리에 카운터가 없던 형식으로 되돌려 씀
+    with open(store.headers_path, "rb") as f:
+        data = f.read()
+    with open(store.headers_path, "wb") as f:
+        f.write(letter_store.MAGIC_V2 + data[8:letter_store.OLD_FILE_HEADER.size] + data[letter_store.FILE_HEADER.size:])
+
+    other = letter_store.LetterStore(str(tmp_path), str(tmp_path / "future_letters.json"))
+    assert other.counts() == (1, 1, 2)
+    assert [header["id"] for header in other.view().arrived()] == ["a"]
+
+
+def test_too_long_id_is_rejected(tmp_path):
+    store = letter_store.LetterStore(str(tmp_path), str(tmp_path / "future_letters.json"))
+    with pytest.raises(ValueError):
+        store.add(make_letter("x" * 41, "2025-10-01"))
+
+
+def test_storage_mailbox_pages(storage):
+    for i in range(12):
+        storage.add_letter(make_letter(f"L{i:02d}", f"2025-10-{i + 1:02d}", content=f"본문 {i}"))
+    assert storage.letter_headers() == []
+
+    storage.deliver_due(datetime(2025, 10, 5, 9, 0))
+    storage.deliver_due(datetime(2025, 10, 10, 9, 0))
+    assert storage.mailbox_counts() == {"new": 10, "arrived": 10, "waiting": 2}
+    assert [header["id"] for header in storage.letter_headers(0, 4)] == ["L09", "L08", "L07", "L06"]
+    assert [header["id"] for header in storage.letter_headers(8, 4)] == ["L01", "L00"]
+
+    storage.mark_letter_read("L08", "2025-10-10 12:00:00")
+    header = storage.letter_headers(1, 1)[0]
+    assert (header["id"], header["is_read"], header["read_date"]) == ("L08", True, "2025-10-10 12:00:00")
+    assert storage.letter_body("L08")["content"] == "본문 8"
+    assert storage.mailbox_counts()["new"] == 9
+
+
+def test_v1_header_file_is_upgraded(tmp_path):
+    store = letter_store.LetterStore(str(tmp_path), str(tmp_path / "future_letters.json"))
+    store.add(make_letter("a", "2025-10-01", content="예전 형식"))
+    store.mark_read("a", "2025-10-02 09:00:00")
+    # 도착 시각 필드가 없던 형식으로 되돌려 씀
+    with open(store.headers_path, "rb") as f:
+        data = f.read()
+    record = letter_store.RECORD.unpack_from(data, letter_store.FILE_HEADER.size)
+    with open(store.headers_path, "wb") as f:
+        f.write(letter_store.MAGIC_V1 + data[8:letter_store.OLD_FILE_HEADER.size])
+        f.write(letter_store.RECORD_V1.pack(*record[:5], *record[6:]))
+
+    other = letter_store.LetterStore(str(tmp_path), str(tmp_path / "future_letters.json"))
+    header = other.view().headers()[0]
+    assert (header["id"], header["read_date"], header["delivered_at"]) == ("a", "2025-10-02 09:00:00", None)
+    assert other.body("a")["content"] == "예전 형식"
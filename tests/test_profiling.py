@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+import profiling
+from storage import FileStorage
+
+
+@pytest.mark.parametrize("query, expected", [
+    (None, None), ("", None), ("1", "timing"), ("timing", "timing"), ("CProfile", "cprofile"), ("nope", None),
+])
+def test_requested_mode(query, expected):
+    assert profiling.requested_mode(query, allow_query=True) == expected
+    # 서버가 허용하지 않으면 ?profile= 값은 무시
+    assert profiling.requested_mode(query) is None
+
+
+def test_rerun_records_spans_storage_and_trace(tmp_path):
+    trace_path = str(tmp_path / "trace.jsonl")
+    storage = FileStorage(str(tmp_path))
+
+    @profiling.timed()
+    def section():
+        profiling.wrap_storage(storage).load_calendar()
+        profiling.wrap_storage(storage).load_calendar()
+
+    @profiling.timed("page")
+    def page():
+        section()
+
+    for _ in range(2):
+        with profiling.rerun("timing", trace_path, session_id="s1", user_id="diary-key") as profile:
+            page()
+            profile.context["page"] = "calendar"
+
+    assert profiling.current() is None
+    assert profiling.wrap_storage(storage) is storage
+
+    with open(trace_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 2
+    record = records[-1]
+    assert record["session_id"] == "s1" and record["page"] == "calendar"
+    # 일기 열쇠인 user_id는 해시로만
+    assert record["user_id"] == profiling.anonymize("diary-key") == records[0]["user_id"]
+    assert "diary-key" not in json.dumps(records)
+    assert [(span["name"], span["kind"], span["depth"]) for span in record["spans"]] == [
+        ("page", "page", 0), ("section", "section", 1),
+    ]
+    assert record["storage"]["load_calendar"]["calls"] == 2
+    assert record["total_ms"] >= record["spans"][0]["ms"] >= record["spans"][1]["ms"]
+    assert "cprofile" not in record
+
+
+def test_rerun_is_recorded_when_page_raises(tmp_path):
+    trace_path = str(tmp_path / "trace.jsonl")
+    with pytest.raises(RuntimeError):
+        with profiling.rerun("timing", trace_path):
+            raise RuntimeError("st.rerun()")
+    with open(trace_path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 1
+
+
+def test_cprofile_mode_lists_top_functions(tmp_path):
+    with profiling.rerun("cprofile", str(tmp_path / "trace.jsonl")) as profile:
+        sorted(range(10000), key=lambda value: -value)
+    rows = profile.record["cprofile"]
+    assert rows == "busy" or any("sorted" in row["function"] for row in rows)
+
+
+def test_trace_file_is_rotated(tmp_path):
+    trace_path = str(tmp_path / "trace.jsonl")
+    for i in range(10):
+        profiling.append_trace({"i": i, "pad": "x" * 40}, trace_path, max_bytes=200)
+
+    with open(trace_path, encoding="utf-8") as f:
+        current = [json.loads(line)["i"] for line in f]
+    with open(trace_path + ".1", encoding="utf-8") as f:
+        previous = [json.loads(line)["i"] for line in f]
+    assert previous + current == list(range(current[0] - len(previous), 10))
+    assert len(current) <= 3 and os.path.getsize(trace_path) <= 200
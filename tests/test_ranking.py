@@ -0,0 +1,138 @@
+import json
+import os
+import random
+
+import pytest
+
+import ranking
+
+NOW = 1_800_000_000.0
+DAY = 86400
+
+
+def catalog(n):
+    return [{"id": f"c{i:05d}", "title": f"콘텐츠 {i}"} for i in range(n)]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "content_ranking.json")
+
+
+def keys(pairs):
+    return [item["id"] for _, item in pairs]
+
+
+def test_without_votes_keeps_catalog_order(path):
+    items = catalog(50)
+    assert keys(ranking.top_contents("불안", items, 3, now=NOW, path=path)) == ["c00000", "c00001", "c00002"]
+
+
+def test_helpful_votes_move_item_up(path):
+    items = catalog(50)
+    ranking.top_contents("불안", items, 3, now=NOW, path=path)
+    for _ in range(3):
+        ranking.record_vote("불안", "c00042", 42, True, now=NOW, path=path)
+    ranking.record_vote("불안", "c00000", 0, False, now=NOW, path=path)
+
+    top = ranking.top_contents("불안", items, 3, now=NOW, path=path)
+    assert top[0] == (42, items[42])
+    assert keys(top)[1:] == ["c00001", "c00002"]
+
+
+def test_serving_reads_stored_top_without_rebuilding(path, monkeypatch):
+    items = catalog(20000)
+    ranking.top_contents("슬픔", items, 3, now=NOW, path=path)
+    ranking.record_vote("슬픔", "c19999", 19999, True, now=NOW, path=path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("목록 전체를 다시 정렬함")
+
+    monkeypatch.setattr(ranking, "build_top", fail)
+    assert keys(ranking.top_contents("슬픔", items, 3, now=NOW + 60, path=path))[0] == "c19999"
+
+
+def test_catalog_change_triggers_rebuild(path):
+    items = catalog(10)
+    ranking.top_contents("혼란", items, 3, now=NOW, path=path)
+    changed = [{"id": "new", "title": "새 콘텐츠"}] + items
+    assert keys(ranking.top_contents("혼란", changed, 1, now=NOW, path=path)) == ["new"]
+
+
+def test_old_votes_decay(path):
+    items = catalog(10)
+    ranking.top_contents("분노", items, 3, now=NOW, path=path)
+    old = NOW - 10 * ranking.HALF_LIFE_DAYS * DAY
+    for _ in range(10):
+        ranking.record_vote("분노", "c00005", 5, True, now=old, path=path)
+    for _ in range(2):
+        ranking.record_vote("분노", "c00007", 7, True, now=NOW, path=path)
+
+    assert keys(ranking.top_contents("분노", items, 2, now=NOW + 2 * DAY, path=path)) == ["c00007", "c00005"]
+
+
+def test_incremental_top_matches_full_rebuild():
+    rng = random.Random(3)
+    items = catalog(300)
+    state = ranking.empty_state()
+    state["top"]["불안"] = ranking.build_top({}, items, NOW)
+    for _ in range(2000):
+        position = rng.randrange(len(items))
+        ranking.add_vote(state, "불안", items[position]["id"], position, rng.random() < 0.6, NOW)
+        if "불안" not in state["top"]:
+            state["top"]["불안"] = ranking.build_top(state["items"]["불안"], items, NOW)
+
+    expected = ranking.build_top(state["items"]["불안"], items, NOW)
+    assert [entry[1] for entry in state["top"]["불안"]["entries"]] == [entry[1] for entry in expected["entries"]]
+
+
+def test_rebuild_from_events():
+    items = catalog(5)
+    events = [
+        {"content_id": "c00003", "content_title": "콘텐츠 3", "emotion": "희망", "is_helpful": True,
+         "timestamp": "2027-01-01T10:00:00"},
+        {"content_id": None, "content_title": "c00004", "emotion": "희망", "is_helpful": True,
+         "timestamp": "2027-01-01T11:00:00"},
+        {"content_id": "c00004", "content_title": "콘텐츠 4", "emotion": "희망", "is_helpful": True},
+    ]
+    state = ranking.rebuild_from_events(events, {"희망": items}, now=NOW)
+    # 타임스탬프 없는 이벤트는 now에 도착한 것으로 보고, 2주 전 투표는 조금 감쇠됨
+    assert 1.8 < state["items"]["희망"]["c00004"][1] < 2
+    assert [entry[1] for entry in state["top"]["희망"]["entries"][:2]] == ["c00004", "c00003"]
+
+
+def test_votes_are_logged_and_snapshotted_in_batches(path, monkeypatch):
+    monkeypatch.setattr(ranking, "SNAPSHOT_EVERY", 10)
+    items = catalog(50)
+    ranking.top_contents("불안", items, 3, now=NOW, path=path)
+    with open(path, "rb") as f:
+        first = f.read()
+    for _ in range(9):
+        ranking.record_vote("불안", "c00042", 42, True, now=NOW, path=path)
+
+    # 스냅샷은 그대로, 투표는 로그에만 - 그래도 바로 순위에 반영됨
+    with open(path, "rb") as f:
+        assert f.read() == first
+    assert keys(ranking.top_contents("불안", items, 1, now=NOW, path=path)) == ["c00042"]
+
+    ranking.record_vote("불안", "c00042", 42, True, now=NOW, path=path)
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data.count(b"\n") == 0
+    snapshot = json.loads(data)
+    assert snapshot["offset"] == os.path.getsize(ranking.votes_path(path))
+    assert snapshot["items"]["불안"]["c00042"][0] == 10
+
+
+def test_other_processes_replay_the_vote_log(path):
+    items = catalog(10)
+    ranking.top_contents("슬픔", items, 3, now=NOW, path=path)
+    ranking.record_vote("슬픔", "c00007", 7, True, now=NOW, path=path)
+    # 쓰다 끊긴 투표 한 줄 뒤에 다음 투표
+    with open(ranking.votes_path(path), "ab") as f:
+        f.write(b'{"emotion": "\xec\x8a')
+    ranking.record_vote("슬픔", "c00007", 7, True, now=NOW, path=path)
+
+    ranking._loaded.clear()
+    assert ranking.load(path)["items"]["슬픔"]["c00007"][0] == 2
+    assert keys(ranking.top_contents("슬픔", items, 1, now=NOW, path=path)) == ["c00007"]
@@ -0,0 +1,34 @@
+import json
+
+from read_cache import FileCache
+
+
+def test_unchanged_file_is_not_reparsed(tmp_path):
+    path = tmp_path / "contents.json"
+    path.write_text(json.dumps({"불안": []}), encoding="utf-8")
+    cache = FileCache(max_entries=2)
+    parses = []
+
+    def loader():
+        parses.append(1)
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    assert cache.get("contents", [str(path)], loader) == {"불안": []}
+    assert cache.get("contents", [str(path)], loader) == {"불안": []}
+    assert len(parses) == 1
+
+    path.write_text(json.dumps({"불안": [{"id": "anxiety_001"}]}), encoding="utf-8")
+    assert cache.get("contents", [str(path)], loader) == {"불안": [{"id": "anxiety_001"}]}
+    assert len(parses) == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_eviction_bound(tmp_path):
+    cache = FileCache(max_entries=2)
+    for key in ["a", "b", "c"]:
+        cache.get(key, [str(tmp_path / key)], lambda: key)
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
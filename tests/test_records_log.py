@@ -0,0 +1,40 @@
+import records_log
+
+
+def write_records(path, count):
+    for i in range(count):
+        records_log.append(str(path), f"2025-01-01 00:{i // 60:02d}:{i % 60:02d}", f"기록 {i}")
+
+
+def test_tail_reads_latest_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(records_log, "TAIL_BLOCK_BYTES", 16)
+    path = tmp_path / "records.txt"
+    write_records(path, 50)
+
+    assert records_log.tail(str(path), 3) == [
+        ("2025-01-01 00:00:49", "기록 49"),
+        ("2025-01-01 00:00:48", "기록 48"),
+        ("2025-01-01 00:00:47", "기록 47"),
+    ]
+    assert len(records_log.tail(str(path), 100)) == 50
+
+
+def test_between_uses_sparse_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(records_log, "INDEX_INTERVAL_BYTES", 128)
+    path = tmp_path / "records.txt"
+    write_records(path, 200)
+
+    timestamps, _ = records_log._read_index(str(path))
+    assert 1 < len(timestamps) < 200
+
+    hits = records_log.between(str(path), "2025-01-01 00:01:10", "2025-01-01 00:01:12")
+    assert [text for _, text in hits] == ["기록 70", "기록 71", "기록 72"]
+
+
+def test_between_rebuilds_missing_index(tmp_path):
+    path = tmp_path / "records.txt"
+    path.write_text("[2025-09-06 15:13:53] 첫 기록\n[2025-09-07 15:53:50] 둘째 기록\n", encoding="utf-8")
+
+    assert records_log.between(str(path), "2025-09-07 00:00:00", "2025-09-07 23:59:59") == [
+        ("2025-09-07 15:53:50", "둘째 기록"),
+    ]
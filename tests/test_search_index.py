@@ -0,0 +1,69 @@
+import search_index
+
+
+def test_tokenize_uses_character_ngrams():
+    tokens = search_index.tokenize("과제 마감!")
+    assert {"과", "제", "과제", "마", "감", "마감"} == tokens
+    assert search_index.query_tokens("마감이") == {"마감", "감이"}
+
+
+def test_search_matches_inside_words_and_ranks_phrase_first(tmp_path):
+    index = search_index.SearchIndex(str(tmp_path / "search"))
+    index.add("record:1", "record", "2025-01-01 10:00:00", "과제 마감이 내일이라 불안했다")
+    index.add("record:2", "record", "2025-01-02 10:00:00", "마감 끝나고 과제를 하나 더 받았다")
+    index.add("record:3", "record", "2025-01-03 10:00:00", "산책하고 마음이 가벼워졌다")
+
+    hits = index.search("과제 마감")
+    assert [hit["key"] for hit in hits] == ["record:1", "record:2"]
+    assert [hit["phrase"] for hit in hits] == [True, False]
+    assert [hit["key"] for hit in index.search("마감")] == ["record:2", "record:1"]
+    assert index.search("시험") == []
+    assert index.search("  ") == []
+
+
+def test_replace_remove_and_filters(tmp_path):
+    index = search_index.SearchIndex(str(tmp_path / "search"))
+    index.add("note:2025-01-01", "note", "2025-01-01", "과제 때문에 힘든 날")
+    index.add("letter:a", "letter", "2099-01-01", "미래의 나에게 - 과제는 잘 끝났니?")
+    assert len(index.search("과제")) == 2
+    assert [hit["kind"] for hit in index.search("과제", kinds=["note"])] == ["note"]
+    assert [hit["kind"] for hit in index.search("과제", until="2025-12-31")] == ["note"]
+
+    index.add("note:2025-01-01", "note", "2025-01-01", "산책한 날")
+    assert [hit["key"] for hit in index.search("과제")] == ["letter:a"]
+    index.remove("letter:a")
+    assert index.search("과제") == []
+    assert len(index) == 1
+
+
+def test_snapshot_and_other_writers(tmp_path, monkeypatch):
+    monkeypatch.setattr(search_index, "SNAPSHOT_EVERY_BYTES", 200)
+    directory = str(tmp_path / "search")
+    writer = search_index.SearchIndex(directory)
+    for i in range(20):
+        writer.add(f"record:{i}", "record", f"2025-01-{i + 1:02d}", f"{i}번째 기록 - 과제 마감")
+    assert len(writer.search("과제", limit=100)) == 20
+
+    reader = search_index.SearchIndex(directory)
+    assert len(reader.search("과제", limit=100)) == 20
+    # 다른 인스턴스(프로세스)가 덧붙인 로그 꼬리도 반영
+    writer.add("record:new", "record", "2025-02-01", "새 과제")
+    assert reader.search("과제")[0]["key"] == "record:new"
+
+
+def test_storage_backfills_then_indexes_new_entries(storage):
+    storage.save_calendar({"2025-03-01": {"emotion": "불안", "note": "과제 마감 전날", "color": "#fff"}})
+    storage.append_record("2025-03-01 21:00:00", "과제를 겨우 끝냈다")
+
+    assert {hit["kind"] for hit in storage.search("과제")} == {"note", "record"}
+
+    storage.add_letter({"id": "L1", "content": "과제 마감은 잘 지났니?", "write_date": "2025-03-01",
+                        "delivery_date": "2025-04-01", "is_read": False, "read_date": None,
+                        "write_time": "2025-03-01 22:00:00"})
+    storage.append_records([("2025-03-02 09:00:00", "오늘은 과제 대신 산책")])
+    storage.save_calendar_day("2025-03-02", {"emotion": "평온", "note": "산책", "color": "#fff"})
+    storage.save_calendar_day("2025-03-01", None)
+
+    kinds = sorted(hit["kind"] for hit in storage.search("과제", limit=10))
+    assert kinds == ["letter", "record", "record"]
+    assert [hit["key"] for hit in storage.search("산책", kinds=["note"])] == ["note:2025-03-02"]
@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import pytest
+
+from conftest import make_letter
+from storage import FileStorage, SqliteStorage, migrate
+
+
+def test_storage_backends_agree(storage):
+
+    storage.save_calendar_day("2025-09-06", {"emotion": "희망", "note": "a", "color": "#98FB98", "timestamp": "t1"})
+    storage.save_calendar_day("2025-10-01", {"emotion": "평온", "note": "b", "color": "#87CEEB", "timestamp": "t2"})
+    storage.save_calendar_day("2025-10-02", {"emotion": "희망", "note": "c", "color": "#98FB98", "timestamp": "t3"})
+    assert list(storage.calendar_between("2025-10-01", "2025-10-31")) == ["2025-10-01", "2025-10-02"]
+    assert storage.emotion_counts() == {"희망": 2, "평온": 1}
+    stats = storage.emotion_stats()
+    assert (stats["total_days"], stats["last_day"], stats["current_streak"], stats["longest_streak"]) == (
+        3, "2025-10-02", 2, 2)
+
+    for letter_id, delivery_date in [("a", "2025-09-13"), ("b", "2025-12-05"), ("c", "2025-10-06")]:
+        storage.add_letter(make_letter(letter_id, delivery_date))
+    assert storage.mailbox_counts() == {"new": 0, "arrived": 0, "waiting": 3}
+    assert len(storage.deliver_due(datetime(2025, 11, 1, 9, 0))) == 2
+    assert storage.mailbox_counts() == {"new": 2, "arrived": 2, "waiting": 1}
+    storage.mark_letter_read("a", "2025-11-01 10:00:00")
+    assert storage.mailbox_counts() == {"new": 1, "arrived": 2, "waiting": 1}
+    assert [letter["id"] for letter in storage.letter_headers()] == ["c", "a"]
+
+    for i in range(5):
+        storage.append_record(f"2025-09-0{i + 1} 10:00:00", f"기록 {i}")
+    assert storage.recent_records(2) == [("2025-09-05 10:00:00", "기록 4"), ("2025-09-04 10:00:00", "기록 3")]
+
+
+def test_migrate_files_to_sqlite(tmp_path):
+    source = FileStorage(str(tmp_path))
+    source.save_calendar_day("2025-09-06", {"emotion": "희망", "note": "a", "color": "#98FB98", "timestamp": "t1"})
+    source.append_record("2025-09-06 15:13:53", "무거운 마음")
+    source.append_feedback({"content_id": "anxiety_001", "content_title": "x", "is_helpful": True, "emotion": "불안",
+                            "timestamp": "t", "session_id": "anonymous"})
+
+    target = SqliteStorage(str(tmp_path / "migrated.db"))
+    counts = migrate(source, target)
+
+    assert counts == {"calendar": 1, "letters": 0, "records": 1, "feedback": 1}
+    assert target.load_calendar() == source.load_calendar()
+    assert target.recent_records(1) == [("2025-09-06 15:13:53", "무거운 마음")]
+    assert target.load_feedback() == source.load_feedback()
+
+
+def test_user_storage_is_partitioned(tmp_path, monkeypatch):
+    import storage
+
+    monkeypatch.setattr(storage, "USERS_DIR", str(tmp_path / "users"))
+    alice = storage.get_storage("alice")
+    bob = storage.get_storage("bob")
+    assert storage.get_storage("alice") is alice
+
+    alice.save_calendar_day("2025-09-06", {"emotion": "희망", "note": "a", "color": "#98FB98", "timestamp": "t"})
+    alice.append_record("2025-09-06 15:13:53", "alice 기록")
+
+    assert (tmp_path / "users" / "alice" / "records.txt").exists()
+    assert bob.load_calendar() == {}
+    assert bob.recent_records(3) == []
+    with pytest.raises(ValueError):
+        storage.get_storage("../etc")
+
+
+def test_evicted_sqlite_storages_close_their_connections(tmp_path, monkeypatch):
+    import storage
+
+    monkeypatch.setattr(storage, "USERS_DIR", str(tmp_path / "users"))
+    monkeypatch.setattr(storage, "MAX_CACHED_STORAGES", 1)
+    monkeypatch.setattr(storage, "_storages", OrderedDict())
+    monkeypatch.setenv("MINDFUL_STORAGE", "sqlite")
+    alice = storage.get_storage("alice")
+    alice.append_record("2025-09-06 15:13:53", "alice 기록")
+    # 다른 스레드(다른 세션)가 연 연결도 함께 닫힘
+    worker = threading.Thread(target=alice.recent_records, args=(1,))
+    worker.start()
+    worker.join()
+    connections = list(alice._connections)
+    assert len(connections) == 2
+
+    storage.get_storage("bob")
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    # 밀려난 뒤에도 쥐고 있던 쪽이 쓰면 새로 엶
+    assert alice.recent_records(1) == [("2025-09-06 15:13:53", "alice 기록")]
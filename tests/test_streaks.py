@@ -0,0 +1,28 @@
+from streaks import StreakEngine
+
+
+def test_add_and_remove_days_merge_and_split_runs():
+    engine = StreakEngine.from_calendar({"2025-09-01": {}, "2025-09-02": {}, "2025-09-05": {}})
+    assert engine.runs() == [[739495, 739496], [739499, 739499]]
+    assert engine.longest_streak() == 2
+
+    engine.add_day("2025-09-04")
+    engine.add_day("2025-09-03")
+    assert len(engine.runs()) == 1
+    assert engine.longest_streak() == 5
+    assert engine.current_streak("2025-09-05") == 5
+    assert engine.current_streak("2025-09-06") == 0
+
+    engine.remove_day("2025-09-03")
+    assert engine.longest_streak() == 2
+    assert engine.streak_ending("2025-09-05") == 2
+
+
+def test_streaks_between_clips_to_range():
+    days = ["2024-12-30", "2024-12-31", "2025-01-01", "2025-01-02", "2025-01-10", "2025-02-01"]
+    engine = StreakEngine.from_calendar(dict.fromkeys(days))
+
+    assert engine.streaks_between("2025-01-01", "2025-01-31") == [
+        ("2025-01-01", "2025-01-02", 2),
+        ("2025-01-10", "2025-01-10", 1),
+    ]
@@ -0,0 +1,174 @@
+import io
+import json
+
+import pytest
+
+import records_log
+import transfer
+from conftest import make_storage
+from storage import FileStorage
+from write_coordinator import get_writer
+
+
+def fill(storage):
+    storage.save_calendar_day("2025-09-06", {"emotion": "희망", "note": "과제 끝", "color": "#98FB98", "timestamp": "t1"})
+    storage.append_record("2025-09-06 15:13:53", "무거운 마음, 그래도")
+    storage.append_record(None, "시각 없는 예전 기록")
+    storage.add_letter({"id": "L1", "title": "", "content": "잘 지내니?\n\"안녕\"", "write_date": "2025-09-06",
+                        "delivery_date": "2025-10-06", "is_read": False, "read_date": None,
+                        "write_time": "2025-09-06 22:00:00"})
+    storage.append_feedback({"content_id": "anxiety_001", "content_title": "x", "is_helpful": True,
+                             "emotion": "불안", "timestamp": "t", "session_id": "anonymous"})
+
+
+def snapshot(storage):
+    return (storage.load_calendar(), list(storage.iter_records()), storage.load_letters(),
+            storage.load_feedback(), storage.feedback_counts())
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "csv"])
+@pytest.mark.parametrize("source_kind,target_kind", [("files", "sqlite"), ("sqlite", "files")])
+def test_export_import_round_trip(fmt, source_kind, target_kind, tmp_path):
+    source = make_storage(source_kind, tmp_path / "source")
+    fill(source)
+    write, read = (transfer.write_csv, transfer.read_csv) if fmt == "csv" else (transfer.write_jsonl, transfer.read_jsonl)
+
+    buffer = io.StringIO(newline="")
+    assert write(transfer.export_rows(source), buffer) == 5
+    buffer.seek(0)
+    target = make_storage(target_kind, tmp_path / "target")
+    counts = transfer.import_rows(target, read(buffer))
+
+    assert counts == {"calendar": 1, "record": 2, "letter": 1, "feedback": 1}
+    assert snapshot(target) == snapshot(source)
+    assert [hit["key"] for hit in target.search("과제")] == ["note:2025-09-06"]
+
+
+def test_backfill_is_one_commit_and_letters_are_not_duplicated(storage):
+    storage.save_calendar_day("2020-01-01", {"emotion": "평온", "note": "", "color": "#fff", "timestamp": None})
+    rows = (
+        {"kind": "calendar", "date": f"2021-{month:02d}-{day:02d}", "emotion": "희망", "note": "", "color": "#fff"}
+        for month in range(1, 13) for day in range(1, 29)
+    )
+    if isinstance(storage, FileStorage):
+        writer = get_writer(storage.calendar_path)
+        commits = writer.stats()["commits"]
+
+    assert transfer.import_rows(storage, rows)["calendar"] == 12 * 28
+    assert len(storage.load_calendar()) == 12 * 28 + 1
+    assert storage.emotion_stats()["counts"] == {"평온": 1, "희망": 12 * 28}
+    if isinstance(storage, FileStorage):
+        assert writer.stats()["commits"] == commits + 1
+
+    letter = {"kind": "letter", "id": "L1", "content": "a", "write_date": "2025-01-01", "delivery_date": "2025-02-01"}
+    assert transfer.import_rows(storage, iter([letter, letter]))["letter"] == 1
+    assert transfer.import_rows(storage, iter([letter]))["letter"] == 0
+
+
+def test_bad_rows_are_rejected():
+    with pytest.raises(ValueError):
+        transfer.import_rows(None, iter([{"kind": "photo"}]))
+    with pytest.raises(ValueError):
+        transfer.import_rows(None, iter([{"kind": "calendar", "date": "2025-01-01"}]))
+    with pytest.raises(ValueError):
+        list(transfer.read_jsonl(io.StringIO('{"kind": "record"}\n{깨진 줄\n')))
+
+
+def test_bad_calendar_rows_write_nothing(storage):
+    storage.save_calendar_day("2025-09-01", {"emotion": "평온", "note": "", "color": "#87CEEB", "timestamp": None})
+    before = storage.load_calendar()
+    good = {"kind": "calendar", "date": "2025-09-02", "emotion": "희망"}
+
+    for bad in ({"date": "not-a-date"}, {"date": "20250903"}, {"date": "2025-9-3"}, {"emotion": "아무 감정"}):
+        with pytest.raises(ValueError):
+            transfer.import_rows(storage, iter([good, dict(good, **bad)]))
+        assert storage.load_calendar() == before
+        assert storage.emotion_stats()["total_days"] == 1
+
+
+def test_records_with_newlines_are_rejected(storage):
+
+    for text in ("line1\nline2", "line1\r\nline2"):
+        with pytest.raises(ValueError):
+            transfer.check_rows(iter([{"kind": "record", "timestamp": None, "text": text}]))
+        with pytest.raises(ValueError):
+            transfer.import_rows(storage, iter([{"kind": "record", "timestamp": None, "text": text}]))
+    assert list(storage.iter_records()) == []
+
+
+def test_missing_calendar_values_get_defaults(storage):
+    csv_rows = io.StringIO("kind,date,emotion,note,color,timestamp\ncalendar,2025-09-03,불안,,,\n")
+    transfer.import_rows(storage, iter([{"kind": "calendar", "date": "2025-09-02", "emotion": "희망"}]))
+    transfer.import_rows(storage, transfer.read_csv(csv_rows))
+
+    assert storage.load_calendar() == {
+        "2025-09-02": {"emotion": "희망", "note": "", "color": "#98FB98", "timestamp": None},
+        "2025-09-03": {"emotion": "불안", "note": "", "color": "#FF6B6B", "timestamp": None},
+    }
+
+
+def test_older_records_are_imported_in_time_order(storage):
+    storage.append_record("2025-09-06 15:13:53", "올해 기록")
+    old = [(f"2020-01-0{day} 09:00:00", f"예전 기록 {day}") for day in (3, 1, 2)]
+    transfer.import_rows(storage, iter({"kind": "record", "timestamp": timestamp, "text": text} for timestamp, text in old))
+    storage.append_record("2025-09-07 08:00:00", "다음 날 기록")
+
+    assert [text for _, text in storage.records_between("2020-01-01", "2020-12-31")] == ["예전 기록 1", "예전 기록 2", "예전 기록 3"]
+    assert [text for _, text in storage.recent_records(2)] == ["다음 날 기록", "올해 기록"]
+    assert [timestamp for timestamp, _ in storage.iter_records()] == sorted(timestamp for timestamp, _ in storage.iter_records())
+
+
+def test_late_records_are_merged_and_reindexed(tmp_path, monkeypatch):
+    monkeypatch.setattr(records_log, "INDEX_INTERVAL_BYTES", 64)
+    path = str(tmp_path / "records.txt")
+    new = [(f"2025-01-{day:02d} 10:00:00", f"기록 {day}") for day in range(10, 20)]
+    old = [(f"2024-12-{day:02d} 10:00:00", f"예전 {day}") for day in range(10, 20)]
+    records_log.append_many(path, iter(new))
+    assert records_log.append_many(path, iter(old + [(None, "시각 없음")])) == 11
+
+    assert records_log.tail(path, 1) == [new[-1]]
+    assert records_log.between(path, "2024-12-15", "2025-01-11 23:59:59") == old[5:] + new[:2]
+    with open(records_log.index_path(path), encoding="utf-8") as f:
+        index = f.read()
+    records_log.rebuild_index(path)
+    with open(records_log.index_path(path), encoding="utf-8") as f:
+        assert f.read() == index
+    with open(path, encoding="utf-8") as f:
+        assert f.readline() == "시각 없음\n"
+
+
+def test_append_many_keeps_the_sparse_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(records_log, "INDEX_INTERVAL_BYTES", 64)
+    path = str(tmp_path / "records.txt")
+    records = [(f"2025-01-{i % 28 + 1:02d} 10:{i // 28:02d}:00", f"기록 {i}") for i in range(50)]
+    records.sort()
+    assert records_log.append_many(path, iter(records)) == 50
+    with open(records_log.index_path(path), encoding="utf-8") as f:
+        index = f.read()
+    records_log.rebuild_index(path)
+    with open(records_log.index_path(path), encoding="utf-8") as f:
+        assert f.read() == index
+    assert records_log.between(path, "2025-01-10", "2025-01-11") == [r for r in records if "2025-01-10" <= r[0] <= "2025-01-11"]
+
+
+def test_cli_export_and_import(tmp_path, monkeypatch, capsys):
+    import storage
+
+    monkeypatch.setattr(storage, "USERS_DIR", str(tmp_path / "users"))
+    monkeypatch.setenv("MINDFUL_STORAGE", "files")
+    fill(storage.create_storage(user_id="u1"))
+    output = str(tmp_path / "backup.csv")
+
+    transfer.main(["export", "--user", "u1", "--output", output])
+    assert json.loads(capsys.readouterr().err) == {"exported": 5}
+    transfer.main(["import", output, "--user", "u2"])
+    assert json.loads(capsys.readouterr().out) == {"calendar": 1, "record": 2, "letter": 1, "feedback": 1}
+    assert snapshot(storage.create_storage(user_id="u2")) == snapshot(storage.create_storage(user_id="u1"))
+
+    # 잘못된 행이 하나라도 있으면 앞쪽 행도 쓰지 않음
+    with open(output, "a", encoding="utf-8", newline="") as f:
+        f.write("calendar,not-a-date,희망" + "," * (len(transfer.CSV_FIELDS) - 3) + "\r\n")
+    with pytest.raises(ValueError):
+        transfer.main(["import", output, "--user", "u3"])
+    empty = storage.create_storage(user_id="u3")
+    assert len(empty.load_calendar()) == 0 and list(empty.iter_records()) == [] and list(empty.iter_letters()) == []
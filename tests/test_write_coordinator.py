@@ -0,0 +1,54 @@
+import gc
+import json
+import threading
+from collections import OrderedDict
+
+import storage as storage_module
+import write_coordinator
+from storage import FileStorage
+from write_coordinator import stress_test
+
+
+def test_concurrent_writes_lose_no_updates(tmp_path):
+    result = stress_test(str(tmp_path / "stress.json"), threads=8, writes_per_thread=25)
+    print(json.dumps(result, indent=2))
+
+    assert result["lost_updates"] == 0
+    # 동시에 도착한 쓰기는 묶여서 커밋 수가 쓰기 수보다 적어야 함
+    assert result["commits"] < result["writes"]
+
+
+def test_concurrent_letter_saves(tmp_path):
+    storage = FileStorage(str(tmp_path))
+
+    def write_letters(thread_id):
+        for i in range(10):
+            storage.add_letter({
+                "id": f"{thread_id}-{i}", "title": "", "content": "미래의 나", "write_date": "2025-09-06",
+                "delivery_date": "2025-09-13", "is_read": False, "read_date": None, "write_time": "",
+            })
+
+    threads = [threading.Thread(target=write_letters, args=(t,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(storage.load_letters()["letters"]) == 40
+    assert storage.mailbox_counts()["waiting"] == 40
+
+
+def test_writers_are_released_with_evicted_storages(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_module, "USERS_DIR", str(tmp_path))
+    monkeypatch.setattr(storage_module, "MAX_CACHED_STORAGES", 2)
+    monkeypatch.setattr(storage_module, "_storages", OrderedDict())
+    monkeypatch.setenv("MINDFUL_STORAGE", "files")
+    for user_id in ("u1", "u2", "u3", "u4"):
+        user_storage = storage_module.get_storage(user_id)
+        user_storage.save_calendar_days([("2025-09-06", {"emotion": "희망", "note": "", "color": "#98FB98", "timestamp": None})])
+    del user_storage
+    gc.collect()
+
+    paths = {path for path in write_coordinator._writers.keys() if path.startswith(str(tmp_path))}
+    assert paths == {str(tmp_path / user_id / "emotion_calendar.json") for user_id in ("u3", "u4")}
+    assert storage_module.get_storage("u4")._calendar_writer is write_coordinator.get_writer(str(tmp_path / "u4" / "emotion_calendar.json"))
@@ -0,0 +1,234 @@
+# transfer.py - 사용자 기록 내보내기/가져오기 (JSONL, CSV)
+#
+# 감정 달력, 감정 기록(records.txt), 미래 편지, 콘텐츠 피드백을 한 파일로 주고받습니다.
+# 한 행이 항목 하나이고 "kind" 열로 종류(calendar, record, letter, feedback)를 구분합니다.
+#   JSONL: {"kind": "calendar", "date": "2025-09-06", "emotion": "희망", "note": "...", ...}
+#   CSV  : CSV_FIELDS 열 전체 - 종류에 없는 열은 비워 둠, 참/거짓은 true/false
+#
+# 내보내기와 가져오기 모두 제너레이터로 한 행씩 흘려보내므로 기록이 몇 년치든 메모리가 일정합니다.
+# 가져오기는 같은 종류가 이어지는 행들을 저장소의 일괄 메서드(save_calendar_days, append_records,
+# add_letters, append_feedbacks)에 그대로 넘겨, 몇 년치 달력도 하루씩이 아니라 한 번의 커밋으로 반영합니다.
+# 달력은 같은 날짜를 덮어쓰고 편지는 이미 있는 아이디를 건너뛰지만, 기록과 피드백은 덧붙이기만 하므로
+# 같은 파일을 두 번 가져오면 두 번 들어갑니다.
+#
+# 달력 행은 저장 전에 검사합니다: 날짜는 YYYY-MM-DD, 감정은 emotion_registry에 있는 감정이어야 하고,
+# 빠진 note는 "", color는 감정의 기본 색, timestamp는 None(시각 모름)으로 채웁니다.
+# records.txt는 한 줄이 기록 하나이므로, 줄바꿈이 들어 있는 기록 행은 (둘로 나뉘어 저장되지 않도록) 거부합니다.
+# 명령줄 가져오기는 파일 전체를 먼저 한 번 검사(check_rows)하므로, 잘못된 행이 있으면 아무것도 쓰지 않습니다.
+#
+#   python transfer.py export --user <id> --output backup.jsonl
+#   python transfer.py export --user <id> --kinds calendar --output calendar.csv
+#   python transfer.py import backup.jsonl --user <id>
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+from datetime import date
+
+import storage
+from emotion_registry import registry, unpack_color
+
+KINDS = ("calendar", "record", "letter", "feedback")
+FIELDS = {
+    "calendar": ("date", "emotion", "note", "color", "timestamp"),
+    "record": ("timestamp", "text"),
+    "letter": storage.LETTER_COLUMNS,
+    "feedback": storage.FEEDBACK_COLUMNS,
+}
+REQUIRED = {
+    "calendar": ("date", "emotion"),
+    "record": ("text",),
+    "letter": ("id", "write_date", "delivery_date"),
+    "feedback": (),
+}
+CSV_FIELDS = ("kind",) + tuple(dict.fromkeys(field for kind in KINDS for field in FIELDS[kind]))
+# CSV의 빈 칸을 None으로 읽는 열 (나머지는 빈 문자열 그대로)
+NULLABLE = {"color", "timestamp", "read_date", "delivered_at", "write_time", "content_id", "session_id"}
+BOOLEAN = {"is_read", "is_helpful"}
+
+
+# 내보내기
+def export_rows(user_storage, kinds=KINDS):
+    """저장소 내용을 {"kind": ..., ...} 행으로 하나씩 (종류별로 이어서)"""
+    if "calendar" in kinds:
+        for day, entry in user_storage.iter_calendar():
+            yield {"kind": "calendar", "date": day, **entry}
+    if "record" in kinds:
+        for timestamp, text in user_storage.iter_records():
+            yield {"kind": "record", "timestamp": timestamp, "text": text}
+    if "letter" in kinds:
+        for letter in user_storage.iter_letters():
+            yield {"kind": "letter", **letter}
+    if "feedback" in kinds:
+        for feedback in user_storage.iter_feedback():
+            yield {"kind": "feedback", **feedback}
+
+
+def write_jsonl(rows, f):
+    count = 0
+    for row in rows:
+        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def write_csv(rows, f):
+    writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow({key: _csv_value(value) for key, value in row.items()})
+        count += 1
+    return count
+
+
+# 가져오기
+def read_jsonl(f):
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"{line_number}번째 줄을 읽을 수 없습니다: {e}") from None
+
+
+def _from_csv(kind, row):
+    values = {"kind": kind}
+    for field in FIELDS.get(kind, ()):
+        value = row.get(field) or ""
+        if field in BOOLEAN:
+            value = value.strip().lower() in ("true", "1")
+        elif field in NULLABLE and value == "":
+            value = None
+        values[field] = value
+    return values
+
+
+def read_csv(f):
+    for row in csv.DictReader(f):
+        yield _from_csv(row.get("kind"), row)
+
+
+def _kind(row):
+    kind = row.get("kind")
+    if kind not in FIELDS:
+        raise ValueError(f"알 수 없는 종류: {kind!r}")
+    missing = [field for field in REQUIRED[kind] if not row.get(field)]
+    if missing:
+        raise ValueError(f"{kind} 행에 {', '.join(missing)} 값이 없습니다: {row!r}")
+    return kind
+
+
+def _item(row, *skip):
+    return {key: value for key, value in row.items() if key != "kind" and key not in skip}
+
+
+def _calendar_day(row):
+    """달력 행 → (날짜, 기록) - 날짜/감정 검사, 빠진 값은 기본값으로"""
+    day, emotion = row["date"], row["emotion"]
+    try:
+        valid_day = date.fromisoformat(day).isoformat() == day
+    except (TypeError, ValueError):
+        valid_day = False
+    if not valid_day:
+        raise ValueError(f"calendar 행의 날짜가 YYYY-MM-DD 형식이 아닙니다: {row!r}")
+    if not isinstance(emotion, str) or emotion not in registry:
+        raise ValueError(f"calendar 행의 감정을 알 수 없습니다: {row!r}")
+    return day, {
+        "emotion": emotion,
+        "note": row.get("note") or "",
+        "color": row.get("color") or unpack_color(registry.color(registry.code(emotion))),
+        "timestamp": row.get("timestamp") or None,
+    }
+
+
+def _record(row):
+    """기록 행 → (timestamp, text) - 줄바꿈이 있는 기록은 거부"""
+    timestamp, text = row.get("timestamp"), row["text"]
+    if any("\n" in value or "\r" in value for value in (timestamp, text) if isinstance(value, str)):
+        raise ValueError(f"record 행에 줄바꿈이 있습니다 (한 줄에 기록 하나): {row!r}")
+    return timestamp, text
+
+
+def check_rows(rows):
+    """행들을 검사만 하고 종류별 수 - 잘못된 행이 있으면 ValueError (저장소는 건드리지 않음)"""
+    counts = dict.fromkeys(KINDS, 0)
+    for row in rows:
+        kind = _kind(row)
+        if kind == "calendar":
+            _calendar_day(row)
+        elif kind == "record":
+            _record(row)
+        counts[kind] += 1
+    return counts
+
+
+def import_rows(user_storage, rows):
+    """행들을 저장소에 반영 - 같은 종류가 이어지는 구간마다 일괄 저장 한 번, {종류: 반영한 수}"""
+    counts = dict.fromkeys(KINDS, 0)
+    for kind, group in itertools.groupby(rows, key=_kind):
+        if kind == "calendar":
+            # 구간 전체를 검사한 뒤에 저장 (잘못된 행이 있으면 이 구간은 하나도 쓰지 않음)
+            days = [_calendar_day(row) for row in group]
+            counts[kind] += user_storage.save_calendar_days(days)
+        elif kind == "record":
+            counts[kind] += user_storage.append_records(_record(row) for row in group)
+        elif kind == "letter":
+            counts[kind] += user_storage.add_letters(_item(row) for row in group)
+        else:
+            counts[kind] += user_storage.append_feedbacks(_item(row) for row in group)
+    return counts
+
+
+def _format(path, requested):
+    if requested:
+        return requested
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--user", help="data/users/<id>/ 사용자 (없으면 공용 저장소)")
+    common.add_argument("--format", choices=["jsonl", "csv"], help="파일 형식 (기본: 확장자로 판단, 그 외 jsonl)")
+    parser = argparse.ArgumentParser(description="기록 내보내기/가져오기")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", parents=[common], help="기록을 파일로 내보내기")
+    export_parser.add_argument("--output", default="-", help="파일 경로 (기본: 표준 출력)")
+    export_parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    import_parser = subparsers.add_parser("import", parents=[common], help="내보낸 파일을 가져오기")
+    import_parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    user_storage = storage.create_storage(user_id=args.user)
+    if args.command == "export":
+        fmt = _format(args.output, args.format)
+        write = write_csv if fmt == "csv" else write_jsonl
+        rows = export_rows(user_storage, args.kinds)
+        if args.output == "-":
+            count = write(rows, sys.stdout)
+        else:
+            with open(args.output, "w", encoding="utf-8", newline="") as f:
+                count = write(rows, f)
+        print(json.dumps({"exported": count}, ensure_ascii=False), file=sys.stderr)
+    elif args.command == "import":
+        read = read_csv if _format(args.path, args.format) == "csv" else read_jsonl
+        with open(args.path, "r", encoding="utf-8", newline="") as f:
+            check_rows(read(f))
+            f.seek(0)
+            counts = import_rows(user_storage, read(f))
+        print(json.dumps(counts, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
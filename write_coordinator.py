@@ -0,0 +1,232 @@
+# write_coordinator.py - JSON 파일 쓰기 조정 (잠금 + 원자적 교체 + 그룹 커밋)
+#
+# 여러 브라우저 세션이 같은 JSON 파일을 동시에 읽고-고치고-쓰면 수정이 사라지고,
+# 저장 중 죽으면 반쯤 쓰인 파일이 남습니다. GroupCommitWriter는
+#   1. 권고 잠금(<파일>.lock)으로 프로세스 간 읽기-수정-쓰기를 직렬화하고
+#   2. 임시 파일에 쓰고 fsync 후 os.replace로 원자적으로 교체하며
+#   3. 짧은 시간(batch_window) 안에 도착한 수정들을 한 번의 커밋으로 묶어
+#      N개의 동시 저장이 fsync 한 번 정도로 끝나게 합니다.
+
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_BATCH_WINDOW = 0.002
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """<path>.lock 파일에 대한 배타적 권고 잠금"""
+    lock_path = path + ".lock"
+    with open(lock_path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _fsync_directory(directory):
+    if fcntl is None:
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_json(path, data, indent=2):
+    """임시 파일에 쓰고 fsync 후 원자적으로 교체"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def read_json(path, default_factory):
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return default_factory()
+
+
+class _Request:
+    def __init__(self, mutate):
+        self.mutate = mutate
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class GroupCommitWriter:
+    """한 JSON 파일에 대한 그룹 커밋 쓰기"""
+
+    def __init__(self, path, default_factory=dict, load=None, on_commit=None, batch_window=DEFAULT_BATCH_WINDOW, indent=2):
+        self.path = path
+        self.default_factory = default_factory
+        # load: 잠금 안에서 현재 상태를 읽는 함수 (기본: JSON 파일 그대로)
+        self.load = load or (lambda: read_json(path, default_factory))
+        # on_commit(data): 파일 교체 직후, 잠금을 쥔 채로 호출 (보조 인덱스 갱신 등)
+        self.on_commit = on_commit
+        self.batch_window = batch_window
+        # indent: 저장할 JSON 들여쓰기 (None이면 한 줄로 - 크고 자주 쓰는 파일용)
+        self.indent = indent
+        self._lock = threading.Lock()
+        self._pending = []
+        self._committing = False
+        self.requests = 0
+        self.commits = 0
+
+    def update(self, mutate):
+        """mutate(data)로 문서를 제자리 수정하고 커밋될 때까지 대기 - mutate의 반환값을 돌려줌"""
+        request = _Request(mutate)
+        with self._lock:
+            self._pending.append(request)
+            self.requests += 1
+            is_leader = not self._committing
+            if is_leader:
+                self._committing = True
+
+        if is_leader:
+            self._lead()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def replace(self, new_data):
+        """문서 전체를 new_data로 교체"""
+        def mutate(data):
+            data.clear()
+            data.update(new_data)
+        return self.update(mutate)
+
+    def _lead(self):
+        # 먼저 도착한 스레드가 대기 중인 요청이 없어질 때까지 묶어서 커밋
+        while True:
+            if self.batch_window:
+                time.sleep(self.batch_window)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                if not batch:
+                    self._committing = False
+                    return
+            self._commit(batch)
+
+    def _commit(self, batch):
+        try:
+            with file_lock(self.path):
+                data = self.load()
+                for request in batch:
+                    try:
+                        request.result = request.mutate(data)
+                    except Exception as e:
+                        request.error = e
+                atomic_write_json(self.path, data, indent=self.indent)
+                if self.on_commit is not None:
+                    self.on_commit(data)
+            with self._lock:
+                self.commits += 1
+        except Exception as e:
+            for request in batch:
+                request.error = request.error or e
+        finally:
+            for request in batch:
+                request.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "commits": self.commits}
+
+
+# 경로 → writer (약한 참조). writer는 쓰는 쪽(FileStorage 등)이 쥐고 있는 동안만 남으므로,
+# get_storage의 LRU에서 밀려난 사용자 저장소의 writer도 함께 사라집니다.
+_writers = weakref.WeakValueDictionary()
+_writers_lock = threading.Lock()
+
+
+def get_writer(path, **kwargs):
+    """경로별 공용 writer - 같은 파일에 대한 쓰기가 한 큐로 모이도록 (누군가 쥐고 있는 동안)"""
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = GroupCommitWriter(path, **kwargs)
+            _writers[key] = writer
+        return writer
+
+
+def stress_test(path, threads=8, writes_per_thread=50, batch_window=DEFAULT_BATCH_WINDOW):
+    """여러 스레드가 동시에 한 파일에 추가 - 유실된 수정 수와 커밋 처리량 보고"""
+    writer = GroupCommitWriter(path, default_factory=lambda: {"items": []}, batch_window=batch_window)
+
+    def worker(thread_id):
+        for i in range(writes_per_thread):
+            writer.update(lambda data, item=f"{thread_id}-{i}": data["items"].append(item))
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    expected = threads * writes_per_thread
+    saved = len(set(read_json(path, dict)["items"]))
+    stats = writer.stats()
+    return {
+        "writes": expected,
+        "lost_updates": expected - saved,
+        "commits": stats["commits"],
+        "writes_per_commit": expected / stats["commits"] if stats["commits"] else 0.0,
+        "seconds": elapsed,
+        "writes_per_second": expected / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="그룹 커밋 쓰기 스트레스 테스트")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=50, help="스레드당 쓰기 수")
+    parser.add_argument("--batch-window", type=float, default=DEFAULT_BATCH_WINDOW)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        result = stress_test(
+            os.path.join(directory, "stress.json"), args.threads, args.writes, args.batch_window
+        )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()